@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import math
+from collections.abc import Sequence
+
+NON_FINITE_RESULT = "result is not a finite number"
+
 
 def compute_ratio(numerator: float | None, denominator: float | None) -> float:
     # GUARD_NONE_START
@@ -11,3 +16,47 @@ def compute_ratio(numerator: float | None, denominator: float | None) -> float:
         raise ValueError("denominator must be non-zero")
     # GUARD_ZERO_END
     return numerator / denominator
+
+
+def compute_ratio_batch(
+    numerators: Sequence[float | None], denominators: Sequence[float | None]
+) -> list[tuple[float | None, str | None]]:
+    if len(numerators) != len(denominators):
+        raise ValueError("numerators and denominators must have the same length")
+
+    try:
+        import numpy as np
+    except ImportError:
+        return [_guarded_ratio(n, d) for n, d in zip(numerators, denominators)]
+
+    count = len(numerators)
+    num = np.array([np.nan if value is None else value for value in numerators], dtype=float)
+    den = np.array([np.nan if value is None else value for value in denominators], dtype=float)
+
+    # Elements the scalar guards would reject are routed through compute_ratio so
+    # the guard code (and its markers) stays the single source of truth.
+    missing = np.fromiter(
+        (n is None or d is None for n, d in zip(numerators, denominators)), dtype=bool, count=count
+    )
+    guarded = missing | (den == 0)
+
+    # Overflow to inf is reported per item below, not as a RuntimeWarning.
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        quotients = np.divide(num, den, out=np.zeros(count), where=~guarded)
+    non_finite = ~np.isfinite(quotients) & ~guarded
+    results: list[tuple[float | None, str | None]] = [(value, None) for value in quotients.tolist()]
+    for index in np.flatnonzero(guarded).tolist():
+        results[index] = _guarded_ratio(numerators[index], denominators[index])
+    for index in np.flatnonzero(non_finite).tolist():
+        results[index] = (None, NON_FINITE_RESULT)
+    return results
+
+
+def _guarded_ratio(numerator: float | None, denominator: float | None) -> tuple[float | None, str | None]:
+    try:
+        result = compute_ratio(numerator, denominator)
+    except ValueError as exc:
+        return None, str(exc)
+    except OverflowError:
+        return None, NON_FINITE_RESULT
+    return (result, None) if math.isfinite(result) else (None, NON_FINITE_RESULT)
@@ -1,17 +1,46 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import logging
 import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.logic import compute_ratio
-from webhook import EventReporter, ReporterError, heal_from_payload
+from app.logic import compute_ratio, compute_ratio_batch
+from app.streaming import NdjsonStreamingResponse, compute_ndjson
+from telemetry import collect_all, histogram, render, start_snapshot_flusher
 
-UNHEALTHY_MARKER = Path("/tmp/self_healing_force_unhealthy")
+# The heal/report stack (httpx, healer, webhook) is imported on first use so that
+# processes serving only /healthz and /compute start without it.
+if TYPE_CHECKING:
+    from webhook.cache import ResultCache
+    from webhook.jobs import HealJob, JobQueue
+    from webhook.outbox import Outbox, OutboxReplayer
+    from webhook.pipeline import EventPipeline
+    from webhook.reporter import EventReporter
+    from webhook.service import HealOutcome
+    from webhook.workers import HealWorkerPool
+
+UNHEALTHY_MARKER = Path(os.getenv("SELF_HEALING_UNHEALTHY_MARKER", "/tmp/self_healing_force_unhealthy"))
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route, method and status.",
+    ("method", "route", "status"),
+)
 
 
 class ComputeRequest(BaseModel):
@@ -19,12 +48,115 @@ class ComputeRequest(BaseModel):
     denominator: float
 
 
+class ComputeBatchRequest(BaseModel):
+    numerators: list[float | None]
+    denominators: list[float | None]
+
+
 class HealRequest(BaseModel):
     correlationId: str
     payload: dict[str, Any]
 
 
-app = FastAPI(title="Self-Healing Systems Lab")
+_REPORTER: EventReporter | EventPipeline | None = None
+_REPLAYER: OutboxReplayer | None = None
+_JOBS: JobQueue | None = None
+_HEAL_CACHE: ResultCache | None = None
+_WORKERS: HealWorkerPool | None = None
+_INIT_LOCK = threading.RLock()
+# Set when _start_background_services fails; both /healthz/reporter and
+# /healthz/healer report degraded until the next startup.
+_STARTUP_ERROR: str | None = None
+
+
+def heal_from_payload(payload: dict[str, Any], signature: str | None = None) -> HealOutcome:
+    from webhook.service import heal_from_payload as _heal_from_payload
+
+    return _heal_from_payload(payload, signature)
+
+
+def _start_background_services() -> None:
+    global _REPLAYER
+    workers = _worker_pool()
+    if workers is not None:
+        workers.start()
+    reporter = _reporter()
+    if reporter.outbox is not None:
+        from webhook.outbox import OutboxReplayer
+
+        _REPLAYER = OutboxReplayer(
+            outbox=reporter.outbox,
+            reporter=_base_reporter(reporter),
+            rate_per_second=float(os.getenv("MISSION_CONTROL_REPLAY_RATE", "20")),
+        )
+        _REPLAYER.start()
+
+
+def _background_started(task: asyncio.Future[None]) -> None:
+    global _STARTUP_ERROR
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        _STARTUP_ERROR = f"{type(exc).__name__}: {exc}"
+        logger.error("Background service startup failed", exc_info=exc)
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    global _JOBS, _REPLAYER, _STARTUP_ERROR, _WORKERS
+    start_snapshot_flusher()
+    _STARTUP_ERROR = None
+    # Worker spawning, reporter construction and outbox replay happen off the startup
+    # path so /healthz answers as soon as uvicorn is listening.
+    background = asyncio.create_task(asyncio.to_thread(_start_background_services))
+    background.add_done_callback(_background_started)
+    try:
+        yield
+    finally:
+        await asyncio.gather(background, return_exceptions=True)
+        jobs, _JOBS = _JOBS, None
+        if jobs is not None:
+            # Job events are emitted from the queue's own loop; close that loop's client there.
+            finalizer = _base_reporter(_REPORTER).aclose if _REPORTER is not None else None
+            await asyncio.to_thread(jobs.close, finalizer=finalizer)
+        workers, _WORKERS = _WORKERS, None
+        if workers is not None:
+            await asyncio.to_thread(workers.close)
+        replayer, _REPLAYER = _REPLAYER, None
+        if replayer is not None:
+            await asyncio.to_thread(replayer.stop)
+        await _close_reporter()
+
+
+class _MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # Label by route template, not raw path, to keep series cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            _REQUEST_SECONDS.labels(scope["method"], route, status).observe(time.perf_counter() - started)
+
+
+app = FastAPI(title="Self-Healing Systems Lab", lifespan=_lifespan)
+app.add_middleware(_MetricsMiddleware)
 
 
 def _require_bearer_token(authorization: str | None = Header(default=None)) -> None:
@@ -40,10 +172,127 @@ def _require_bearer_token(authorization: str | None = Header(default=None)) -> N
         raise HTTPException(status_code=401, detail={"error": "unauthorized"})
 
 
-def _reporter() -> EventReporter:
+def _build_reporter() -> EventReporter | EventPipeline:
+    from webhook.pipeline import EventPipeline
+    from webhook.reporter import CircuitBreaker, EventReporter
+    from webhook.serialization import get_serializer
+    from webhook.validation import load_envelope_validator
+
     hub_url = os.getenv("MISSION_CONTROL_URL", "http://localhost:3000")
     token = os.getenv("MISSION_CONTROL_TOKEN", "")
-    return EventReporter(base_url=hub_url, token=token)
+    validation_mode = os.getenv("EVENT_VALIDATION", "off")
+    reporter = EventReporter(
+        base_url=hub_url,
+        token=token,
+        max_connections=int(os.getenv("MISSION_CONTROL_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("MISSION_CONTROL_MAX_KEEPALIVE", "10")),
+        keepalive_expiry_seconds=float(os.getenv("MISSION_CONTROL_KEEPALIVE_SECONDS", "30")),
+        http2=os.getenv("MISSION_CONTROL_HTTP2", "0") == "1",
+        batch_path=os.getenv("MISSION_CONTROL_BATCH_PATH") or None,
+        serializer=get_serializer(os.getenv("MISSION_CONTROL_SERIALIZER", "auto")),
+        validator=load_envelope_validator(os.getenv("EVENT_SCHEMA_PATH"))
+        if validation_mode != "off"
+        else None,
+        validation_mode=validation_mode,
+        outbox=_build_outbox(),
+        breaker=CircuitBreaker(
+            failure_rate_threshold=float(os.getenv("MISSION_CONTROL_BREAKER_FAILURE_RATE", "0.5")),
+            minimum_calls=int(os.getenv("MISSION_CONTROL_BREAKER_MIN_CALLS", "5")),
+            window_seconds=float(os.getenv("MISSION_CONTROL_BREAKER_WINDOW_SECONDS", "60")),
+            open_seconds=float(os.getenv("MISSION_CONTROL_BREAKER_OPEN_SECONDS", "30")),
+        ),
+    )
+    if os.getenv("MISSION_CONTROL_PIPELINE", "0") != "1":
+        return reporter
+
+    return EventPipeline(
+        reporter=reporter,
+        max_queue_size=int(os.getenv("MISSION_CONTROL_QUEUE_SIZE", "1000")),
+        batch_size=int(os.getenv("MISSION_CONTROL_BATCH_SIZE", "50")),
+        linger_seconds=float(os.getenv("MISSION_CONTROL_LINGER_MS", "50")) / 1000,
+        policy=os.getenv("MISSION_CONTROL_BACKPRESSURE", "block"),
+    )
+
+
+def _build_outbox() -> Outbox | None:
+    directory = os.getenv("MISSION_CONTROL_OUTBOX_DIR", "")
+    if not directory:
+        return None
+    from webhook.outbox import Outbox
+
+    # Each worker process appends to and replays its own subdirectory.
+    return Outbox.claim(
+        Path(directory),
+        fsync_every=int(os.getenv("MISSION_CONTROL_OUTBOX_FSYNC_EVERY", "32")),
+    )
+
+
+def _reporter() -> EventReporter | EventPipeline:
+    global _REPORTER
+    with _INIT_LOCK:
+        if _REPORTER is None:
+            _REPORTER = _build_reporter()
+        return _REPORTER
+
+
+def _base_reporter(reporter: EventReporter | EventPipeline) -> EventReporter:
+    from webhook.pipeline import EventPipeline
+
+    return reporter.reporter if isinstance(reporter, EventPipeline) else reporter
+
+
+def _jobs() -> JobQueue:
+    global _JOBS
+    if _JOBS is None:
+        from webhook.jobs import JobQueue
+
+        _JOBS = JobQueue(
+            max_workers=int(os.getenv("HEAL_JOB_WORKERS", "2")),
+            max_pending=int(os.getenv("HEAL_JOB_MAX_PENDING", "100")),
+            retain_finished=int(os.getenv("HEAL_JOB_RETAIN", "1000")),
+        )
+    return _JOBS
+
+
+def _worker_pool() -> HealWorkerPool | None:
+    global _WORKERS
+    processes = int(os.getenv("HEALER_WORKER_PROCESSES", "0"))
+    if processes <= 0:
+        return None
+    with _INIT_LOCK:
+        if _WORKERS is None:
+            from webhook.workers import HealWorkerPool
+
+            _WORKERS = HealWorkerPool(
+                processes=processes,
+                max_jobs_per_worker=int(os.getenv("HEALER_WORKER_MAX_JOBS", "100")),
+                max_memory_mb=float(os.getenv("HEALER_WORKER_MAX_MEMORY_MB", "512")),
+            )
+        return _WORKERS
+
+
+def _heal_cache() -> ResultCache:
+    global _HEAL_CACHE
+    if _HEAL_CACHE is None:
+        from webhook.cache import ResultCache
+
+        _HEAL_CACHE = ResultCache(
+            max_entries=int(os.getenv("HEAL_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("HEAL_CACHE_TTL_SECONDS", "600")),
+            # Timeouts are transient; a retry should get a fresh attempt.
+            should_cache=lambda result: result.get("reasonCode") != "healer_timeout",
+        )
+    return _HEAL_CACHE
+
+
+async def _close_reporter() -> None:
+    global _REPORTER
+    reporter, _REPORTER = _REPORTER, None
+    if reporter is not None:
+        await reporter.aclose()
+        reporter.close()
+        if reporter.outbox is not None:
+            reporter.outbox.close()
 
 
 @app.get("/healthz")
@@ -56,6 +305,51 @@ def healthz() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/healthz/reporter")
+def reporter_health() -> dict[str, Any]:
+    from webhook.pipeline import EventPipeline
+
+    reporter = _reporter()
+    circuit = _base_reporter(reporter).breaker.stats()
+    health: dict[str, Any] = {
+        "status": "ok" if circuit["state"] == "closed" and _STARTUP_ERROR is None else "degraded",
+        "circuit": circuit,
+    }
+    if _STARTUP_ERROR is not None:
+        health["startupError"] = _STARTUP_ERROR
+    if reporter.outbox is not None:
+        health["outbox"] = reporter.outbox.stats()
+    if isinstance(reporter, EventPipeline):
+        health["pipeline"] = reporter.stats()
+    return health
+
+
+@app.get("/healthz/healer")
+def healer_health() -> dict[str, Any]:
+    from healer.locks import file_locks
+    from healer.signatures import signature_cache
+
+    health: dict[str, Any] = {
+        "status": "ok",
+        "locks": file_locks().stats(),
+        "jobs": _jobs().stats(),
+        "cache": _heal_cache().stats(),
+        "signatures": signature_cache().stats(),
+    }
+    if _STARTUP_ERROR is not None:
+        health["status"] = "degraded"
+        health["startupError"] = _STARTUP_ERROR
+    workers = _worker_pool()
+    if workers is not None:
+        health["workers"] = workers.stats()
+    return health
+
+
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render(collect_all()), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/readyz")
 def readyz() -> dict[str, str]:
     return {"status": "ready"}
@@ -87,12 +381,135 @@ def compute(payload: ComputeRequest) -> dict[str, float]:
     return {"result": result}
 
 
+@app.post("/compute/batch")
+def compute_batch(payload: ComputeBatchRequest) -> dict[str, list[Any]]:
+    max_items = int(os.getenv("COMPUTE_BATCH_MAX_ITEMS", "100000"))
+    if len(payload.numerators) > max_items:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "invalid_input", "message": f"batch exceeds {max_items} items"},
+        )
+
+    try:
+        pairs = compute_ratio_batch(payload.numerators, payload.denominators)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": "invalid_input", "message": str(exc)},
+        ) from exc
+
+    return {
+        "results": [result for result, _ in pairs],
+        "errors": [
+            None if message is None else {"error": "invalid_input", "message": message}
+            for _, message in pairs
+        ],
+    }
+
+
+@app.post("/compute/stream")
+async def compute_stream(request: Request) -> NdjsonStreamingResponse:
+    return NdjsonStreamingResponse(compute_ndjson(request.stream()))
+
+
 @app.post("/heal", dependencies=[Depends(_require_bearer_token)])
-async def heal(payload: HealRequest) -> dict[str, Any]:
+async def heal(
+    payload: HealRequest,
+    response: Response,
+    run_async: bool = Query(default=False, alias="async"),
+) -> dict[str, Any]:
+    if not run_async:
+        result, cache_status = await _cached_heal(payload)
+        response.headers["X-Heal-Cache"] = cache_status
+        return result
+
+    from webhook.jobs import JobQueueFullError
+
+    try:
+        job, created = _jobs().submit(payload.correlationId, lambda job: _run_heal_job(payload, job))
+    except JobQueueFullError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail={"error": "queue_full", "message": str(exc)},
+        ) from exc
+
+    status_url = f"/heal/jobs/{job.id}"
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return {
+        "jobId": job.id,
+        "status": job.status,
+        "deduplicated": not created,
+        "statusUrl": status_url,
+        "eventsUrl": f"{status_url}/events",
+    }
+
+
+@app.get("/heal/jobs/{job_id}", dependencies=[Depends(_require_bearer_token)])
+def heal_job(job_id: str) -> dict[str, Any]:
+    return _find_job(job_id).snapshot()
+
+
+@app.get("/heal/jobs/{job_id}/events", dependencies=[Depends(_require_bearer_token)])
+async def heal_job_events(job_id: str) -> StreamingResponse:
+    job = _find_job(job_id)
+
+    async def _stream() -> AsyncIterator[str]:
+        seen = 0
+        while True:
+            events = await job.next_events(seen, 15.0)
+            if not events:
+                yield ": keep-alive\n\n"
+            for event in events:
+                yield f"event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+            seen += len(events)
+            if job.done and seen >= len(job.events):
+                yield f"event: result\ndata: {json.dumps(job.snapshot())}\n\n"
+                return
+
+    return StreamingResponse(_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _find_job(job_id: str) -> HealJob:
+    job = _jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": "job_not_found"})
+    return job
+
+
+async def _run_heal_job(payload: HealRequest, job: HealJob) -> dict[str, Any]:
+    result, cache_status = await _cached_heal(payload, job.record)
+    job.record("cache", result=cache_status)
+    return result
+
+
+async def _cached_heal(
+    payload: HealRequest,
+    progress: Callable[..., None] | None = None,
+) -> tuple[dict[str, Any], str]:
+    from webhook.service import failure_keys, heal_cache_key
+
+    # Retried CI deliveries of the same failure share one execution and one event pair.
+    # Fingerprinting scans the whole log for the FAILURES header, so it stays off the
+    # event loop; the healer reuses the signature as its signature cache key.
+    fingerprint, signature = await asyncio.to_thread(failure_keys, payload.payload)
+    key = heal_cache_key(payload.correlationId, fingerprint)
+    return await _heal_cache().get_or_compute(key, lambda: _execute_heal(payload, progress, signature))
+
+
+async def _execute_heal(
+    payload: HealRequest,
+    progress: Callable[..., None] | None = None,
+    signature: str | None = None,
+) -> dict[str, Any]:
+    from webhook.reporter import ReporterError
+    from webhook.workers import WorkerCrashedError
+
     reporter = _reporter()
+    progress = progress or _no_progress
 
     try:
-        reporter.emit(
+        await reporter.emit_async(
             correlation_id=payload.correlationId,
             event_type="heal.attempted",
             severity="info",
@@ -103,13 +520,19 @@ async def heal(payload: HealRequest) -> dict[str, Any]:
             status_code=502,
             detail={"error": "reporting_failed", "message": str(exc)},
         ) from exc
+    progress("heal.attempted")
 
     timeout_seconds = float(os.getenv("HEALER_EXECUTION_TIMEOUT_SECONDS", "300"))
 
     try:
-        outcome = await asyncio.wait_for(
-            asyncio.to_thread(heal_from_payload, payload.payload), timeout=timeout_seconds
-        )
+        outcome = await _run_healer(payload.payload, timeout_seconds, signature)
+    except WorkerCrashedError as exc:
+        escalation_payload = {
+            "reasonCode": "healer_crashed",
+            "humanContext": {"summary": str(exc)},
+        }
+        await _emit_outcome(reporter, payload, "heal.escalated", "critical", escalation_payload, progress)
+        return {"status": "escalated", **escalation_payload}
     except asyncio.TimeoutError:
         escalation_payload = {
             "reasonCode": "healer_timeout",
@@ -117,35 +540,65 @@ async def heal(payload: HealRequest) -> dict[str, Any]:
                 "summary": "Healer execution exceeded timeout.",
             },
         }
-        reporter.emit(
-            correlation_id=payload.correlationId,
-            event_type="heal.escalated",
-            severity="critical",
-            payload=escalation_payload,
-        )
+        await _emit_outcome(reporter, payload, "heal.escalated", "critical", escalation_payload, progress)
         return {"status": "escalated", **escalation_payload}
+    progress("healer.finished", outcome=outcome.status)
 
     if outcome.status == "completed":
         completion_payload = {
             "patchSummary": outcome.patch_summary,
             "changedFiles": outcome.changed_files,
+            "verificationTargets": outcome.verification_targets,
         }
-        reporter.emit(
-            correlation_id=payload.correlationId,
-            event_type="heal.completed",
-            severity="info",
-            payload=completion_payload,
-        )
+        await _emit_outcome(reporter, payload, "heal.completed", "info", completion_payload, progress)
         return {"status": "completed", **completion_payload}
 
     escalation_payload = {
         "reasonCode": outcome.reason_code,
         "humanContext": outcome.human_context,
     }
-    reporter.emit(
-        correlation_id=payload.correlationId,
-        event_type="heal.escalated",
-        severity="warn",
-        payload=escalation_payload,
-    )
+    await _emit_outcome(reporter, payload, "heal.escalated", "warn", escalation_payload, progress)
     return {"status": "escalated", **escalation_payload}
+
+
+async def _emit_outcome(
+    reporter: Any,
+    payload: HealRequest,
+    event_type: str,
+    severity: str,
+    event_payload: dict[str, Any],
+    progress: Callable[..., None],
+) -> None:
+    from webhook.reporter import ReporterError
+
+    # The heal has already run (and may have written files), so a hub that is
+    # down or an open circuit must not turn its result into an error.
+    try:
+        await reporter.emit_async(
+            correlation_id=payload.correlationId,
+            event_type=event_type,
+            severity=severity,
+            payload=event_payload,
+        )
+    except ReporterError as exc:
+        logger.warning("Could not report %s for %s: %s", event_type, payload.correlationId, exc)
+        progress("report.failed", event=event_type, error=str(exc))
+
+
+async def _run_healer(payload: dict[str, Any], timeout_seconds: float, signature: str | None = None) -> Any:
+    from webhook.service import window_payload
+
+    # Only the windowed log is copied into the worker; the full one stays here.
+    payload = window_payload(payload)
+    workers = _worker_pool()
+    if workers is None:
+        # Thread mode cannot stop a timed-out heal; it keeps running in the background.
+        return await asyncio.wait_for(
+            asyncio.to_thread(heal_from_payload, payload, signature=signature),
+            timeout=timeout_seconds,
+        )
+    return await asyncio.to_thread(workers.run, payload, timeout_seconds, signature=signature)
+
+
+def _no_progress(stage: str, **data: Any) -> None:
+    return None
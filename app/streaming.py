@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import AsyncIterator
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.logic import NON_FINITE_RESULT, compute_ratio
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    _loads = json.loads
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NdjsonRatioStream:
+    # Only the trailing partial line is buffered between chunks, so memory stays
+    # bounded by the chunk size (and max_line_bytes) whatever the input length.
+    def __init__(self, max_line_bytes: int = 64 * 1024) -> None:
+        self.max_line_bytes = max_line_bytes
+        self.records = 0
+        self.errors = 0
+        self._pending = b""
+        self._discarding = False
+        self._line = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._discarding:
+            newline = chunk.find(b"\n")
+            if newline == -1:
+                return b""
+            chunk = chunk[newline + 1 :]
+            self._discarding = False
+
+        data = self._pending + chunk if self._pending else chunk
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+        out = self._process(lines)
+        if len(self._pending) > self.max_line_bytes:
+            self._pending = b""
+            self._discarding = True
+            self._line += 1
+            self.records += 1
+            self.errors += 1
+            out += _error(self._line, "invalid_json", "line exceeds maximum length").encode()
+        return out
+
+    def finish(self) -> bytes:
+        pending, self._pending = self._pending, b""
+        return self._process([pending])
+
+    def _process(self, lines: list[bytes]) -> bytes:
+        out: list[str] = []
+        append = out.append
+        line_number = self._line
+        for raw in lines:
+            line_number += 1
+            if not raw.strip():
+                continue
+            self.records += 1
+
+            try:
+                record = _loads(raw)
+                numerator = record["numerator"]
+                denominator = record["denominator"]
+            except (ValueError, TypeError, KeyError):
+                self.errors += 1
+                append(_error(line_number, "invalid_json", "expected an object with numerator and denominator"))
+                continue
+
+            if not (_is_number_or_none(numerator) and _is_number_or_none(denominator)):
+                self.errors += 1
+                append(_error(line_number, "invalid_input", "numerator and denominator must be numbers"))
+                continue
+
+            try:
+                result = compute_ratio(numerator, denominator)
+            except (ValueError, OverflowError) as exc:
+                self.errors += 1
+                append(_error(line_number, "invalid_input", str(exc)))
+                continue
+
+            if math.isfinite(result):
+                append(f'{{"result":{float(result)!r}}}\n')
+            else:
+                self.errors += 1
+                append(_error(line_number, "invalid_input", NON_FINITE_RESULT))
+
+        self._line = line_number
+        return "".join(out).encode()
+
+
+def _is_number_or_none(value: object) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+def _error(line: int, error: str, message: str) -> str:
+    return json.dumps({"line": line, "error": error, "message": message}, separators=(",", ":")) + "\n"
+
+
+async def compute_ndjson(chunks: AsyncIterator[bytes], flush_bytes: int = 64 * 1024) -> AsyncIterator[bytes]:
+    stream = NdjsonRatioStream()
+    buffered: list[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        out = stream.feed(chunk)
+        if out:
+            buffered.append(out)
+            size += len(out)
+        if size >= flush_bytes:
+            yield b"".join(buffered)
+            buffered, size = [], 0
+
+    buffered.append(stream.finish())
+    tail = b"".join(buffered)
+    if tail:
+        yield tail
+
+
+class NdjsonStreamingResponse(StreamingResponse):
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # The body iterator reads the request itself; the stock disconnect listener
+        # would race it for http.request messages. A disconnect surfaces there instead.
+        await self.stream_response(send)
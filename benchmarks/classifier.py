@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import builtins
+import json
+import random
+import statistics
+import time
+
+from healer.classifier import _FILE_LINE_RE, RULES, Rule, RuleSet
+from healer.types import FailureType
+
+# Stand-ins for future rules; RuntimeError stays out so it remains unclassified.
+EXTRA_EXCEPTIONS = tuple(
+    sorted(
+        name
+        for name in dir(builtins)
+        if name.endswith(("Error", "Warning"))
+        and name not in {"RuntimeError", "ZeroDivisionError", "TypeError", "AssertionError"}
+    )
+)
+
+
+def synthetic_log(size_mb: float, signature: str, seed: int = 7) -> str:
+    # Passing-test noise with source references, and the failure near the end the
+    # way pytest prints its summary after the progress output.
+    rng = random.Random(seed)
+    lines: list[str] = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        module = f"tests/test_module_{rng.randrange(400)}.py"
+        line = rng.choice(
+            (
+                f"{module}::test_case_{rng.randrange(10_000)} PASSED [{rng.randrange(100):3d}%]",
+                f"    {module}:{rng.randrange(1, 900)}: in helper_{rng.randrange(50)}",
+                f"DEBUG request id={rng.getrandbits(64):x} elapsed=0.{rng.randrange(999):03d}s",
+            )
+        )
+        lines.append(line)
+        size += len(line) + 1
+    lines.append("    def test_compute():")
+    lines.append("app/logic.py:6: in compute_ratio")
+    lines.append(f"E   {signature}")
+    lines.append("=========================== short test summary info ===========================")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_classify(output: str) -> FailureType:
+    # The pre-registry classifier: one membership test per signature, first file:line.
+    _FILE_LINE_RE.search(output)
+    if "ZeroDivisionError" in output:
+        return FailureType.ZERO_DIVISION
+    if "TypeError" in output and "NoneType" in output:
+        return FailureType.NONE_TYPE_ERROR
+    if "AssertionError" in output:
+        return FailureType.ASSERTION_FAILURE
+    return FailureType.UNKNOWN
+
+
+def legacy_many(output: str, rules: tuple[Rule, ...]) -> None:
+    # The legacy if-chain extended with one branch per extra rule.
+    _FILE_LINE_RE.search(output)
+    for rule in rules:
+        if all(token in output for token in rule.tokens):
+            return
+
+
+def _median_ms(func, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the legacy and table-driven failure classifiers")
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--runs", type=int, default=9)
+    parser.add_argument(
+        "--extra-rules",
+        type=int,
+        nargs="+",
+        default=[16, 48],
+        help="also time rule tables grown by this many single-token rules",
+    )
+    args = parser.parse_args()
+
+    tables = {"": RuleSet.compile(RULES)}
+    for extra in args.extra_rules:
+        # Extra rules rank below the built-in ones, like rules added later would.
+        rules = (*RULES, *(Rule(FailureType.UNKNOWN, (name,), name) for name in EXTRA_EXCEPTIONS[:extra]))
+        tables[f"_{len(rules)}_rules"] = RuleSet.compile(rules)
+
+    # An unmatched failure is the worst case: every rule has to be ruled out.
+    for signature in (
+        "ZeroDivisionError: division by zero",
+        "AssertionError: assert 1 == 2",
+        "RuntimeError: worker pool exhausted",
+    ):
+        output = synthetic_log(args.size_mb, signature)
+        expected = legacy_classify(output)
+        results = {"legacy": _median_ms(lambda: legacy_classify(output), args.runs)}
+        for suffix, table in tables.items():
+            assert table.classify(output).failure_type == expected
+            if suffix:
+                results[f"legacy{suffix}"] = _median_ms(lambda: legacy_many(output, table.rules), args.runs)
+            mode = "find" if table.pattern is None else "alternation"
+            results[f"table{suffix}_{mode}"] = _median_ms(lambda: table.classify(output), args.runs)
+
+        for variant, median_ms in results.items():
+            print(
+                json.dumps(
+                    {
+                        "signature": signature.split(":")[0],
+                        "variant": variant,
+                        "size_mb": round(len(output) / (1024 * 1024), 2),
+                        "median_ms": round(median_ms, 2),
+                        "mb_per_second": round(len(output) / (1024 * 1024) / (median_ms / 1000), 1),
+                    }
+                )
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
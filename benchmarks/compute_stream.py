@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+import uvicorn
+
+from app.main import app
+from app.streaming import NdjsonRatioStream
+
+CHUNK_BYTES = 64 * 1024
+
+
+def _records(count: int) -> Iterator[bytes]:
+    # Every 50th record hits the zero-denominator guard so the error path is exercised too.
+    buffered: list[bytes] = []
+    size = 0
+    for index in range(count):
+        denominator = 0 if index % 50 == 0 else index % 97 + 1
+        line = b'{"numerator":%d,"denominator":%d}\n' % (index, denominator)
+        buffered.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buffered)
+            buffered, size = [], 0
+    if buffered:
+        yield b"".join(buffered)
+
+
+def run_core(count: int) -> dict[str, object]:
+    chunks = list(_records(count))
+    stream = NdjsonRatioStream()
+
+    tracemalloc.start()
+    output = 0
+    for chunk in chunks:
+        output += len(stream.feed(chunk))
+    output += len(stream.finish())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # tracemalloc slows allocation-heavy code several-fold; time a separate untraced pass.
+    stream = NdjsonRatioStream()
+    started = time.perf_counter()
+    for chunk in chunks:
+        stream.feed(chunk)
+    stream.finish()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": "core",
+        "records": stream.records,
+        "errors": stream.errors,
+        "records_per_sec": round(stream.records / elapsed, 1),
+        "output_bytes": output,
+        "peak_traced_bytes": peak,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _send_chunked(sock: socket.socket, port: int, count: int) -> None:
+    sock.sendall(
+        b"POST /compute/stream HTTP/1.1\r\n"
+        b"Host: 127.0.0.1:%d\r\n"
+        b"Content-Type: application/x-ndjson\r\n"
+        b"Transfer-Encoding: chunked\r\n\r\n" % port
+    )
+    for chunk in _records(count):
+        sock.sendall(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+    sock.sendall(b"0\r\n\r\n")
+
+
+def run_http(count: int) -> dict[str, object]:
+    # httpx sends the whole request body before reading the response, which deadlocks
+    # once the response outgrows the socket buffers; upload and download concurrently.
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    lines = 0
+    try:
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            started = time.perf_counter()
+            writer = threading.Thread(target=_send_chunked, args=(sock, port, count), daemon=True)
+            writer.start()
+
+            reader = sock.makefile("rb")
+            status = reader.readline()
+            if b" 200 " not in status:
+                raise RuntimeError(f"unexpected response: {status!r}")
+            while reader.readline() not in (b"\r\n", b""):
+                pass
+            while True:
+                size = int(reader.readline().split(b";")[0], 16)
+                if size == 0:
+                    break
+                lines += reader.read(size).count(b"\n")
+                reader.readline()
+            elapsed = time.perf_counter() - started
+            writer.join()
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    return {
+        "mode": "http",
+        "records": lines,
+        "records_per_sec": round(lines / elapsed, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark streaming NDJSON ratio evaluation")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--min-rate", type=float, default=100_000, help="fail if core records/sec is below this")
+    parser.add_argument("--skip-http", action="store_true")
+    args = parser.parse_args()
+
+    core = run_core(args.records)
+    print(json.dumps(core))
+    if not args.skip_http:
+        print(json.dumps(run_http(args.records)))
+
+    if core["records_per_sec"] < args.min_rate:
+        print(json.dumps({"error": f"core throughput below {args.min_rate:.0f} records/sec"}))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
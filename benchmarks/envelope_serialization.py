@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from webhook.reporter import EventReporter
+from webhook.serialization import get_serializer, orjson
+
+PAYLOAD = {
+    "patchSummary": "Applied ZERO_DIVISION remediation.",
+    "changedFiles": ["app/logic.py", "tests/test_compute.py"],
+}
+
+
+def legacy_body(correlation_id: str) -> bytes:
+    # The previous emit path: per-call envelope literal, datetime formatting with
+    # str.replace, and httpx's default json.dumps encoding.
+    envelope = {
+        "id": str(uuid.uuid4()),
+        "schemaVersion": "1.0.0",
+        "eventVersion": 1,
+        "source": "self-healing-systems",
+        "type": "heal.completed",
+        "severity": "info",
+        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "correlationId": correlation_id,
+        "payload": PAYLOAD,
+    }
+    return json.dumps(envelope).encode("utf-8")
+
+
+def reporter_body(serializer_name: str) -> Callable[[str], bytes]:
+    reporter = EventReporter(
+        base_url="http://bench",
+        token="bench",
+        serializer=get_serializer(serializer_name),
+    )
+
+    def _body(correlation_id: str) -> bytes:
+        envelope = reporter.build_envelope(
+            correlation_id=correlation_id,
+            event_type="heal.completed",
+            severity="info",
+            payload=PAYLOAD,
+        )
+        return reporter.serializer(envelope)
+
+    return _body
+
+
+def measure(name: str, build: Callable[[str], bytes], events: int) -> dict[str, object]:
+    for _ in range(1000):
+        build("warmup")
+
+    started = time.perf_counter()
+    for _ in range(events):
+        build("corr-bench")
+    elapsed = time.perf_counter() - started
+
+    # Peak traced memory above the baseline while building one event body.
+    sample = min(events, 10_000)
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(sample):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        build("corr-bench")
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - baseline
+    tracemalloc.stop()
+
+    return {
+        "variant": name,
+        "events": events,
+        "us_per_event": round(elapsed / events * 1_000_000, 3),
+        "peak_bytes_per_event": round(allocated / sample, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark envelope construction and serialization")
+    parser.add_argument("--events", type=int, default=100_000)
+    args = parser.parse_args()
+
+    variants: list[tuple[str, Callable[[str], bytes]]] = [
+        ("legacy", legacy_body),
+        ("template+stdlib", reporter_body("stdlib")),
+    ]
+    if orjson is not None:
+        variants.append(("template+orjson", reporter_body("orjson")))
+
+    for name, build in variants:
+        print(json.dumps(measure(name, build, args.events)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
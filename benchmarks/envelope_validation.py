@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from webhook.reporter import EventReporter
+from webhook.validation import EVENT_SCHEMA_FILE, compile_schema
+
+
+def _envelope() -> dict[str, Any]:
+    reporter = EventReporter(base_url="http://bench", token="bench")
+    return reporter.build_envelope(
+        correlation_id="corr-bench",
+        event_type="heal.completed",
+        severity="info",
+        payload={"patchSummary": "Applied ZERO_DIVISION remediation.", "changedFiles": ["app/logic.py"]},
+    )
+
+
+def measure(name: str, check: Callable[[dict[str, Any]], object], envelope: dict[str, Any], runs: int) -> dict[str, object]:
+    for _ in range(1000):
+        check(envelope)
+    started = time.perf_counter()
+    for _ in range(runs):
+        check(envelope)
+    elapsed = time.perf_counter() - started
+    return {"validator": name, "runs": runs, "us_per_envelope": round(elapsed / runs * 1_000_000, 3)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare compiled envelope validation with jsonschema")
+    parser.add_argument("--runs", type=int, default=50_000)
+    args = parser.parse_args()
+
+    schema = json.loads(EVENT_SCHEMA_FILE.read_text())
+    envelope = _envelope()
+
+    started = time.perf_counter()
+    compiled = compile_schema(schema)
+    compile_ms = (time.perf_counter() - started) * 1000
+    print(json.dumps({"validator": "compiled", "compile_ms": round(compile_ms, 3)}))
+    print(json.dumps(measure("compiled", compiled, envelope, args.runs)))
+
+    try:
+        import jsonschema
+    except ImportError:
+        print(json.dumps({"validator": "jsonschema", "skipped": "jsonschema is not installed"}))
+        return 0
+
+    validator = jsonschema.Draft202012Validator(schema, format_checker=jsonschema.FormatChecker())
+    print(json.dumps(measure("jsonschema", lambda value: list(validator.iter_errors(value)), envelope, args.runs // 10)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
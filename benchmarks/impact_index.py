@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from healer.impact import ImpactIndex, refresh
+from healer.selection import affected_test_files, verification_targets
+
+FUNCTIONS_PER_MODULE = 10
+
+
+def write_project(root: Path, modules: int, tests_per_module: int, seed: int) -> None:
+    # Each test calls one function of its own module and one of another, so a
+    # module is imported by two test files but a line is run by a few tests.
+    rng = random.Random(seed)
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text("")
+    for module in range(modules):
+        body = ""
+        for function in range(FUNCTIONS_PER_MODULE):
+            body += f"\n\ndef f{function}(x):\n    y = x + {function}\n    if y < 0:\n        return -y\n    return y\n"
+        (root / "pkg" / f"mod_{module}.py").write_text(body)
+    (root / "tests").mkdir()
+    for module in range(modules):
+        other = (module + 1) % modules
+        body = f"from pkg import mod_{module}, mod_{other}\n"
+        for test in range(tests_per_module):
+            own, theirs = rng.randrange(FUNCTIONS_PER_MODULE), rng.randrange(FUNCTIONS_PER_MODULE)
+            body += f"\n\ndef test_{test}():\n    assert mod_{module}.f{own}(1) + mod_{other}.f{theirs}(1) > 0\n"
+        (root / "tests" / f"test_mod_{module}.py").write_text(body)
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(samples[int(len(samples) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Test-impact index build time and lookup latency")
+    parser.add_argument("--modules", type=int, default=40)
+    parser.add_argument("--tests-per-module", type=int, default=25)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory) / "project"
+        root.mkdir()
+        write_project(root, args.modules, args.tests_per_module, args.seed)
+        index = ImpactIndex(Path(directory) / "impact.sqlite")
+        tests = args.modules * args.tests_per_module
+
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "pytest", "-q"], cwd=root, stdout=subprocess.DEVNULL, check=False)
+        plain = time.perf_counter() - started
+        built = refresh(index, root)
+        print(json.dumps({"step": "build", "tests": tests, "suite_seconds": round(plain, 3), **built}))
+
+        # One edited module: only the tests that executed it are re-recorded.
+        edited = root / "pkg" / "mod_0.py"
+        edited.write_text(edited.read_text().replace("return y", "return y + 0", 1))
+        updated = refresh(index, root)
+        print(json.dumps({"step": "update", "tests": tests, **updated}))
+
+        modules = [root / "pkg" / f"mod_{module}.py" for module in range(args.modules)]
+        # The first body line of a random function; `def` lines only run at import.
+        lines = [(path, 4 + 7 * rng.randrange(FUNCTIONS_PER_MODULE)) for path in rng.choices(modules, k=args.lookups)]
+        for name, select in (
+            ("line", lambda path, line: len(index.tests_for({path.relative_to(root).as_posix(): {line}}, root) or [])),
+            ("file", lambda path, line: len(index.tests_for({path.relative_to(root).as_posix(): None}, root) or [])),
+            # Whole test files that import the module, counted in tests.
+            ("import_scan", lambda path, line: len(affected_test_files([path], root)) * args.tests_per_module),
+        ):
+            samples, selected = [], []
+            for path, line in lines:
+                started = time.perf_counter()
+                count = select(path, line)
+                samples.append(time.perf_counter() - started)
+                selected.append(count)
+            print(
+                json.dumps(
+                    {
+                        "step": "lookup",
+                        "mode": name,
+                        "lookups": len(lines),
+                        **percentiles(samples),
+                        "median_selected_tests": statistics.median(selected),
+                    }
+                )
+            )
+
+        # End to end, as the runner asks after a fix to one module.
+        started = time.perf_counter()
+        targets = verification_targets([], [modules[1]], root, index=index)
+        elapsed = time.perf_counter() - started
+        print(json.dumps({"step": "verification_targets", "ms": round(elapsed * 1000, 3), "targets": len(targets)}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
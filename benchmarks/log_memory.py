@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Each mode runs in a fresh interpreter that reports its own peak RSS.
+MODES = {
+    "baseline": "from healer.classifier import classify_log_file",
+    "mmap": "from healer.classifier import classify_log_file; failure = classify_log_file(path)",
+    "read": (
+        "from pathlib import Path; from healer.classifier import classify_pytest_output; "
+        "failure = classify_pytest_output(Path(path).read_text())"
+    ),
+}
+
+PROBE = """
+import resource, sys, time
+path = sys.argv[1]
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak_kib / (1024 * 1024) if sys.platform == "darwin" else peak_kib / 1024, elapsed)
+"""
+
+
+def write_log(path: Path, size_mb: int) -> None:
+    block = "".join(
+        f"tests/test_module_{i % 97}.py::test_case_{i} PASSED [{i % 100:3d}%]\n"
+        f"    tests/helpers/util_{i % 13}.py:{i % 500 + 1}: in helper\n"
+        for i in range(2000)
+    ).encode()
+    target = size_mb * 1024 * 1024
+    with path.open("wb") as handle:
+        written = 0
+        while written < target:
+            handle.write(block)
+            written += len(block)
+        handle.write(b"app/logic.py:6: in compute_ratio\nE   ZeroDivisionError: division by zero\n")
+
+
+def probe(mode: str, path: Path) -> tuple[float, float]:
+    process = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=MODES[mode]), str(path)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    peak_mb, elapsed = process.stdout.split()
+    return float(peak_mb), float(elapsed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Peak RSS of log classification as the log grows")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["baseline", "mmap", "read"])
+    parser.add_argument(
+        "--max-growth-mb",
+        type=float,
+        default=64.0,
+        help="fail if mmap peak RSS grows more than this from the smallest to the largest log",
+    )
+    args = parser.parse_args()
+
+    peaks: dict[str, list[float]] = {mode: [] for mode in args.modes}
+    with tempfile.TemporaryDirectory() as directory:
+        for size_mb in sorted(args.sizes_mb):
+            path = Path(directory) / f"pytest_{size_mb}mb.log"
+            started = time.perf_counter()
+            write_log(path, size_mb)
+            generated = time.perf_counter() - started
+            for mode in args.modes:
+                peak_mb, elapsed = probe(mode, path)
+                peaks[mode].append(peak_mb)
+                print(
+                    json.dumps(
+                        {
+                            "mode": mode,
+                            "log_mb": size_mb,
+                            "peak_rss_mb": round(peak_mb, 1),
+                            "seconds": round(elapsed, 3),
+                            "generate_seconds": round(generated, 2),
+                        }
+                    )
+                )
+            path.unlink()
+
+    if "mmap" in peaks and len(peaks["mmap"]) > 1:
+        growth = peaks["mmap"][-1] - peaks["mmap"][0]
+        print(json.dumps({"metric": "mmap_peak_rss_growth_mb", "value": round(growth, 1)}))
+        if growth > args.max_growth_mb:
+            print(json.dumps({"error": f"mmap peak RSS grew by more than {args.max_growth_mb} MB"}))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
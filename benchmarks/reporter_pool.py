@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from webhook.reporter import EventReporter
+
+
+class _HubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0"))
+        self.rfile.read(length)
+        body = b'{"accepted":true}'
+        self.send_response(202)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        return
+
+
+def start_hub() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _HubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _emit(reporter: EventReporter, index: int) -> None:
+    reporter.emit(
+        correlation_id=f"bench-{index}",
+        event_type="heal.attempted",
+        severity="info",
+        payload={"status": "started"},
+    )
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(mode: str, base_url: str, events: int) -> dict[str, float | str]:
+    latencies: list[float] = []
+    pooled = EventReporter(base_url=base_url, token="bench")
+
+    started = time.perf_counter()
+    for index in range(events):
+        t0 = time.perf_counter()
+        if mode == "per-call":
+            # Mirrors the previous behaviour: a fresh client (and connection) per emit.
+            with EventReporter(base_url=base_url, token="bench") as reporter:
+                _emit(reporter, index)
+        else:
+            _emit(pooled, index)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    pooled.close()
+
+    return {
+        "mode": mode,
+        "events": events,
+        "events_per_sec": round(events / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark EventReporter against a local stand-in hub")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--url", default=None, help="Use an external hub instead of the local stand-in")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server = start_hub()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        results = [run(mode, base_url, args.events) for mode in ("per-call", "pooled")]
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    for result in results:
+        print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+from pathlib import Path
+
+from healer import runner
+from healer.warm import WarmTestExecutor
+
+
+def write_suite(root: Path, tests: int, seed: int) -> float:
+    # Sleep-bound tests with a skewed duration mix: a few slow ones, many fast.
+    # Waiting rather than computing keeps the comparison meaningful on few cores.
+    rng = random.Random(seed)
+    durations = [round(rng.paretovariate(1.1) * 0.015, 3) for _ in range(tests)]
+    per_file = 10
+    for start in range(0, tests, per_file):
+        body = "import time\n"
+        for index in range(start, min(start + per_file, tests)):
+            body += f"\n\ndef test_{index}():\n    time.sleep({durations[index]})\n"
+        (root / f"test_suite_{start // per_file}.py").write_text(body)
+    # One failing test, so the merged result has something to classify.
+    (root / "test_zero.py").write_text("def test_zero():\n    assert 1 / 0\n")
+    return sum(durations)
+
+
+def timed_run(executor: WarmTestExecutor, root: Path, shards: int) -> dict[str, object]:
+    result = runner._run_tests(
+        junit_report=root / "junit.xml",
+        targets=["-pno:cacheprovider"],
+        executor=executor,
+        shards=shards,
+    )
+    assert result["failure"].failure_type.value == "ZERO_DIVISION", result["output"]
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sharded test runs: one process vs count- and duration-balanced shards")
+    parser.add_argument("--tests", type=int, default=200)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    # Shard every run, however short its recorded duration.
+    os.environ["HEALER_SHARD_MIN_SECONDS"] = "0"
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        total = write_suite(root, args.tests, args.seed)
+        runner.DURATIONS_FILE = root / "durations.json"
+        executor = WarmTestExecutor(root=root, preload=("pytest", "_pytest.junitxml"))
+        try:
+            # "count" shards without recorded durations, which splits by test count.
+            # The first single-process run records durations for "duration".
+            modes = (("single", 1, False), ("count", args.shards, False), ("duration", args.shards, True))
+            for mode, shards, recorded in modes:
+                seconds = []
+                for _ in range(args.runs):
+                    if not recorded and mode != "single":
+                        runner.DURATIONS_FILE.unlink(missing_ok=True)
+                    seconds.append(timed_run(executor, root, shards)["duration_seconds"])
+                print(
+                    json.dumps(
+                        {
+                            "mode": mode,
+                            "shards": shards,
+                            "tests": args.tests + 1,
+                            "sleep_seconds_total": round(total, 2),
+                            "median_seconds": round(statistics.median(seconds), 3),
+                            "cores": len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count(),
+                        }
+                    )
+                )
+        finally:
+            executor.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
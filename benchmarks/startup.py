@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# "eager" preloads the heal/report stack the way app.main used to at import time.
+VARIANTS = {
+    "lazy": "",
+    "eager": "import httpx, webhook.reporter, webhook.service, webhook.outbox, webhook.pipeline; ",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_healthy(variant: str, timeout: float) -> float:
+    port = _free_port()
+    code = (
+        f"{VARIANTS[variant]}import uvicorn; "
+        f"uvicorn.run('app.main:app', host='127.0.0.1', port={port}, log_level='warning')"
+    )
+    env = {**os.environ, "MISSION_CONTROL_OUTBOX_DIR": ""}
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env)
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"/healthz not ready within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def import_time_ms() -> float:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in process.stderr.splitlines():
+        if line.rstrip().endswith("| app.main"):
+            return int(line.split("|")[1]) / 1000
+    raise RuntimeError("app.main missing from -X importtime output")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure time from process start to first healthy /healthz")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="fail if the lazy median exceeds this")
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=["lazy", "eager"])
+    args = parser.parse_args()
+
+    print(json.dumps({"metric": "app_main_import_ms", "value": round(import_time_ms(), 1)}))
+
+    medians: dict[str, float] = {}
+    for variant in args.variants:
+        samples = [time_to_healthy(variant, args.timeout) for _ in range(args.runs)]
+        medians[variant] = statistics.median(samples)
+        print(
+            json.dumps(
+                {
+                    "variant": variant,
+                    "runs": args.runs,
+                    "median_seconds": round(medians[variant], 3),
+                    "max_seconds": round(max(samples), 3),
+                }
+            )
+        )
+
+    if "lazy" in medians and medians["lazy"] > args.max_seconds:
+        print(json.dumps({"error": f"median time to healthy above {args.max_seconds}s"}))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Files the injector and fixers edit; restored before every cycle.
+RESTORED = ("app/logic.py", "tests/test_compute.py")
+
+
+def scratch_copy(directory: Path) -> Path:
+    # Heal cycles edit the tree, so they run in a copy whose .venv points at
+    # this interpreter.
+    root = directory / "repo"
+    shutil.copytree(
+        ROOT,
+        root,
+        ignore=shutil.ignore_patterns(".git", ".venv", "artifacts", "__pycache__", ".pytest_cache"),
+    )
+    (root / ".venv" / "bin").mkdir(parents=True)
+    (root / ".venv" / "bin" / "python").symlink_to(sys.executable)
+    return root
+
+
+def heal_cycle(root: Path, warm: bool, bug_mode: str, verification: str, speculative: bool) -> dict[str, object]:
+    for name in RESTORED:
+        shutil.copyfile(ROOT / name, root / name)
+    env = {
+        **os.environ,
+        "HEALER_WARM_EXECUTOR": "1" if warm else "0",
+        "HEALER_FULL_VERIFICATION": verification,
+        "HEALER_SPECULATIVE_FIXES": "1" if speculative else "0",
+        "HEALER_SIGNATURE_CACHE_FILE": "",
+    }
+    subprocess.run(
+        [sys.executable, "-m", "healer.injector", "--mode", bug_mode],
+        cwd=root,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    started = time.perf_counter()
+    process = subprocess.run([sys.executable, "-m", "healer.runner"], cwd=root, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    incident = json.loads((root / "artifacts" / "incident_report.json").read_text())
+    if process.returncode != 0 or incident["status"] != "healed":
+        raise RuntimeError(f"heal cycle failed: {process.stdout}{process.stderr}")
+    return {
+        "seconds": elapsed,
+        "runs": [incident["tests_before"]["duration_seconds"]]
+        + [stage["duration_seconds"] for stage in incident["verification"]["stages"]],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Heal cycle time: a cold pytest subprocess per run vs a warm worker")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--bug-mode", choices=["zero_division", "none_type"], default="zero_division")
+    parser.add_argument(
+        "--verification",
+        choices=["sync", "off"],
+        default="sync",
+        help="sync includes the full-suite stage in the cycle; off stops after the targeted stage",
+    )
+    parser.add_argument(
+        "--speculative-fixes",
+        choices=["on", "off"],
+        default="on",
+        help="verify fix candidates in worktrees (on) or apply the fix in place (off)",
+    )
+    args = parser.parse_args()
+
+    medians: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        root = scratch_copy(Path(directory))
+        for mode in ("cold", "warm"):
+            speculative = args.speculative_fixes == "on"
+            cycles = [
+                heal_cycle(root, mode == "warm", args.bug_mode, args.verification, speculative) for _ in range(args.cycles)
+            ]
+            seconds = [cycle["seconds"] for cycle in cycles]
+            medians[mode] = statistics.median(seconds)
+            print(
+                json.dumps(
+                    {
+                        "mode": mode,
+                        "cycles": args.cycles,
+                        "median_cycle_seconds": round(medians[mode], 3),
+                        "min_cycle_seconds": round(min(seconds), 3),
+                        "median_test_run_seconds": [
+                            round(statistics.median(run), 3) for run in zip(*(cycle["runs"] for cycle in cycles))
+                        ],
+                    }
+                )
+            )
+    print(json.dumps({"metric": "warm_speedup", "value": round(medians["cold"] / medians["warm"], 2)}))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,145 @@
 from __future__ import annotations
 
+import mmap
+import os
 import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
 
 from healer.types import FailureInfo, FailureType
+from telemetry import histogram
+
+_CLASSIFY_SECONDS = histogram(
+    "healer_classify_duration_seconds",
+    "Time spent classifying failure output, by resulting failure type.",
+    ("failure_type",),
+)
 
 _FILE_LINE_RE = re.compile(r"(?P<file>[\w./-]+\.py):(?P<line>\d+)")
+_FILE_LINE_BYTES_RE = re.compile(_FILE_LINE_RE.pattern.encode())
+# pytest ends a long traceback with the innermost frame's location, "path:line: ExcType".
+# A line starting with "_" or "=" opens the next frame, test or section first.
+_CRASH_LINE_PATTERN = r"^(?:(?P<file>[\w./-]+\.py):(?P<line>\d+): [A-Z][\w.]*\r?$|[_=])"
+_CRASH_LINE_RE = re.compile(_CRASH_LINE_PATTERN, re.MULTILINE)
+_CRASH_LINE_BYTES_RE = re.compile(_CRASH_LINE_PATTERN.encode(), re.MULTILINE)
+
+# Log files are scanned through mmap one window at a time, and pages already
+# scanned are dropped again, so resident memory stays near one window.
+_LOG_WINDOW_BYTES = 32 * 1024 * 1024
+# Longest file:line reference the windowed regex search is guaranteed to see whole.
+_MAX_REFERENCE_BYTES = 4096
+
+
+@dataclass(frozen=True)
+class Rule:
+    failure_type: FailureType
+    # Every token must appear somewhere in the output; the first one anchors the
+    # nearest file:line lookup.
+    tokens: tuple[str, ...]
+    message: str
+
+
+# Ordered by priority: when several rules match, the earliest entry wins.
+RULES: tuple[Rule, ...] = (
+    Rule(
+        FailureType.ZERO_DIVISION,
+        ("ZeroDivisionError",),
+        "Detected division by zero from pytest output.",
+    ),
+    Rule(
+        FailureType.NONE_TYPE_ERROR,
+        ("TypeError", "NoneType"),
+        "Detected NoneType arithmetic TypeError from pytest output.",
+    ),
+    Rule(
+        FailureType.ASSERTION_FAILURE,
+        ("AssertionError",),
+        "Detected assertion failure from pytest output.",
+    ),
+)
+
+UNKNOWN_MESSAGE = "Could not classify pytest failure output."
+
+# Up to this many distinct tokens, lazy per-token str.find (a C substring search
+# that stops at the first hit) beats a regex alternation pass. Past it, one pass
+# is cheaper when most tokens are absent, since its cost barely grows with the
+# rule count (see benchmarks/classifier.py).
+_FIND_TOKEN_LIMIT = 32
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: tuple[Rule, ...]
+    tokens: tuple[str, ...]
+    pattern: re.Pattern[str] | None
+    # token -> the tokens it starts with (itself included), which occur wherever it does.
+    prefixes: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def compile(cls, rules: tuple[Rule, ...]) -> RuleSet:
+        tokens = tuple(dict.fromkeys(token for rule in rules for token in rule.tokens))
+        pattern = None
+        prefixes: dict[str, tuple[str, ...]] = {}
+        if len(tokens) > _FIND_TOKEN_LIMIT:
+            # Longest first, so at any offset the longest token matches; the shorter
+            # tokens it starts with are credited through `prefixes`.
+            pattern = re.compile("|".join(re.escape(token) for token in sorted(tokens, key=len, reverse=True)))
+            prefixes = {token: tuple(other for other in tokens if token.startswith(other)) for token in tokens}
+        return cls(rules=rules, tokens=tokens, pattern=pattern, prefixes=prefixes)
+
+    def match(self, output: str) -> tuple[Rule, int] | None:
+        # Returns the highest-priority matching rule and the offset of its first token.
+        if self.pattern is None:
+            # Tokens are searched lazily in priority order and remembered, so a
+            # token shared by several rules is scanned for at most once.
+            positions: dict[str, int] = {}
+            for rule in self.rules:
+                for token in rule.tokens:
+                    if token not in positions:
+                        positions[token] = output.find(token)
+                    if positions[token] == -1:
+                        break
+                else:
+                    return rule, positions[rule.tokens[0]]
+            return None
+
+        positions = {}
+        top_tokens = self.rules[0].tokens
+        # Each search resumes one character after the last match rather than at its
+        # end (as finditer would), so a token overlapping that match is still seen.
+        search = self.pattern.search
+        offset = 0
+        while True:
+            found = search(output, offset)
+            if found is None:
+                break
+            offset = found.start() + 1
+            token = found.group()
+            if token in positions:
+                continue
+            for prefix in self.prefixes[token]:
+                positions.setdefault(prefix, found.start())
+            # Nothing can outrank the top rule, so stop as soon as it is satisfied.
+            if len(positions) == len(self.tokens) or all(name in positions for name in top_tokens):
+                break
+        for rule in self.rules:
+            if all(token in positions for token in rule.tokens):
+                return rule, positions[rule.tokens[0]]
+        return None
+
+    def classify(self, output: str) -> FailureInfo:
+        matched = self.match(output)
+        if matched is None:
+            file, line = _extract_file_line(output)
+            return FailureInfo(failure_type=FailureType.UNKNOWN, file=file, line=line, message=UNKNOWN_MESSAGE)
+        rule, position = matched
+        file, line = _nearest_file_line(output, position)
+        return FailureInfo(failure_type=rule.failure_type, file=file, line=line, message=rule.message)
+
+
+DEFAULT_RULES = RuleSet.compile(RULES)
 
 
 def _extract_file_line(output: str) -> tuple[str | None, int | None]:
@@ -14,36 +149,244 @@ def _extract_file_line(output: str) -> tuple[str | None, int | None]:
     return match.group("file"), int(match.group("line"))
 
 
-def classify_pytest_output(output: str) -> FailureInfo:
-    file, line = _extract_file_line(output)
-
-    if "ZeroDivisionError" in output:
-        return FailureInfo(
-            failure_type=FailureType.ZERO_DIVISION,
-            file=file,
-            line=line,
-            message="Detected division by zero from pytest output.",
-        )
-
-    if "TypeError" in output and "NoneType" in output:
-        return FailureInfo(
-            failure_type=FailureType.NONE_TYPE_ERROR,
-            file=file,
-            line=line,
-            message="Detected NoneType arithmetic TypeError from pytest output.",
-        )
-
-    if "AssertionError" in output:
-        return FailureInfo(
-            failure_type=FailureType.ASSERTION_FAILURE,
-            file=file,
-            line=line,
-            message="Detected assertion failure from pytest output.",
-        )
-
-    return FailureInfo(
-        failure_type=FailureType.UNKNOWN,
-        file=file,
-        line=line,
-        message="Could not classify pytest failure output.",
-    )
+def _crash_file_line(output: str, position: int) -> tuple[str, int] | None:
+    match = _CRASH_LINE_RE.search(output, output.rfind("\n", 0, position) + 1)
+    if match is None or match.group("file") is None:
+        return None
+    return match.group("file"), int(match.group("line"))
+
+
+def _nearest_file_line(output: str, position: int) -> tuple[str | None, int | None]:
+    # The crash line after the signature names where it was raised; without one,
+    # walk back line by line to the closest file:line reference. Only the lines
+    # that contain ".py:" are ever handed to the regex.
+    crash = _crash_file_line(output, position)
+    if crash is not None:
+        return crash
+    end = position
+    while True:
+        marker = output.rfind(".py:", 0, end)
+        if marker == -1:
+            return _extract_file_line(output)
+        line_start = output.rfind("\n", 0, marker) + 1
+        line_end = output.find("\n", marker)
+        nearest = None
+        for match in _FILE_LINE_RE.finditer(output, line_start, len(output) if line_end == -1 else line_end):
+            if match.start() >= position:
+                break
+            nearest = match
+        if nearest is not None:
+            return nearest.group("file"), int(nearest.group("line"))
+        end = line_start if line_start < marker else marker
+
+
+def classify_pytest_output(output: str, rules: RuleSet = DEFAULT_RULES) -> FailureInfo:
+    started = time.perf_counter()
+    failure = rules.classify(output)
+    _CLASSIFY_SECONDS.labels(failure.failure_type.value).observe(time.perf_counter() - started)
+    return failure
+
+
+def classify_log_file(path: str | Path, rules: RuleSet = DEFAULT_RULES) -> FailureInfo:
+    # Same verdict as classify_pytest_output(Path(path).read_text()), without
+    # ever holding the log in a Python string.
+    started = time.perf_counter()
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            failure = rules.classify("")
+        else:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                failure = _classify_mapped(mapped, rules)
+    _CLASSIFY_SECONDS.labels(failure.failure_type.value).observe(time.perf_counter() - started)
+    return failure
+
+
+def _classify_mapped(mapped: mmap.mmap, rules: RuleSet) -> FailureInfo:
+    positions: dict[str, int] = {}
+    for rule in rules.rules:
+        for token in rule.tokens:
+            if token not in positions:
+                positions[token] = _find_mapped(mapped, token.encode())
+            if positions[token] == -1:
+                break
+        else:
+            file, line = _nearest_mapped_file_line(mapped, positions[rule.tokens[0]])
+            return FailureInfo(failure_type=rule.failure_type, file=file, line=line, message=rule.message)
+    file, line = _first_mapped_file_line(mapped)
+    return FailureInfo(failure_type=FailureType.UNKNOWN, file=file, line=line, message=UNKNOWN_MESSAGE)
+
+
+def _find_mapped(mapped: mmap.mmap, needle: bytes) -> int:
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = min(size, start + _LOG_WINDOW_BYTES)
+        position = mapped.find(needle, start, end)
+        if position != -1 or end == size:
+            return position
+        _release(mapped, start, end)
+        # Overlap so a token split across the window edge is still found.
+        start = end - len(needle) + 1
+    return -1
+
+
+def _crash_mapped_file_line(mapped: mmap.mmap, position: int) -> tuple[str, int] | None:
+    size = len(mapped)
+    lower = max(0, position - _MAX_REFERENCE_BYTES)
+    start = mapped.rfind(b"\n", lower, position) + 1 or lower
+    while start < size:
+        end = min(size, start + _LOG_WINDOW_BYTES)
+        match = _CRASH_LINE_BYTES_RE.search(mapped, start, end)
+        # A match touching the window edge may be cut short; retry it in the next window.
+        if match is not None and (match.end() < end or end == size):
+            if match.group("file") is None:
+                return None
+            return match.group("file").decode("utf-8", "replace"), int(match.group("line"))
+        if end == size:
+            return None
+        _release(mapped, start, end)
+        # Restart at the last line boundary so that line can still match.
+        start = max(start + 1, mapped.rfind(b"\n", end - _MAX_REFERENCE_BYTES, end) + 1 or end)
+    return None
+
+
+def _nearest_mapped_file_line(mapped: mmap.mmap, position: int) -> tuple[str | None, int | None]:
+    crash = _crash_mapped_file_line(mapped, position)
+    if crash is not None:
+        return crash
+    end = position
+    while end > 0:
+        start = max(0, end - _LOG_WINDOW_BYTES)
+        marker = mapped.rfind(b".py:", start, end)
+        if marker == -1:
+            _release(mapped, start, end)
+            end = start + 3 if start else 0
+            continue
+        lower = max(0, marker - _MAX_REFERENCE_BYTES)
+        upper = min(len(mapped), marker + _MAX_REFERENCE_BYTES)
+        line_start = mapped.rfind(b"\n", lower, marker) + 1 or lower
+        line_end = mapped.find(b"\n", marker, upper)
+        window = mapped[line_start : upper if line_end == -1 else line_end]
+        nearest = None
+        for match in _FILE_LINE_BYTES_RE.finditer(window):
+            if line_start + match.start() >= position:
+                break
+            nearest = match
+        if nearest is not None:
+            return nearest.group("file").decode("utf-8", "replace"), int(nearest.group("line"))
+        end = marker
+    return _first_mapped_file_line(mapped)
+
+
+def _first_mapped_file_line(mapped: mmap.mmap) -> tuple[str | None, int | None]:
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = min(size, start + _LOG_WINDOW_BYTES)
+        match = _FILE_LINE_BYTES_RE.search(mapped, start, end)
+        # A match touching the window edge may be cut short; retry it in the next window.
+        if match is not None and (match.end() < end or end == size):
+            return match.group("file").decode("utf-8", "replace"), int(match.group("line"))
+        if end == size:
+            return None, None
+        _release(mapped, start, end)
+        start = max(start + 1, end - _MAX_REFERENCE_BYTES)
+    return None, None
+
+
+def _release(mapped: mmap.mmap, start: int, end: int) -> None:
+    if not hasattr(mapped, "madvise"):  # pragma: no cover - madvise is missing on Windows
+        return
+    aligned = start - start % mmap.PAGESIZE
+    mapped.madvise(mmap.MADV_DONTNEED, aligned, end - aligned)
+
+
+@dataclass
+class StreamingClassifier:
+    # Classifies output line by line while the test run is still going. Only a
+    # bounded tail of the output is kept for the incident report.
+    rules: RuleSet = DEFAULT_RULES
+    tail_lines: int = 200
+    lines_seen: int = field(default=0, init=False)
+    _tail: deque[str] = field(init=False, repr=False)
+    _anchors: dict[str, tuple[str | None, int | None]] = field(default_factory=dict, init=False, repr=False)
+    # Anchored tokens still waiting for the crash line that ends their traceback.
+    _awaiting_crash: list[str] = field(default_factory=list, init=False, repr=False)
+    _first_file_line: tuple[str | None, int | None] = field(default=(None, None), init=False, repr=False)
+    _last_file_line: tuple[str | None, int | None] = field(default=(None, None), init=False, repr=False)
+    _emitted: set[FailureType] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._tail = deque(maxlen=self.tail_lines)
+
+    def feed(self, line: str) -> FailureInfo | None:
+        # Returns a failure the first time a rule becomes satisfied, or None.
+        self.lines_seen += 1
+        self._tail.append(line)
+
+        references: list[tuple[int, str, int]] = []
+        if ".py:" in line:
+            references = [
+                (match.start(), match.group("file"), int(match.group("line"))) for match in _FILE_LINE_RE.finditer(line)
+            ]
+            if references and self._first_file_line == (None, None):
+                self._first_file_line = references[0][1:]
+
+        new_tokens = False
+        for token in self.rules.tokens:
+            if token in self._anchors:
+                continue
+            offset = line.find(token)
+            if offset == -1:
+                continue
+            anchor = self._last_file_line
+            for start, file, number in references:
+                if start < offset:
+                    anchor = (file, number)
+            self._anchors[token] = anchor
+            self._awaiting_crash.append(token)
+            new_tokens = True
+
+        if references:
+            self._last_file_line = references[-1][1:]
+        if self._awaiting_crash:
+            crash = _CRASH_LINE_RE.match(line)
+            if crash is not None:
+                if crash.group("file") is not None:
+                    for token in self._awaiting_crash:
+                        self._anchors[token] = (crash.group("file"), int(crash.group("line")))
+                self._awaiting_crash.clear()
+
+        if not new_tokens:
+            return None
+        for rule in self.rules.rules:
+            if rule.failure_type in self._emitted or not self._satisfied(rule):
+                continue
+            self._emitted.add(rule.failure_type)
+            return self._failure(rule)
+        return None
+
+    def result(self) -> FailureInfo:
+        # Final verdict once the stream ends, with the same priority as classify().
+        started = time.perf_counter()
+        for rule in self.rules.rules:
+            if self._satisfied(rule):
+                failure = self._failure(rule)
+                break
+        else:
+            file, line = self._first_file_line
+            failure = FailureInfo(failure_type=FailureType.UNKNOWN, file=file, line=line, message=UNKNOWN_MESSAGE)
+        _CLASSIFY_SECONDS.labels(failure.failure_type.value).observe(time.perf_counter() - started)
+        return failure
+
+    def tail(self) -> str:
+        return "\n".join(self._tail)
+
+    def _satisfied(self, rule: Rule) -> bool:
+        return all(token in self._anchors for token in rule.tokens)
+
+    def _failure(self, rule: Rule) -> FailureInfo:
+        file, line = self._anchors[rule.tokens[0]]
+        if file is None:
+            file, line = self._first_file_line
+        return FailureInfo(failure_type=rule.failure_type, file=file, line=line, message=rule.message)
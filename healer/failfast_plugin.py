@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+# Loaded with `pytest -p healer.failfast_plugin`, which _run_tests adds for
+# fail-fast runs. pytest prints tracebacks only in the end-of-run summary, so
+# each failure's crash line is also printed as the test fails, in --tb=line
+# form, for the streaming classifier to stop the run on.
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config: pytest.Config) -> None:
+    # After the terminal reporter has registered itself.
+    terminal = config.pluginmanager.get_plugin("terminalreporter")
+    if terminal is not None:
+        config.pluginmanager.register(_CrashLines(terminal, config.rootpath), "healer-crash-lines")
+
+
+class _CrashLines:
+    def __init__(self, terminal: pytest.TerminalReporter, root: Path) -> None:
+        self.terminal = terminal
+        self.root = root
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        crash = getattr(report.longrepr, "reprcrash", None)
+        if not report.failed or crash is None:
+            return
+        path = Path(crash.path)
+        try:
+            path = path.relative_to(self.root)
+        except ValueError:
+            pass
+        message = (crash.message.splitlines() or [""])[0]
+        self.terminal.write_line(f"{path.as_posix()}:{crash.lineno}: {message}")
+        self.terminal.flush()
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import os
+import subprocess
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
 
+from healer.locks import file_locks
 from healer.types import FailureInfo, FailureType
+from telemetry import histogram
+
+_FIX_SECONDS = histogram(
+    "healer_fix_duration_seconds",
+    "Time spent applying a fix, including lock waits, by failure type.",
+    ("failure_type",),
+)
 
 ROOT = Path(__file__).resolve().parents[1]
 LOGIC_FILE = ROOT / "app" / "logic.py"
@@ -38,8 +50,16 @@ def test_logic_none_type_regression():
 """
 
 
-def _restore_guard(guard: str, anchor: str) -> bool:
-    source = LOGIC_FILE.read_text()
+def _files(root: Path | None) -> tuple[Path, Path]:
+    # Looked up at call time: a candidate worktree passes its own root, and
+    # without one the module paths (which tests may patch) apply.
+    if root is None:
+        return LOGIC_FILE, TEST_FILE
+    return root / "app" / "logic.py", root / "tests" / "test_compute.py"
+
+
+def _restore_guard(guard: str, anchor: str, logic_file: Path) -> bool:
+    source = logic_file.read_text()
     if guard in source:
         return False
 
@@ -47,38 +67,131 @@ def _restore_guard(guard: str, anchor: str) -> bool:
         raise ValueError(f"anchor not found while restoring guard: {anchor}")
 
     source = source.replace(anchor, guard + anchor)
-    LOGIC_FILE.write_text(source)
+    write_atomically(logic_file, source)
     return True
 
 
-def _ensure_regression_test(snippet: str, test_name: str) -> bool:
-    source = TEST_FILE.read_text()
+def _ensure_regression_test(snippet: str, test_name: str, test_file: Path) -> bool:
+    source = test_file.read_text()
     if test_name in source:
         return False
 
-    TEST_FILE.write_text(source.rstrip() + "\n" + snippet.strip() + "\n")
+    write_atomically(test_file, source.rstrip() + "\n" + snippet.strip() + "\n")
     return True
 
 
-def apply_fix(failure: FailureInfo) -> list[Path]:
+def write_atomically(path: Path, source: str) -> None:
+    # Temp file in the same directory, then a rename: a worker killed mid-write
+    # leaves the old file or the new one, never a truncated module.
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        temporary.write_text(source)
+        if path.exists():
+            os.chmod(temporary, path.stat().st_mode & 0o777)
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def fix_targets(failure: FailureInfo, root: Path | None = None) -> list[Path]:
+    if failure.failure_type in _GUARDED:
+        return list(_files(root))
+    return []
+
+
+def apply_fix(failure: FailureInfo, root: Path | None = None) -> list[Path]:
+    with _FIX_SECONDS.labels(failure.failure_type.value).time():
+        with file_locks().hold(fix_targets(failure, root)):
+            return _apply_fix(failure, root)
+
+
+def _apply_fix(failure: FailureInfo, root: Path | None) -> list[Path]:
     changed: list[Path] = []
+    logic_file, test_file = _files(root)
 
     if failure.failure_type == FailureType.ZERO_DIVISION:
-        if _restore_guard(ZERO_GUARD, "    return numerator / denominator\n"):
-            changed.append(LOGIC_FILE)
+        if _restore_guard(ZERO_GUARD, "    return numerator / denominator\n", logic_file):
+            changed.append(logic_file)
         if _ensure_regression_test(
-            ZERO_REGRESSION_TEST, "test_logic_zero_division_regression"
+            ZERO_REGRESSION_TEST, "test_logic_zero_division_regression", test_file
         ):
-            changed.append(TEST_FILE)
+            changed.append(test_file)
         return changed
 
     if failure.failure_type == FailureType.NONE_TYPE_ERROR:
-        if _restore_guard(NONE_GUARD, "    return numerator / denominator\n"):
-            changed.append(LOGIC_FILE)
+        if _restore_guard(NONE_GUARD, "    return numerator / denominator\n", logic_file):
+            changed.append(logic_file)
         if _ensure_regression_test(
-            NONE_REGRESSION_TEST, "test_logic_none_type_regression"
+            NONE_REGRESSION_TEST, "test_logic_none_type_regression", test_file
         ):
-            changed.append(TEST_FILE)
+            changed.append(test_file)
         return changed
 
     return changed
+
+
+_GUARDED = (FailureType.ZERO_DIVISION, FailureType.NONE_TYPE_ERROR)
+
+
+@dataclass(frozen=True)
+class FixCandidate:
+    # One way to heal a run's failures. apply() edits the tree under the given
+    # root and returns the files it changed.
+    name: str
+    apply: Callable[[Path], list[Path]]
+
+
+def fix_candidates(failures: list[FailureInfo], revert: bool = False) -> list[FixCandidate]:
+    # In order of preference:
+    # - guard: the fixer for each failure type in the run.
+    # - all_guards: every guard, for a second bug hidden behind the first.
+    # - revert (only when asked for): the files the failures point at, restored
+    #   to their committed version. It discards uncommitted work in them.
+    candidates = [FixCandidate("guard", lambda root: _apply_all(failures, root))]
+    seen = {failure.failure_type for failure in failures}
+    missing = [failure_type for failure_type in _GUARDED if failure_type not in seen]
+    if missing and seen & set(_GUARDED):
+        extra = [FailureInfo(failure_type=failure_type) for failure_type in missing]
+        candidates.append(FixCandidate("all_guards", lambda root: _apply_all([*failures, *extra], root)))
+    committed = _committed_sources(failures) if revert else {}
+    if committed:
+        candidates.append(FixCandidate("revert", lambda root: _write_sources(committed, root)))
+    return candidates
+
+
+def _apply_all(failures: list[FailureInfo], root: Path) -> list[Path]:
+    changed: list[Path] = []
+    for failure in failures:
+        changed.extend(path for path in apply_fix(failure, root) if path not in changed)
+    return changed
+
+
+def _committed_sources(failures: list[FailureInfo]) -> dict[str, str]:
+    # Repo-relative path -> HEAD's content, for failing files that differ from it.
+    sources: dict[str, str] = {}
+    for relative in dict.fromkeys(failure.file for failure in failures if failure.file):
+        path = ROOT / relative
+        if not path.is_file():
+            continue
+        try:
+            committed = subprocess.run(
+                ["git", "show", f"HEAD:{path.relative_to(ROOT).as_posix()}"],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        except (OSError, ValueError, subprocess.CalledProcessError):
+            continue
+        if committed != path.read_text():
+            sources[path.relative_to(ROOT).as_posix()] = committed
+    return sources
+
+
+def _write_sources(sources: dict[str, str], root: Path) -> list[Path]:
+    paths = [root / relative for relative in sources]
+    with file_locks().hold(paths):
+        for path, source in zip(paths, sources.values()):
+            write_atomically(path, source)
+    return paths
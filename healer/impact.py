@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_INDEX_FILE = ROOT / "artifacts" / "test_impact.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT);
+CREATE TABLE IF NOT EXISTS tests (id INTEGER PRIMARY KEY, node_id TEXT UNIQUE NOT NULL, file TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS spans (
+    file TEXT NOT NULL, first_line INTEGER NOT NULL, last_line INTEGER NOT NULL, test INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spans_by_line ON spans (file, first_line);
+CREATE INDEX IF NOT EXISTS spans_by_test ON spans (test);
+"""
+
+_TABLES = ("tests", "files", "spans")
+
+# file -> line ranges one test executed in it
+Spans = dict[str, list[tuple[int, int]]]
+
+
+def line_spans(executed: Iterable[int], statements: Iterable[int]) -> list[tuple[int, int]]:
+    # Runs of executed lines with no unexecuted statement between them, so one
+    # span also covers the blank and comment lines inside a function body.
+    executed = set(executed)
+    statements = sorted(set(statements))
+    spans: list[tuple[int, int]] = []
+    start: int | None = None
+    end = 0
+    for statement in statements:
+        if statement in executed:
+            if start is None:
+                start = statement
+            end = statement
+        elif start is not None:
+            spans.append((start, end))
+            start = None
+    if start is not None:
+        spans.append((start, end))
+    spans.extend((line, line) for line in executed.difference(statements))
+    return sorted(spans)
+
+
+def is_test_file(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return path.startswith("tests/") and name.startswith("test_") and name.endswith(".py")
+
+
+@dataclass
+class ImpactIndex:
+    # Source line ranges -> the tests that executed them, from per-test coverage
+    # contexts. Paths are relative to the project root, so one index answers for
+    # the real tree and for candidate worktrees alike.
+    path: Path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def create(self) -> None:
+        with self._connect() as db:
+            # WAL lets heals query the index while it is being updated.
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    def clear(self) -> None:
+        with self._connect() as db:
+            db.execute("DELETE FROM spans")
+            db.execute("DELETE FROM tests")
+            db.execute("DELETE FROM files")
+
+    def record(self, coverage: dict[str, Spans], root: Path, files: Iterable[str] = ()) -> None:
+        # Replaces everything recorded for these tests. Files seen for the first
+        # time get a fingerprint; known ones keep theirs until refresh() has re-run
+        # every test that covers them and passes them as files.
+        self.create()
+        with self._connect() as db:
+            for node_id, spans in coverage.items():
+                row = db.execute("SELECT id FROM tests WHERE node_id = ?", (node_id,)).fetchone()
+                if row is None:
+                    test = db.execute(
+                        "INSERT INTO tests (node_id, file) VALUES (?, ?)", (node_id, node_id.split("::", 1)[0])
+                    ).lastrowid
+                else:
+                    test = row[0]
+                    db.execute("DELETE FROM spans WHERE test = ?", (test,))
+                db.executemany(
+                    "INSERT INTO spans (file, first_line, last_line, test) VALUES (?, ?, ?, ?)",
+                    [(file, first, last, test) for file, ranges in spans.items() for first, last in ranges],
+                )
+            seen = {file for spans in coverage.values() for file in spans}
+            db.executemany(
+                "INSERT OR IGNORE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                [(file, *_fingerprint(root / file)) for file in sorted(seen) if (root / file).exists()],
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                [(file, *_fingerprint(root / file)) for file in files if (root / file).exists()],
+            )
+
+    def tests_for(self, locations: dict[str, set[int] | None], root: Path = ROOT) -> list[str] | None:
+        # Node ids that executed any of the given lines, or anything in a file
+        # given None. Lines only count while the file still matches what was
+        # recorded; after an edit the whole file is looked up. None when a file
+        # was never recorded, since the index cannot rule any test out for it.
+        if not self.path.exists():
+            return None
+        selected: dict[int, str] = {}
+        with self._connect() as db:
+            for file, lines in locations.items():
+                row = db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (file,)).fetchone()
+                if row is None:
+                    return None
+                if lines is None or not _unchanged(root / file, row):
+                    rows = db.execute(
+                        "SELECT DISTINCT t.id, t.node_id FROM spans s JOIN tests t ON t.id = s.test WHERE s.file = ?",
+                        (file,),
+                    )
+                    selected.update(rows.fetchall())
+                    continue
+                for line in lines:
+                    rows = db.execute(
+                        "SELECT DISTINCT t.id, t.node_id FROM spans s JOIN tests t ON t.id = s.test"
+                        " WHERE s.file = ? AND s.first_line <= ? AND s.last_line >= ?",
+                        (file, line, line),
+                    )
+                    selected.update(rows.fetchall())
+        return [selected[test] for test in sorted(selected)]
+
+    def stale(self, root: Path = ROOT) -> tuple[list[str], list[str]]:
+        # (recorded files that changed or disappeared, pytest targets to re-run):
+        # changed and new test files as a whole, plus every other test that
+        # executed a changed file.
+        with self._connect() as db:
+            recorded = db.execute("SELECT path, size, mtime_ns, digest FROM files").fetchall()
+            test_files = {file for (file,) in db.execute("SELECT DISTINCT file FROM tests")}
+            changed = [path for path, *row in recorded if not _unchanged(root / path, tuple(row))]
+            on_disk = {path.relative_to(root).as_posix() for path in (root / "tests").rglob("test_*.py")}
+            edited = {path for path in changed if is_test_file(path) and path in on_disk}
+            files = sorted(edited | (on_disk - test_files))
+            nodes: dict[str, None] = {}
+            for path in changed:
+                rows = db.execute(
+                    "SELECT DISTINCT t.id, t.node_id, t.file FROM spans s JOIN tests t ON t.id = s.test"
+                    " WHERE s.file = ? ORDER BY t.id",
+                    (path,),
+                )
+                for _, node_id, file in rows:
+                    if file not in files and file in on_disk:
+                        nodes[node_id] = None
+        return changed, [*files, *nodes]
+
+    def forget(self, test_files: Iterable[str]) -> None:
+        # Drops the tests of test files about to be re-run whole, so tests removed
+        # from them go too.
+        with self._connect() as db:
+            for test_file in test_files:
+                db.execute("DELETE FROM spans WHERE test IN (SELECT id FROM tests WHERE file = ?)", (test_file,))
+                db.execute("DELETE FROM tests WHERE file = ?", (test_file,))
+
+    def prune(self, root: Path = ROOT) -> None:
+        # Tests and files that no longer exist.
+        with self._connect() as db:
+            for (file,) in db.execute("SELECT DISTINCT file FROM tests").fetchall():
+                if not (root / file).exists():
+                    db.execute("DELETE FROM spans WHERE test IN (SELECT id FROM tests WHERE file = ?)", (file,))
+                    db.execute("DELETE FROM tests WHERE file = ?", (file,))
+            for (path,) in db.execute("SELECT path FROM files").fetchall():
+                if not (root / path).exists():
+                    db.execute("DELETE FROM spans WHERE file = ?", (path,))
+                    db.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def stats(self) -> dict[str, int]:
+        if not self.path.exists():
+            return {"tests": 0, "files": 0, "spans": 0, "bytes": 0}
+        with self._connect() as db:
+            counts = {table: db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in _TABLES}
+        return {**counts, "bytes": self.path.stat().st_size}
+
+
+def impact_index() -> ImpactIndex | None:
+    # HEALER_IMPACT_INDEX (default artifacts/test_impact.sqlite); None until one
+    # has been built, or when set to an empty string.
+    path = os.getenv("HEALER_IMPACT_INDEX", str(DEFAULT_INDEX_FILE))
+    if not path or not Path(path).exists():
+        return None
+    return ImpactIndex(Path(path))
+
+
+def refresh(index: ImpactIndex, root: Path = ROOT, full: bool = False) -> dict[str, object]:
+    # Re-runs only what changed since the index was recorded, under coverage, and
+    # records it. A missing or empty index (or full=True) records the whole suite.
+    started = time.perf_counter()
+    index.create()
+    if full or index.stats()["tests"] == 0:
+        index.clear()
+        changed, targets = [], []
+        mode = "full"
+    else:
+        index.prune(root)
+        changed, targets = index.stale(root)
+        mode = "incremental"
+        if not targets:
+            index.record({}, root, changed)
+            return {"mode": mode, "changed_files": changed, "targets": 0, "seconds": 0.0, **index.stats()}
+        index.forget(target for target in targets if "::" not in target)
+
+    pythonpath = [entry for entry in (os.getenv("PYTHONPATH", ""), str(ROOT)) if entry]
+    returncode = subprocess.run(
+        [sys.executable, "-m", "pytest", "-p", "healer.impact_plugin", f"--impact-index={index.path}", *targets],
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(pythonpath)},
+        stdout=subprocess.DEVNULL,
+        check=False,
+    ).returncode
+    # Every test that executed a changed file has been re-recorded by now.
+    index.record({}, root, changed)
+    return {
+        "mode": mode,
+        "changed_files": changed,
+        "targets": len(targets),
+        "returncode": returncode,
+        "seconds": round(time.perf_counter() - started, 3),
+        **index.stats(),
+    }
+
+
+def _fingerprint(path: Path) -> tuple[int, int, str]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns, hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _unchanged(path: Path, recorded: tuple[int, int, str]) -> bool:
+    # Size and mtime first; the digest only when they differ (a checkout or `touch`).
+    size, mtime_ns, digest = recorded
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    return hashlib.sha256(path.read_bytes()).hexdigest() == digest
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or update the coverage-based test-impact index")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        help="index file (default: HEALER_IMPACT_INDEX, else artifacts/test_impact.sqlite)",
+    )
+    parser.add_argument("--full", action="store_true", help="re-record the whole suite instead of what changed")
+    args = parser.parse_args(argv)
+    index = ImpactIndex(args.index or Path(os.getenv("HEALER_IMPACT_INDEX") or DEFAULT_INDEX_FILE))
+    result = refresh(index, full=args.full)
+    print(json.dumps(result))
+    # Failing tests are still recorded; only a broken run (usage, internal error) fails the build.
+    return 0 if result.get("returncode", 0) in {0, 1, 5} else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
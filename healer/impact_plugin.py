@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from healer.impact import ImpactIndex, Spans, line_spans
+
+# Loaded with `pytest -p healer.impact_plugin --impact-index=PATH`, which is what
+# `python -m healer.impact` runs. Needs coverage (`pip install -e ".[impact]"`).
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption("--impact-index", help="record which lines each test executes into this test-impact index")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    path = config.getoption("--impact-index")
+    if not path:
+        return
+    try:
+        import coverage
+    except ImportError as exc:
+        raise pytest.UsageError('--impact-index needs coverage: pip install -e ".[impact]"') from exc
+    config.pluginmanager.register(_Recorder(ImpactIndex(Path(path)), config.rootpath, coverage), "impact-recorder")
+
+
+class _Recorder:
+    def __init__(self, index: ImpactIndex, root: Path, coverage: Any) -> None:
+        self.index = index
+        self.root = root
+        self.node_ids: list[str] = []
+        # Project code only; module-level lines run at collection and stay out of
+        # any test's context.
+        self.coverage = coverage.Coverage(
+            data_file=None,
+            source=[str(root)],
+            omit=[str(root / ".venv" / "*")],
+            config_file=False,
+        )
+        self.coverage.start()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: pytest.Item | None) -> Any:
+        # Setup and teardown count too, so fixture code maps to the tests using it.
+        self.node_ids.append(item.nodeid)
+        self.coverage.switch_context(item.nodeid)
+        yield
+        self.coverage.switch_context("")
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        self.coverage.stop()
+        data = self.coverage.get_data()
+        # Tests that executed nothing in the project are recorded too, so they are
+        # not mistaken for new ones on the next update.
+        recorded: dict[str, Spans] = {node_id: {} for node_id in self.node_ids}
+        for measured in data.measured_files():
+            try:
+                file = Path(measured).resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                continue
+            by_test: dict[str, list[int]] = {}
+            for line, contexts in data.contexts_by_lineno(measured).items():
+                for context in contexts:
+                    if context in recorded:
+                        by_test.setdefault(context, []).append(line)
+            if not by_test:
+                continue
+            statements = self.coverage.analysis2(measured)[1]
+            for node_id, lines in by_test.items():
+                recorded[node_id][file] = line_spans(lines, statements)
+        self.index.record(recorded, self.root)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from telemetry import histogram
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms only get in-process locking
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_LOCK_DIR = Path(tempfile.gettempdir()) / "self_healing_locks"
+
+_LOCK_WAIT_SECONDS = histogram(
+    "healer_lock_wait_seconds",
+    "Time spent waiting for fix concurrency slots and file locks.",
+)
+
+
+@dataclass
+class FileLockManager:
+    lock_dir: Path | None = DEFAULT_LOCK_DIR
+    max_concurrent: int = 4
+    _guard: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _locks: dict[str, threading.Lock] = field(default_factory=dict, init=False, repr=False)
+    _slots: threading.BoundedSemaphore = field(init=False, repr=False)
+    _stats: dict[str, float] = field(
+        default_factory=lambda: {
+            "acquisitions": 0,
+            "contended": 0,
+            "active": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        },
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        if self.lock_dir is not None:
+            self.lock_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def hold(self, paths: Iterable[Path]) -> Iterator[None]:
+        # Sorting gives every caller the same acquisition order, so overlapping
+        # path sets cannot deadlock against each other.
+        keys = sorted({str(Path(path).resolve()) for path in paths})
+        started = time.perf_counter()
+        contended = False
+
+        with ExitStack() as stack:
+            if not self._slots.acquire(blocking=False):
+                contended = True
+                self._slots.acquire()
+            stack.callback(self._slots.release)
+
+            for key in keys:
+                lock = self._lock_for(key)
+                if not lock.acquire(blocking=False):
+                    contended = True
+                    lock.acquire()
+                stack.callback(lock.release)
+                if self.lock_dir is not None and fcntl is not None:
+                    contended |= self._flock(stack, key)
+
+            self._record_acquired(time.perf_counter() - started, contended)
+            try:
+                yield
+            finally:
+                with self._guard:
+                    self._stats["active"] -= 1
+
+    def stats(self) -> dict[str, float]:
+        with self._guard:
+            stats = dict(self._stats)
+            stats["files"] = len(self._locks)
+        stats["max_concurrent"] = self.max_concurrent
+        return stats
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _flock(self, stack: ExitStack, key: str) -> bool:
+        # Sidecar lock files serialize heals across worker processes as well as threads.
+        assert self.lock_dir is not None
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        sidecar = self.lock_dir / f"{Path(key).name}.{digest}.lock"
+        fd = os.open(sidecar, os.O_RDWR | os.O_CREAT, 0o644)
+        stack.callback(os.close, fd)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            contended = False
+        except BlockingIOError:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            contended = True
+        stack.callback(fcntl.flock, fd, fcntl.LOCK_UN)
+        return contended
+
+    def _record_acquired(self, waited: float, contended: bool) -> None:
+        _LOCK_WAIT_SECONDS.observe(waited)
+        with self._guard:
+            self._stats["acquisitions"] += 1
+            self._stats["active"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            if contended:
+                self._stats["contended"] += 1
+
+
+_MANAGER: FileLockManager | None = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def file_locks() -> FileLockManager:
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            lock_dir = os.getenv("HEALER_LOCK_DIR", str(DEFAULT_LOCK_DIR))
+            _MANAGER = FileLockManager(
+                lock_dir=Path(lock_dir) if lock_dir else None,
+                max_concurrent=int(os.getenv("HEALER_MAX_CONCURRENT_FIXES", "4")),
+            )
+        return _MANAGER
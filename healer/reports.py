@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import io
+import json
+import re
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from pathlib import Path
+from typing import IO, Any
+
+from healer.classifier import _FILE_LINE_RE, DEFAULT_RULES, RuleSet
+from healer.types import FailureInfo, FailureType
+
+_EXCEPTION_RE = re.compile(r"^\s*(?:E\s+)?(?P<type>[A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt))\b")
+_FAILED_OUTCOMES = {"failed", "error"}
+_CHUNK_SIZE = 64 * 1024
+
+
+def parse_junit_xml(source: str | Path | IO[bytes], rules: RuleSet = DEFAULT_RULES) -> list[FailureInfo]:
+    # iterparse hands over one <testcase> at a time; clearing it afterwards keeps
+    # memory flat however many passing tests the report holds.
+    failures: list[FailureInfo] = []
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag != "testcase":
+            continue
+        problem = element.find("failure")
+        if problem is None:
+            problem = element.find("error")
+        if problem is not None:
+            failures.append(
+                _failure(
+                    rules,
+                    node_id=_junit_node_id(element),
+                    message=problem.get("message") or "",
+                    details=problem.text or "",
+                )
+            )
+        element.clear()
+    return failures
+
+
+def junit_durations(source: str | Path | IO[bytes]) -> dict[str, float]:
+    # node id -> seconds, from the "time" attribute pytest writes per testcase.
+    durations: dict[str, float] = {}
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag != "testcase":
+            continue
+        try:
+            durations[_junit_node_id(element)] = float(element.get("time") or 0.0)
+        except ValueError:
+            pass
+        element.clear()
+    return durations
+
+
+def parse_pytest_json_report(
+    source: str | Path | IO[str] | dict[str, Any],
+    rules: RuleSet = DEFAULT_RULES,
+) -> list[FailureInfo]:
+    tests: Iterable[dict[str, Any]]
+    if isinstance(source, dict):
+        tests = source.get("tests") or []
+    elif isinstance(source, (str, Path)):
+        with open(source, encoding="utf-8") as handle:
+            return parse_pytest_json_report(handle, rules)
+    else:
+        tests = _iter_json_report_tests(source)
+
+    failures: list[FailureInfo] = []
+    for test in tests:
+        if test.get("outcome") not in _FAILED_OUTCOMES:
+            continue
+        stage = _failed_stage(test)
+        crash = stage.get("crash") or {}
+        longrepr = stage.get("longrepr")
+        failure = _failure(
+            rules,
+            node_id=test.get("nodeid"),
+            message=crash.get("message") or "",
+            details=longrepr if isinstance(longrepr, str) else "",
+        )
+        if crash.get("path"):
+            failure = replace(failure, file=crash["path"], line=crash.get("lineno"))
+        failures.append(failure)
+    return failures
+
+
+def parse_report(path: str | Path, rules: RuleSet = DEFAULT_RULES) -> list[FailureInfo]:
+    path = Path(path)
+    if path.suffix == ".xml":
+        return parse_junit_xml(path, rules)
+    return parse_pytest_json_report(path, rules)
+
+
+def failures_from_payload(payload: dict[str, Any], rules: RuleSet = DEFAULT_RULES) -> list[FailureInfo] | None:
+    # Returns None when the payload carries no machine-readable report.
+    junit = payload.get("junitXml")
+    if isinstance(junit, str) and junit.strip():
+        return parse_junit_xml(io.BytesIO(junit.encode("utf-8")), rules)
+    report = payload.get("pytestJsonReport")
+    if isinstance(report, dict):
+        return parse_pytest_json_report(report, rules)
+    if isinstance(report, str) and report.strip():
+        return parse_pytest_json_report(io.StringIO(report), rules)
+    return None
+
+
+def distinct_failures(failures: list[FailureInfo], rules: RuleSet = DEFAULT_RULES) -> list[FailureInfo]:
+    # One failure per matched rule, highest priority first; the earliest failure
+    # in the report represents its type. Fixers run once per entry.
+    priority = {rule.failure_type: index for index, rule in enumerate(rules.rules)}
+    first: dict[FailureType, FailureInfo] = {}
+    for failure in failures:
+        if failure.failure_type in priority:
+            first.setdefault(failure.failure_type, failure)
+    return sorted(first.values(), key=lambda failure: priority[failure.failure_type])
+
+
+def primary_failure(failures: list[FailureInfo], rules: RuleSet = DEFAULT_RULES) -> FailureInfo:
+    distinct = distinct_failures(failures, rules)
+    if distinct:
+        return distinct[0]
+    if failures:
+        return failures[0]
+    return FailureInfo(failure_type=FailureType.UNKNOWN, message="Report contains no failing tests.")
+
+
+def _failure(rules: RuleSet, node_id: str | None, message: str, details: str) -> FailureInfo:
+    text = f"{message}\n{details}" if details else message
+    failure = rules.classify(text)
+    # pytest ends a long traceback with the crash location of the innermost frame.
+    crash = _last_file_line(details)
+    if crash is not None:
+        failure = replace(failure, file=crash[0], line=crash[1])
+    return replace(failure, node_id=node_id, exception_type=_exception_type(message, details))
+
+
+def _exception_type(message: str, details: str) -> str | None:
+    match = _EXCEPTION_RE.match(message)
+    if match:
+        return match.group("type")
+    for line in reversed(details.splitlines()):
+        if line.startswith("E"):
+            match = _EXCEPTION_RE.match(line)
+            if match:
+                return match.group("type")
+    return None
+
+
+def _last_file_line(text: str) -> tuple[str, int] | None:
+    marker = text.rfind(".py:")
+    if marker == -1:
+        return None
+    line_start = text.rfind("\n", 0, marker) + 1
+    line_end = text.find("\n", marker)
+    matches = list(_FILE_LINE_RE.finditer(text, line_start, len(text) if line_end == -1 else line_end))
+    if not matches:
+        return None
+    return matches[-1].group("file"), int(matches[-1].group("line"))
+
+
+def _junit_node_id(testcase: ET.Element) -> str:
+    # pytest writes classname as "pkg.module.Class"; the module part becomes a
+    # path again unless the report carries a file attribute.
+    module: list[str] = []
+    classes: list[str] = []
+    for part in testcase.get("classname", "").split("."):
+        if part:
+            (classes if classes or part[:1].isupper() else module).append(part)
+    path = testcase.get("file") or ("/".join(module) + ".py" if module else "")
+    return "::".join(part for part in (path, *classes, testcase.get("name", "")) if part)
+
+
+def _failed_stage(test: dict[str, Any]) -> dict[str, Any]:
+    for stage_name in ("call", "setup", "teardown"):
+        stage = test.get(stage_name)
+        if isinstance(stage, dict) and stage.get("outcome") in _FAILED_OUTCOMES:
+            return stage
+    return test.get("call") or {}
+
+
+def _iter_json_report_tests(stream: IO[str], chunk_size: int = _CHUNK_SIZE) -> Iterator[dict[str, Any]]:
+    # pytest-json-report writes one top-level object. Its "tests" array is decoded
+    # one entry at a time, so only the current test and one chunk are buffered.
+    reader = _JsonReader(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "tests":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(",", "]") == "]":
+                        break
+        else:
+            reader.value()
+        if reader.expect(",", "}") == "}":
+            return
+
+
+class _JsonReader:
+    def __init__(self, stream: IO[str], chunk_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        return self._buffer[self._position : self._position + 1]
+
+    def expect(self, *tokens: str) -> str:
+        token = self.peek()
+        if token not in tokens:
+            raise ValueError(f"expected one of {tokens!r} in JSON report, got {token!r}")
+        self._position += 1
+        return token
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            # A number cut off at the chunk edge decodes "successfully"; only trust
+            # a value that is followed by something (or by the end of input).
+            if end < len(self._buffer) or self._eof or not self._read():
+                self._position = end
+                return value
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in " \t\r\n":
+                self._position += 1
+            if self._position < len(self._buffer) or not self._read():
+                return
+
+    def _read(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
@@ -1,38 +1,259 @@
 from __future__ import annotations
 
+import argparse
 import json
+import os
+import queue
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import asdict
 from datetime import datetime, timezone
 from difflib import unified_diff
 from pathlib import Path
+from typing import IO
 
-from healer.classifier import classify_pytest_output
-from healer.fixers import apply_fix
-from healer.types import FailureType
+from healer.classifier import DEFAULT_RULES, StreamingClassifier, classify_log_file
+from healer.fixers import apply_fix, fix_candidates, write_atomically
+from healer.impact import impact_index, refresh
+from healer.reports import distinct_failures, junit_durations, parse_junit_xml, primary_failure
+from healer.selection import summary_node_id, verification_targets
+from healer.shards import collected_node_ids, estimated_seconds, load_durations, partition, save_durations, shard_count
+from healer.signatures import signature_cache, signature_hash
+from healer.speculative import promote, race
+from healer.types import FailureInfo, FailureType
+from healer.warm import WarmRun, WarmTestExecutor
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms write the report unlocked
+    fcntl = None  # type: ignore[assignment]
 
 ROOT = Path(__file__).resolve().parents[1]
 ARTIFACTS_DIR = ROOT / "artifacts"
 PATCH_FILE = ARTIFACTS_DIR / "healing_patch.diff"
 INCIDENT_FILE = ARTIFACTS_DIR / "incident_report.json"
+JUNIT_FILE = ARTIFACTS_DIR / "junit.xml"
+# Per-test durations from earlier runs, used to balance shards.
+DURATIONS_FILE = ARTIFACTS_DIR / "test_durations.json"
+_CANCEL_POLL_SECONDS = 0.1
+HEALABLE_FAILURES = {FailureType.ZERO_DIVISION, FailureType.NONE_TYPE_ERROR}
 
 
-def _run_tests() -> dict[str, object]:
-    process = subprocess.run(
-        [str(ROOT / ".venv" / "bin" / "python"), "-m", "pytest"],
-        cwd=ROOT,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-    combined = process.stdout + "\n" + process.stderr
+def _pytest_command() -> list[str]:
+    return [str(ROOT / ".venv" / "bin" / "python"), "-m", "pytest"]
+
+
+def _run_tests(
+    command: list[str] | None = None,
+    fail_fast: bool = False,
+    junit_report: Path | None = None,
+    targets: list[str] | None = None,
+    executor: WarmTestExecutor | None = None,
+    shards: int | None = None,
+    root: Path = ROOT,
+    cancel: threading.Event | None = None,
+) -> dict[str, object]:
+    # Output is classified as it streams in, so only a bounded tail per process
+    # is held in memory. With fail_fast every process is stopped at the first
+    # healable failure, and setting cancel stops them all. A completed run is
+    # re-read from its JUnit reports for per-test failures. Large runs are split
+    # into shards run side by side. root selects the checkout to test.
+    started = time.perf_counter()
+    groups: list[list[str] | None] = [None]
+    if command is None:
+        junit_report = junit_report or JUNIT_FILE
+        junit_report.parent.mkdir(parents=True, exist_ok=True)
+        groups = [*_shard_targets(targets or [], executor, shard_count() if shards is None else shards, root)]
+    reports = [junit_report]
+    if junit_report is not None and len(groups) > 1:
+        reports = [junit_report.with_name(f"{junit_report.stem}-{index}.xml") for index in range(len(groups))]
+        junit_report.unlink(missing_ok=True)
+    for report in reports:
+        if report is not None:
+            report.unlink(missing_ok=True)
+
+    tail_lines = int(os.getenv("HEALER_OUTPUT_TAIL_LINES", "200"))
+    classifiers = [StreamingClassifier(tail_lines=tail_lines) for _ in groups]
+    detected_after: float | None = None
+    healable: FailureInfo | None = None
+    failed_node_ids: dict[str, None] = {}
+    lines: queue.SimpleQueue[tuple[int, str | None]] = queue.SimpleQueue()
+    with tempfile.TemporaryDirectory(prefix="healer-shards-") as scratch:
+        processes: list[subprocess.Popen[str] | WarmRun] = []
+        for index, group in enumerate(groups):
+            # Each shard gets its own TMPDIR and unhealthy marker, so tests sharing
+            # a temp file don't collide.
+            env = {}
+            if len(groups) > 1:
+                shard_tmp = _mkdir(Path(scratch) / str(index))
+                env = {"TMPDIR": shard_tmp, "SELF_HEALING_UNHEALTHY_MARKER": str(Path(shard_tmp) / "force_unhealthy")}
+            args = None if group is None else [f"--junitxml={reports[index]}", *group]
+            if args is not None and fail_fast:
+                # Crash lines as tests fail; pytest's own tracebacks only come at the end.
+                args = ["-p", "healer.failfast_plugin", *args]
+            processes.append(_start_tests(command, args, executor, env, root))
+        for index, process in enumerate(processes):
+            threading.Thread(target=_pump, args=(index, process.stdout, lines), daemon=True).start()
+
+        streams = len(processes)
+        cancelled = False
+        while streams:
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                for process in processes:
+                    process.terminate()
+                break
+            try:
+                index, line = lines.get(timeout=None if cancel is None else _CANCEL_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if line is None:
+                streams -= 1
+                continue
+            node_id = summary_node_id(line)
+            if node_id is not None:
+                failed_node_ids[node_id] = None
+            failure = classifiers[index].feed(line)
+            if failure is None:
+                continue
+            if detected_after is None:
+                detected_after = time.perf_counter() - started
+            if fail_fast and failure.failure_type in HEALABLE_FAILURES:
+                healable = failure
+                for process in processes:
+                    process.terminate()
+                break
+        returncodes = [process.wait() for process in processes]
+    returncode = next((code for code in returncodes if code), 0)
+
+    failures = [healable] if healable is not None else []
+    written = [report for report in reports if report is not None and report.exists()]
+    if healable is None and not cancelled and written:
+        failures = [failure for report in written for failure in parse_junit_xml(report)]
+        # Candidate worktree runs are concurrent and partial; only real-tree runs record.
+        if command is None and root == ROOT:
+            durations: dict[str, float] = {}
+            for report in written:
+                durations.update(junit_durations(report))
+            save_durations(DURATIONS_FILE, durations)
+        if len(written) > 1 and junit_report is not None:
+            _merge_junit_reports(written, junit_report)
+    if not failed_node_ids:
+        failed_node_ids = dict.fromkeys(failure.node_id for failure in failures if failure.node_id)
     return {
-        "returncode": process.returncode,
-        "passed": process.returncode == 0,
-        "output": combined,
+        "returncode": returncode,
+        "passed": returncode == 0 and healable is None and not cancelled,
+        "output": _merged_output(classifiers, groups),
+        "failure": primary_failure(failures) if failures else _merged_result(classifiers),
+        "failures": failures,
+        "failed_node_ids": list(failed_node_ids),
+        "stopped_early": healable is not None,
+        "failure_detected_seconds": detected_after,
+        "duration_seconds": time.perf_counter() - started,
+        "shards": len(groups),
+        "cancelled": cancelled,
     }
 
 
+def _shard_targets(
+    targets: list[str],
+    executor: WarmTestExecutor | None,
+    shards: int,
+    root: Path = ROOT,
+) -> list[list[str]]:
+    # Sharding needs a collection pass, so runs whose recorded duration is below
+    # HEALER_SHARD_MIN_SECONDS stay in one process. Unrecorded runs are sharded.
+    if shards <= 1:
+        return [targets]
+    durations = load_durations(DURATIONS_FILE)
+    estimate = estimated_seconds(targets, durations)
+    if estimate is not None and estimate < float(os.getenv("HEALER_SHARD_MIN_SECONDS", "5")):
+        return [targets]
+    options = [target for target in targets if target.startswith("-")]
+    # An explicit verbosity, since addopts may already hold -q.
+    process = _start_tests(None, ["--collect-only", "--verbosity=-1", *targets], executor, {}, root)
+    assert process.stdout is not None
+    with process.stdout:
+        node_ids = collected_node_ids(process.stdout)
+        for _ in process.stdout:
+            pass
+    if process.wait() != 0 or len(node_ids) < 2:
+        return [targets]
+    return [[*options, *group] for group in partition(node_ids, durations, shards)]
+
+
+def _start_tests(
+    command: list[str] | None,
+    args: list[str] | None,
+    executor: WarmTestExecutor | None,
+    env: dict[str, str],
+    root: Path = ROOT,
+) -> subprocess.Popen[str] | WarmRun:
+    if command is None and executor is not None:
+        return executor.start_run(args or [], env, None if root == ROOT else root)
+    return subprocess.Popen(
+        command or [*_pytest_command(), *(args or [])],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        # Unbuffered so failures reach the classifier as pytest prints them.
+        env={**os.environ, "PYTHONUNBUFFERED": "1", **env},
+    )
+
+
+def _pump(index: int, stream: IO[str], lines: queue.SimpleQueue[tuple[int, str | None]]) -> None:
+    # One reader per process; None marks the end of its output.
+    try:
+        with stream:
+            for line in stream:
+                lines.put((index, line.rstrip("\n")))
+    except (OSError, ValueError):
+        pass
+    finally:
+        lines.put((index, None))
+
+
+def _mkdir(path: Path) -> str:
+    path.mkdir(parents=True, exist_ok=True)
+    return str(path)
+
+
+def _merged_output(classifiers: list[StreamingClassifier], groups: list[list[str] | None]) -> str:
+    if len(classifiers) == 1:
+        return classifiers[0].tail()
+    return "\n".join(
+        f"==== shard {index + 1}/{len(classifiers)} ({len(group or [])} tests) ====\n{classifier.tail()}"
+        for index, (classifier, group) in enumerate(zip(classifiers, groups))
+    )
+
+
+def _merged_result(classifiers: list[StreamingClassifier]) -> FailureInfo:
+    # The highest-priority verdict across shards, as if it were one output.
+    priority = {rule.failure_type: index for index, rule in enumerate(DEFAULT_RULES.rules)}
+    results = [classifier.result() for classifier in classifiers]
+    return min(results, key=lambda failure: priority.get(failure.failure_type, len(priority)))
+
+
+def _merge_junit_reports(reports: list[Path], target: Path) -> None:
+    # One <testsuites> document holding each shard's <testsuite>.
+    with target.open("w", encoding="utf-8") as merged:
+        merged.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites name="pytest tests">')
+        for report in reports:
+            text = report.read_text(encoding="utf-8")
+            start, end = text.find("<testsuite "), text.rfind("</testsuite>")
+            if start != -1 and end != -1:
+                merged.write(text[start : end + len("</testsuite>")])
+        merged.write("</testsuites>\n")
+
+
 def _snapshot(paths: list[Path]) -> dict[Path, str]:
     snapshot: dict[Path, str] = {}
     for path in paths:
@@ -73,10 +294,15 @@ def _write_incident(
     tests_before: dict[str, object],
     tests_after: dict[str, object] | None,
     classifier_payload: dict[str, object],
-) -> None:
+    signature: dict[str, object] | None = None,
+    verification: list[dict[str, object]] | None = None,
+    speculation: dict[str, object] | None = None,
+) -> str:
     ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
 
+    incident_id = uuid.uuid4().hex
     incident = {
+        "id": incident_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "status": status,
         "failure_type": failure_type.value,
@@ -84,6 +310,10 @@ def _write_incident(
         "tests_before": {
             "passed": tests_before["passed"],
             "returncode": tests_before["returncode"],
+            "stopped_early": tests_before["stopped_early"],
+            "failure_detected_seconds": tests_before["failure_detected_seconds"],
+            "duration_seconds": tests_before["duration_seconds"],
+            "failed_node_ids": tests_before["failed_node_ids"],
         },
         "tests_after": None
         if tests_after is None
@@ -92,12 +322,211 @@ def _write_incident(
             "returncode": tests_after["returncode"],
         },
         "classifier": classifier_payload,
+        "failures": [asdict(failure) for failure in tests_before["failures"]],
+        "signature": signature,
+        "verification": {"stages": verification or []},
+        "speculation": speculation,
+    }
+    with _incident_lock():
+        write_atomically(INCIDENT_FILE, json.dumps(incident, indent=2) + "\n")
+    return incident_id
+
+
+@contextmanager
+def _incident_lock() -> Iterator[None]:
+    # Serializes a new incident report with a background --confirm-full run
+    # updating the previous one.
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(INCIDENT_FILE.with_suffix(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _lookup_signature(output: str, failure: FailureInfo) -> dict[str, object]:
+    # The failure was already classified while streaming; the shared signature
+    # cache adds how the previous heal of the same traceback ended.
+    cache = signature_cache()
+    signature = signature_hash(output)
+    entry = cache.get(signature)
+    if entry is None:
+        cache.put(signature, failure)
+    return {
+        "hash": signature,
+        "seen_before": entry is not None,
+        "last_outcome": None if entry is None else entry.last_outcome,
+    }
+
+
+def _stage(name: str, result: dict[str, object], targets: list[str] | None = None) -> dict[str, object]:
+    return {
+        "name": name,
+        "status": "passed" if result["passed"] else "failed",
+        "targets": targets,
+        "returncode": result["returncode"],
+        "duration_seconds": round(result["duration_seconds"], 3),
+    }
+
+
+def _verify(
+    failed_node_ids: list[str],
+    changed: list[Path],
+    executor: WarmTestExecutor | None = None,
+    targeted: dict[str, object] | None = None,
+    failures: list[FailureInfo] | None = None,
+) -> tuple[dict[str, object], list[dict[str, object]]]:
+    # Stage 1 runs the tests that failed plus the tests that exercise what the
+    # fix changed: per the test-impact index, else by import. The full suite is
+    # stage 2, run before returning by default. "background" moves it to a
+    # detached process, so the heal is reported as soon as the targeted run
+    # passes. A stage 1 result from the winning candidate's worktree is reused
+    # rather than run again.
+    mode = os.getenv("HEALER_FULL_VERIFICATION", "sync").lower()
+    targets = verification_targets(failed_node_ids, changed, ROOT, failures or [], impact_index())
+    if not targets:
+        result = targeted if targeted is not None else _run_tests(executor=executor)
+        return result, [_stage("full", result)]
+
+    result = targeted if targeted is not None else _run_tests(targets=targets, executor=executor)
+    stages = [_stage("targeted", result, targets)]
+    if not result["passed"] or mode == "off":
+        return result, stages
+    if mode != "background":
+        full = _run_tests(executor=executor)
+        stages.append(_stage("full", full))
+        _refresh_impact_index()
+        return full, stages
+    stages.append({"name": "full", "status": "running", "targets": None})
+    return result, stages
+
+
+def _fix_speculatively(
+    failures: list[FailureInfo],
+    failed_node_ids: list[str],
+    executor: WarmTestExecutor | None,
+) -> tuple[list[Path], dict[str, object] | None, dict[str, object]]:
+    # Each candidate fix is applied in a throwaway worktree and verified there,
+    # all at once; only the winner is copied into the real tree. Returns the
+    # promoted files, the winner's stage 1 result and the incident record.
+    index = impact_index()
+
+    def verify(worktree: Path, changed: list[Path], cancel: threading.Event) -> dict[str, object]:
+        targets = verification_targets(failed_node_ids, changed, worktree, failures, index)
+        result = _run_tests(
+            junit_report=worktree / "artifacts" / "junit.xml",
+            targets=targets,
+            executor=executor,
+            shards=1,
+            root=worktree,
+            cancel=cancel,
+        )
+        return {**result, "targets": targets or None}
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="healer-candidates-") as workdir:
+        revert = os.getenv("HEALER_REVERT_CANDIDATE", "").lower() in {"1", "true", "yes"}
+        winner, outcomes = race(fix_candidates(failures, revert=revert), verify, Path(workdir))
+        changed = [] if winner is None else promote(winner, Path(workdir))
+    speculation = {
+        "promoted": None if winner is None else winner.name,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "candidates": [outcome.report() for outcome in outcomes],
     }
-    INCIDENT_FILE.write_text(json.dumps(incident, indent=2) + "\n")
+    return changed, None if winner is None else winner.result, speculation
+
+
+def _full_junit_report(incident_id: str) -> Path:
+    # Its own JUnit report, so the next foreground run cannot overwrite the one
+    # a background confirmation is still writing.
+    return ARTIFACTS_DIR / f"junit-full-{incident_id}.xml"
 
 
-def main() -> int:
-    tests_before = _run_tests()
+def _start_full_verification(incident_id: str) -> None:
+    junit_report = _full_junit_report(incident_id)
+    subprocess.Popen(
+        [sys.executable, "-m", "healer.runner", "--confirm-full", incident_id, "--junit-report", str(junit_report)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def _confirm_full_suite(incident_id: str, junit_report: Path) -> int:
+    result = _run_tests(junit_report=junit_report)
+    with _incident_lock():
+        try:
+            incident = json.loads(INCIDENT_FILE.read_text())
+        except (OSError, ValueError):
+            incident = None
+        if not isinstance(incident, dict) or incident.get("id") != incident_id:
+            # A later heal replaced the report; this result is for an older fix.
+            print(f"Incident {incident_id} is no longer the latest report; not updating it.")
+            return 0 if result["passed"] else 1
+        stages = [stage for stage in incident["verification"]["stages"] if stage["name"] != "full"]
+        incident["verification"]["stages"] = [*stages, _stage("full", result)]
+        if not result["passed"]:
+            incident["status"] = "failed"
+            incident["tests_after"] = {"passed": result["passed"], "returncode": result["returncode"]}
+        write_atomically(INCIDENT_FILE, json.dumps(incident, indent=2) + "\n")
+    signature = (incident.get("signature") or {}).get("hash")
+    if signature and not result["passed"]:
+        signature_cache().record_outcome(signature, "failed")
+    _refresh_impact_index()
+    return 0 if result["passed"] else 1
+
+
+def _refresh_impact_index() -> None:
+    # The fix changed source files, so re-record the tests that executed them.
+    index = impact_index()
+    if index is not None:
+        refresh(index)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the test suite and heal known failures")
+    parser.add_argument(
+        "--log-file",
+        type=Path,
+        help="classify an existing pytest log through mmap and print the result instead of running tests",
+    )
+    parser.add_argument(
+        "--confirm-full",
+        metavar="INCIDENT_ID",
+        help="run the full suite and record it as the last verification stage of that incident report",
+    )
+    parser.add_argument(
+        "--junit-report",
+        type=Path,
+        help="JUnit XML path for the --confirm-full run",
+    )
+    args = parser.parse_args(argv)
+    if args.confirm_full:
+        return _confirm_full_suite(args.confirm_full, args.junit_report or _full_junit_report(args.confirm_full))
+    if args.log_file is not None:
+        failure = classify_log_file(args.log_file)
+        print(json.dumps(asdict(failure)))
+        return 0 if failure.failure_type in HEALABLE_FAILURES else 1
+
+    # A warm worker keeps pytest and the project imported across the runs of a
+    # heal cycle; each run forks a clean child from it.
+    executor = WarmTestExecutor() if os.getenv("HEALER_WARM_EXECUTOR", "").lower() in {"1", "true", "yes"} else None
+    try:
+        return _heal(executor)
+    finally:
+        if executor is not None:
+            executor.close()
+
+
+def _heal(executor: WarmTestExecutor | None) -> int:
+    tests_before = _run_tests(
+        fail_fast=os.getenv("HEALER_FAIL_FAST", "").lower() in {"1", "true", "yes"},
+        executor=executor,
+    )
 
     if tests_before["passed"]:
         _write_incident(
@@ -112,9 +541,13 @@ def main() -> int:
         print("No failing tests detected. Nothing to heal.")
         return 1
 
-    failure = classify_pytest_output(str(tests_before["output"]))
+    failure = tests_before["failure"]
+    failures = tests_before["failures"]
+    assert isinstance(failure, FailureInfo) and isinstance(failures, list)
+    signature = _lookup_signature(str(tests_before["output"]), failure)
 
-    if failure.failure_type not in {FailureType.ZERO_DIVISION, FailureType.NONE_TYPE_ERROR}:
+    if failure.failure_type not in HEALABLE_FAILURES:
+        signature_cache().record_outcome(str(signature["hash"]), "unsupported")
         _write_incident(
             status="failed",
             failure_type=failure.failure_type,
@@ -122,6 +555,7 @@ def main() -> int:
             tests_before=tests_before,
             tests_after=None,
             classifier_payload=asdict(failure),
+            signature=signature,
         )
         PATCH_FILE.write_text("")
         print(f"Unsupported failure type: {failure.failure_type.value}")
@@ -129,22 +563,48 @@ def main() -> int:
 
     candidate_files = [ROOT / "app" / "logic.py", ROOT / "tests" / "test_compute.py"]
     before = _snapshot(candidate_files)
-    changed = apply_fix(failure)
-    tests_after = _run_tests()
+    changed: list[Path] = []
+    # Every healable failure type in the run gets its fixer, not just the first.
+    to_fix = [item for item in distinct_failures(failures) if item.failure_type in HEALABLE_FAILURES]
+    failed_node_ids = tests_before["failed_node_ids"]
+    assert isinstance(failed_node_ids, list)
+    speculation: dict[str, object] | None = None
+    # Opt-in: every candidate verifies at once, which only pays off with a core
+    # to spare for each.
+    if os.getenv("HEALER_SPECULATIVE_FIXES", "").lower() in {"1", "true", "yes"}:
+        changed, targeted, speculation = _fix_speculatively(to_fix or [failure], failed_node_ids, executor)
+        if targeted is None:
+            # No candidate passed, so the real tree was left as it was.
+            tests_after, stages = {"passed": False, "returncode": None}, []
+        else:
+            tests_after, stages = _verify(failed_node_ids, changed, executor, targeted, to_fix or [failure])
+    else:
+        for item in to_fix or [failure]:
+            changed.extend(path for path in apply_fix(item) if path not in changed)
+        tests_after, stages = _verify(failed_node_ids, changed, executor, failures=to_fix or [failure])
     _write_patch(before, changed)
 
     status = "healed" if tests_after["passed"] else "failed"
-    _write_incident(
+    signature_cache().record_outcome(str(signature["hash"]), status)
+    incident_id = _write_incident(
         status=status,
         failure_type=failure.failure_type,
         files_modified=changed,
         tests_before=tests_before,
         tests_after=tests_after,
         classifier_payload=asdict(failure),
+        signature=signature,
+        verification=stages,
+        speculation=speculation,
     )
+    if stages and stages[-1]["status"] == "running":
+        _start_full_verification(incident_id)
 
     if tests_after["passed"]:
-        print("Healing succeeded. Tests are passing.")
+        if stages[-1]["status"] == "running":
+            print("Healing succeeded. Affected tests are passing; full suite is running in the background.")
+        else:
+            print("Healing succeeded. Tests are passing.")
         return 0
 
     print("Healing attempted but tests are still failing.")
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+from healer.impact import ImpactIndex, is_test_file
+from healer.types import FailureInfo
+
+# pytest's short test summary: "FAILED tests/test_x.py::test_y - ZeroDivisionError: ..."
+_SUMMARY_RE = re.compile(r"^(?:FAILED|ERROR) (?P<node>\S+?\.py(?:::\S+)?)(?: - |$)")
+
+
+def summary_node_id(line: str) -> str | None:
+    if not line.startswith(("FAILED ", "ERROR ")):
+        return None
+    match = _SUMMARY_RE.match(line)
+    return match.group("node") if match else None
+
+
+def module_name(path: Path, root: Path) -> str | None:
+    try:
+        relative = path.resolve().relative_to(root.resolve())
+    except ValueError:
+        return None
+    if relative.suffix != ".py":
+        return None
+    parts = relative.with_suffix("").parts
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts) or None
+
+
+def affected_test_files(changed: Iterable[Path], root: Path, tests_dir: Path | None = None) -> list[str]:
+    # Test files that import a changed module directly, plus changed test files
+    # themselves. Transitive imports are not followed.
+    tests_dir = tests_dir or root / "tests"
+    test_files = sorted(tests_dir.rglob("test_*.py"))
+    selected: dict[str, None] = {}
+    patterns: list[re.Pattern[str]] = []
+    for path in changed:
+        path = Path(path)
+        if path.resolve() in {test.resolve() for test in test_files}:
+            selected[_relative(path, root)] = None
+            continue
+        module = module_name(path, root)
+        if module is None:
+            continue
+        package, _, name = module.rpartition(".")
+        alternatives = [rf"\b(?:from|import)\s+{re.escape(module)}\b"]
+        if package:
+            alternatives.append(rf"\bfrom\s+{re.escape(package)}\s+import\s+[^\n]*\b{re.escape(name)}\b")
+        patterns.append(re.compile("|".join(alternatives)))
+
+    if patterns:
+        for test in test_files:
+            source = test.read_text(encoding="utf-8", errors="replace")
+            if any(pattern.search(source) for pattern in patterns):
+                selected[_relative(test, root)] = None
+    return list(selected)
+
+
+def impact_targets(
+    index: ImpactIndex,
+    failures: Iterable[FailureInfo],
+    changed: Iterable[Path],
+    root: Path,
+) -> list[str] | None:
+    # Changed test files whole, plus the tests the index recorded executing a
+    # changed file or a failing line. None when a changed file was never
+    # recorded; failing lines in unrecorded files (site-packages) are skipped.
+    test_files: list[str] = []
+    edited: dict[str, set[int] | None] = {}
+    for path in changed:
+        relative = _relative(Path(path), root)
+        if is_test_file(relative):
+            test_files.append(relative)
+        else:
+            edited[relative] = None
+    lines: dict[str, set[int]] = {}
+    for failure in failures:
+        if failure.file and failure.line is not None:
+            relative = _relative(root / failure.file, root)
+            if not Path(relative).is_absolute() and relative not in edited:
+                lines.setdefault(relative, set()).add(failure.line)
+
+    covered = index.tests_for(edited, root) if edited else []
+    if covered is None:
+        return None
+    for file, numbers in lines.items():
+        covered.extend(index.tests_for({file: numbers}, root) or [])
+    nodes = [node_id for node_id in dict.fromkeys(covered) if node_id.split("::", 1)[0] not in test_files]
+    return [*dict.fromkeys(test_files), *nodes]
+
+
+def verification_targets(
+    failed_node_ids: Iterable[str],
+    changed: Iterable[Path],
+    root: Path,
+    failures: Iterable[FailureInfo] = (),
+    index: ImpactIndex | None = None,
+    scan_imports: bool = True,
+) -> list[str]:
+    # Failing tests first so the run reports on them early, then whole files that
+    # exercise the edited code. Node ids inside a selected file are dropped. With
+    # a test-impact index, the tests it recorded stand in for the import scan.
+    # Without scan_imports, only changed test files are added when the index
+    # cannot answer, so no test file is read.
+    changed = list(changed)
+    impacted = None if index is None else impact_targets(index, failures, changed, root)
+    if impacted is None:
+        if scan_imports:
+            files = affected_test_files(changed, root)
+        else:
+            relatives = (_relative(Path(path), root) for path in changed)
+            files = [relative for relative in relatives if is_test_file(relative)]
+        covered = []
+    else:
+        files = [target for target in impacted if "::" not in target]
+        covered = [target for target in impacted if "::" in target]
+    candidates = dict.fromkeys([*failed_node_ids, *covered])
+    nodes = [node_id for node_id in candidates if node_id.split("::", 1)[0] not in files]
+    return [*nodes, *files]
+
+
+def _relative(path: Path, root: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(root.resolve()))
+    except ValueError:
+        return str(path)
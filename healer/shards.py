@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import statistics
+from collections.abc import Iterable
+from pathlib import Path
+
+# Assumed per-test duration before any run has been recorded.
+DEFAULT_TEST_SECONDS = 1.0
+
+
+def shard_count() -> int:
+    # Opt-in: CPU-bound suites get slower when split across fewer cores than
+    # shards, so runs use one process unless HEALER_TEST_SHARDS asks for more.
+    return max(1, int(os.getenv("HEALER_TEST_SHARDS", "") or "1"))
+
+
+def estimated_seconds(targets: list[str], durations: dict[str, float]) -> float | None:
+    # Recorded time of the tests a run selects (all of them without targets),
+    # or None when none of them has been recorded yet.
+    selectors = [target for target in targets if not target.startswith("-")]
+    prefixes = tuple(prefix for target in selectors for prefix in (f"{target}::", f"{target}["))
+    total, matched = 0.0, False
+    for node_id, seconds in durations.items():
+        if not selectors or node_id in selectors or node_id.startswith(prefixes):
+            total += seconds
+            matched = True
+    return total if matched else None
+
+
+def collected_node_ids(lines: Iterable[str]) -> list[str]:
+    # `pytest --collect-only --verbosity=-1` prints one node id per line, then a blank line
+    # and the summary.
+    node_ids = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line:
+            break
+        if "::" in line:
+            node_ids.append(line)
+    return node_ids
+
+
+def partition(node_ids: list[str], durations: dict[str, float], shards: int) -> list[list[str]]:
+    # Longest processing time first: the slowest remaining test goes to the
+    # shard with the least recorded work. Tests without a recorded duration
+    # count as the median of the known ones. Each shard keeps collection order.
+    known = [durations[node_id] for node_id in node_ids if node_id in durations]
+    default = statistics.median(known) if known else DEFAULT_TEST_SECONDS
+    order = {node_id: index for index, node_id in enumerate(node_ids)}
+    ranked = sorted(node_ids, key=lambda node_id: (-durations.get(node_id, default), order[node_id]))
+
+    loads = [(0.0, index) for index in range(max(1, min(shards, len(node_ids))))]
+    groups: list[list[str]] = [[] for _ in loads]
+    for node_id in ranked:
+        load, index = heapq.heappop(loads)
+        groups[index].append(node_id)
+        heapq.heappush(loads, (load + durations.get(node_id, default), index))
+    return [sorted(group, key=order.__getitem__) for group in groups if group]
+
+
+def load_durations(path: Path) -> dict[str, float]:
+    try:
+        document = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return {str(node_id): float(seconds) for node_id, seconds in document.items() if isinstance(seconds, (int, float))}
+
+
+def save_durations(path: Path, durations: dict[str, float]) -> None:
+    # Merged into what is already recorded, since one run may cover only some tests.
+    if not durations:
+        return
+    merged = {**load_durations(path), **{node_id: round(seconds, 4) for node_id, seconds in durations.items()}}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(merged, indent=0, sort_keys=True))
+    os.replace(temporary, path)
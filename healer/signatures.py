@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from healer.types import FailureInfo, FailureType
+from telemetry import counter
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms save without merging
+    fcntl = None  # type: ignore[assignment]
+
+# Parts of CI output that change between retries and shards of the same failure.
+_VOLATILE_PATTERNS = (
+    (re.compile(r"\x1b\[[0-9;]*[A-Za-z]"), ""),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b\d+(?:\.\d+)?s\b"), "<dur>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<addr>"),
+    (re.compile(r"/tmp/[^\s:'\"]+"), "<tmp>"),
+    (re.compile(r"\[\s*\d+%\]"), "<progress>"),
+    (re.compile(r"\b\d+ (passed|failed|skipped|deselected|xfailed|xpassed|errors?|warnings?)\b"), r"<n> \1"),
+)
+_SECTION_MARKERS = ("= ERRORS =", "= FAILURES =")
+# Hashing a few KB keeps the signature cheap next to classification, however
+# long the log is. A section longer than this is only partly hashed, so its
+# signature is not trusted to stand for the classification (signature_is_complete).
+MAX_SIGNATURE_CHARS = 8 * 1024
+# Appended before hashing a partly hashed section, so it never shares a
+# signature with a log that ends where the slice does.
+_PARTIAL_MARKER = "\n<partial>"
+
+_LOOKUPS = counter(
+    "healer_signature_cache_lookups_total",
+    "Failure signature cache lookups, by result.",
+    ("result",),
+)
+
+
+def _section_bounds(output: str, max_chars: int) -> tuple[int, int, bool]:
+    # (start, end, complete). Shards print different progress lines before the
+    # same failure, so the signature starts at pytest's ERRORS/FAILURES header
+    # when there is one; the section is complete when it runs to the end of the log.
+    starts = [index for index in (output.find(marker) for marker in _SECTION_MARKERS) if index != -1]
+    if not starts:
+        # No header: the summary and last traceback sit at the end of the run.
+        return max(0, len(output) - max_chars), len(output), len(output) <= max_chars
+    start = output.rfind("\n", 0, min(starts)) + 1
+    end = min(len(output), start + max_chars)
+    return start, end, end == len(output)
+
+
+def failure_section(output: str, max_chars: int = MAX_SIGNATURE_CHARS) -> str:
+    start, end, _ = _section_bounds(output, max_chars)
+    return output[start:end]
+
+
+def signature_is_complete(output: str, max_chars: int = MAX_SIGNATURE_CHARS) -> bool:
+    # Whether the signature covers all of the failure output the classifier
+    # reads. When it does not, two logs with the same signature can still
+    # classify differently.
+    return _section_bounds(output, max_chars)[2]
+
+
+def normalize_output(output: str) -> str:
+    output = failure_section(output)
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        output = pattern.sub(replacement, output)
+    return "\n".join(line.strip() for line in output.splitlines() if line.strip())
+
+
+def signature_hash(output: str) -> str:
+    normalized = normalize_output(output)
+    if not signature_is_complete(output):
+        normalized += _PARTIAL_MARKER
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SignatureEntry:
+    failure: FailureInfo
+    last_outcome: str | None = None
+    hits: int = 0
+
+
+@dataclass
+class SignatureCache:
+    max_entries: int = 4096
+    path: Path | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _entries: OrderedDict[str, SignatureEntry] = field(default_factory=OrderedDict, init=False, repr=False)
+    # Signatures classified or given an outcome here since the last save.
+    _dirty: set[str] = field(default_factory=set, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"hits": 0, "misses": 0, "partial": 0, "evictions": 0, "outcomes": 0},
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if self.path is not None:
+            self._load()
+
+    def classify(
+        self,
+        output: str,
+        classify: Callable[[str], FailureInfo],
+        signature: str | None = None,
+    ) -> tuple[str, FailureInfo, bool]:
+        # Returns (signature, failure, cached). Callers that already hashed the
+        # output pass `signature` to skip normalizing it again.
+        signature = signature or signature_hash(output)
+        if not signature_is_complete(output):
+            # Logs that differ past the hashed slice share this signature, so
+            # the output is classified afresh; the entry still keeps its outcome.
+            with self._lock:
+                self._counters["partial"] += 1
+            _LOOKUPS.labels("partial").inc()
+            failure = classify(output)
+            self.put(signature, failure)
+            return signature, failure, False
+        entry = self.get(signature)
+        if entry is not None:
+            return signature, entry.failure, True
+        failure = classify(output)
+        self.put(signature, failure)
+        return signature, failure, False
+
+    def get(self, signature: str) -> SignatureEntry | None:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                self._counters["misses"] += 1
+            else:
+                self._entries.move_to_end(signature)
+                entry.hits += 1
+                self._counters["hits"] += 1
+        _LOOKUPS.labels("miss" if entry is None else "hit").inc()
+        return entry
+
+    def put(self, signature: str, failure: FailureInfo) -> None:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                self._entries[signature] = SignatureEntry(failure=failure)
+            else:
+                entry.failure = failure
+            self._entries.move_to_end(signature)
+            self._dirty.add(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def record_outcome(self, signature: str, outcome: str) -> None:
+        with self._lock:
+            entry = self._entries.get(signature)
+            if entry is None:
+                return
+            entry.last_outcome = outcome
+            self._dirty.add(signature)
+            self._counters["outcomes"] += 1
+        self.save()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = {"entries": len(self._entries), "max_entries": self.max_entries, **self._counters}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["persistent"] = self.path is not None
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Heal workers share the file: merge this process's changes into what is
+        # on disk under a lock instead of overwriting the other processes' entries.
+        with self._file_lock():
+            document = self._read()
+            with self._lock:
+                for signature in self._dirty:
+                    entry = self._entries.get(signature)
+                    if entry is None:
+                        continue
+                    document.pop(signature, None)
+                    document[signature] = {
+                        "failure": asdict(entry.failure),
+                        "last_outcome": entry.last_outcome,
+                        "hits": entry.hits,
+                    }
+                self._dirty.clear()
+            document = dict(list(document.items())[-self.max_entries :])
+            temporary = self.path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(document))
+            os.replace(temporary, self.path)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        assert self.path is not None
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self.path.with_suffix(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read(self) -> dict[str, Any]:
+        assert self.path is not None
+        try:
+            document = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return document if isinstance(document, dict) else {}
+
+    def _load(self) -> None:
+        for signature, item in list(self._read().items())[-self.max_entries :]:
+            try:
+                failure = FailureInfo(**{**item["failure"], "failure_type": FailureType(item["failure"]["failure_type"])})
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._entries[signature] = SignatureEntry(
+                failure=failure,
+                last_outcome=item.get("last_outcome"),
+                hits=int(item.get("hits", 0)),
+            )
+
+
+_CACHE: SignatureCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def signature_cache() -> SignatureCache:
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            path = os.getenv("HEALER_SIGNATURE_CACHE_FILE", "")
+            _CACHE = SignatureCache(
+                max_entries=int(os.getenv("HEALER_SIGNATURE_CACHE_SIZE", "4096")),
+                path=Path(path) if path else None,
+            )
+        return _CACHE
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from healer.fixers import FixCandidate, write_atomically
+from healer.locks import file_locks
+
+ROOT = Path(__file__).resolve().parents[1]
+# Left out of candidate worktrees: history, the virtualenv (runs use the real
+# one), and run output.
+WORKTREE_IGNORE = {".git", ".venv", "artifacts", ".pytest_cache", ".mypy_cache"}
+_DONE = {"passed", "failed", "cancelled", "error", "empty"}
+
+# verify(worktree, changed files, cancel) -> a _run_tests result
+Verify = Callable[[Path, list[Path], threading.Event], dict[str, Any]]
+
+
+@dataclass
+class CandidateOutcome:
+    name: str
+    rank: int
+    status: str = "pending"
+    files: list[str] = field(default_factory=list)
+    targets: list[str] | None = None
+    returncode: int | None = None
+    setup_seconds: float | None = None
+    verify_seconds: float | None = None
+    duration_seconds: float | None = None
+    error: str | None = None
+    result: dict[str, Any] | None = field(default=None, repr=False)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "rank": self.rank,
+            "status": self.status,
+            "files": self.files,
+            "targets": self.targets,
+            "returncode": self.returncode,
+            "setup_seconds": self.setup_seconds,
+            "verify_seconds": self.verify_seconds,
+            "duration_seconds": self.duration_seconds,
+            "error": self.error,
+        }
+
+
+def create_worktree(destination: Path, root: Path = ROOT) -> Path:
+    # cp --reflink=auto shares file extents on copy-on-write filesystems (btrfs,
+    # XFS) and makes a plain copy elsewhere. -a keeps mtimes, so the copied
+    # bytecode caches stay valid.
+    destination.mkdir(parents=True)
+    entries = [str(entry) for entry in sorted(root.iterdir()) if entry.name not in WORKTREE_IGNORE]
+    try:
+        subprocess.run(["cp", "-a", "--reflink=auto", *entries, str(destination)], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        # cp without --reflink (BSD, busybox).
+        for entry in map(Path, entries):
+            target = destination / entry.name
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.copytree(entry, target, symlinks=True, dirs_exist_ok=True)
+            else:
+                shutil.copy2(entry, target, follow_symlinks=False)
+    (destination / "artifacts").mkdir(exist_ok=True)
+    return destination
+
+
+def race(
+    candidates: list[FixCandidate],
+    verify: Verify,
+    workdir: Path,
+    root: Path = ROOT,
+) -> tuple[CandidateOutcome | None, list[CandidateOutcome]]:
+    # Every candidate is applied in its own worktree and verified concurrently.
+    # The winner is the best-ranked candidate that passed: a pass cancels every
+    # lower-ranked candidate at once, and is promoted as soon as the candidates
+    # ranked above it have failed.
+    outcomes = [CandidateOutcome(name=candidate.name, rank=rank) for rank, candidate in enumerate(candidates)]
+    cancels = [threading.Event() for _ in candidates]
+    winner: CandidateOutcome | None = None
+    if not candidates:
+        return None, outcomes
+    with ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="fix-candidate") as pool:
+        futures = {
+            pool.submit(
+                _attempt,
+                candidate,
+                outcomes[rank],
+                cancels[rank],
+                verify,
+                root,
+                workdir / f"{rank}-{candidate.name}",
+            ): rank
+            for rank, candidate in enumerate(candidates)
+        }
+        for future in as_completed(futures):
+            future.result()
+            rank = futures[future]
+            if outcomes[rank].status == "passed":
+                for later in cancels[rank + 1 :]:
+                    later.set()
+            if winner is None:
+                for outcome in outcomes:
+                    if outcome.status == "passed":
+                        winner = outcome
+                        break
+                    if outcome.status not in _DONE:
+                        break
+    return winner, outcomes
+
+
+def promote(winner: CandidateOutcome, workdir: Path, root: Path = ROOT) -> list[Path]:
+    # Copies the winning candidate's changed files over the real tree, each
+    # replaced whole so an interrupted promote never leaves a truncated file.
+    worktree = workdir / f"{winner.rank}-{winner.name}"
+    targets = [root / relative for relative in winner.files]
+    with file_locks().hold(targets):
+        for relative, target in zip(winner.files, targets):
+            write_atomically(target, (worktree / relative).read_text())
+    return targets
+
+
+def _attempt(
+    candidate: FixCandidate,
+    outcome: CandidateOutcome,
+    cancel: threading.Event,
+    verify: Verify,
+    root: Path,
+    worktree: Path,
+) -> None:
+    started = time.perf_counter()
+    outcome.status = "running"
+    try:
+        create_worktree(worktree, root)
+        changed = candidate.apply(worktree)
+        outcome.files = [path.relative_to(worktree).as_posix() for path in changed]
+        outcome.setup_seconds = round(time.perf_counter() - started, 3)
+        if not changed:
+            outcome.status = "empty"
+        elif cancel.is_set():
+            outcome.status = "cancelled"
+        else:
+            verifying = time.perf_counter()
+            result = verify(worktree, changed, cancel)
+            outcome.verify_seconds = round(time.perf_counter() - verifying, 3)
+            outcome.result = result
+            outcome.targets = result.get("targets")
+            outcome.returncode = result.get("returncode")
+            if result.get("cancelled"):
+                outcome.status = "cancelled"
+            else:
+                outcome.status = "passed" if result.get("passed") else "failed"
+    except Exception as exc:  # noqa: BLE001 - one broken candidate must not stop the others
+        outcome.status = "error"
+        outcome.error = f"{type(exc).__name__}: {exc}"
+    finally:
+        outcome.duration_seconds = round(time.perf_counter() - started, 3)
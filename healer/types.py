@@ -17,3 +17,5 @@ class FailureInfo:
     file: str | None = None
     line: int | None = None
     message: str | None = None
+    node_id: str | None = None
+    exception_type: str | None = None
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import importlib
+import io
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import recv_handle, send_handle
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Third-party imports every test run pays for; project packages are imported too,
+# and re-imported in a run's child only when their files changed.
+DEFAULT_PRELOAD = (
+    "pytest",
+    "_pytest.junitxml",
+    "fastapi",
+    "fastapi.testclient",
+    "httpx",
+    "app.main",
+    "healer.fixers",
+    "webhook.service",
+)
+
+
+class WarmExecutorError(RuntimeError):
+    pass
+
+
+def _project_modules(root: Path) -> dict[str, tuple[str, float]]:
+    # name -> (source file, mtime) for every loaded module that lives in the
+    # project tree, excluding virtualenvs.
+    modules: dict[str, tuple[str, float]] = {}
+    prefix = str(root) + os.sep
+    for name, module in list(sys.modules.items()):
+        source = getattr(module, "__file__", None)
+        if not source or not source.startswith(prefix) or f"{os.sep}.venv{os.sep}" in source:
+            continue
+        try:
+            modules[name] = (source, os.stat(source).st_mtime)
+        except OSError:
+            continue
+    return modules
+
+
+def stale_modules(snapshot: dict[str, tuple[str, float]], modules: dict[str, types.ModuleType]) -> set[str]:
+    # Modules whose file changed, plus every project module holding a reference
+    # (a submodule, function or class) into one of them, up to a fixed point.
+    stale = set()
+    for name, (source, mtime) in snapshot.items():
+        try:
+            if os.stat(source).st_mtime != mtime:
+                stale.add(name)
+        except OSError:
+            stale.add(name)
+    changed = bool(stale)
+    while changed:
+        changed = False
+        for name in snapshot:
+            if name in stale or name not in modules:
+                continue
+            if any(_references(value, stale) for value in vars(modules[name]).values()):
+                stale.add(name)
+                changed = True
+    return stale
+
+
+def _references(value: Any, stale: set[str]) -> bool:
+    if isinstance(value, types.ModuleType):
+        return value.__name__ in stale
+    return getattr(value, "__module__", None) in stale
+
+
+def _serve(conn: Connection, root: str, preload: tuple[str, ...]) -> None:
+    sys.path.insert(0, root)
+    os.chdir(root)
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception:  # noqa: BLE001 - a missing optional module only costs warmth
+            continue
+    snapshot = _project_modules(Path(root))
+    # Runs are reaped automatically and report their exit code on a status pipe,
+    # so the server never waits on one and shards can run side by side.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    conn.send(("ready", len(sys.modules)))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        _, args, env, cwd = request
+        output_read, output_write = os.pipe()
+        status_read, status_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(output_read)
+            os.close(status_read)
+            _run_child(output_write, status_write, list(args), env, cwd, snapshot)
+        os.close(output_write)
+        os.close(status_write)
+        # Set from both sides so terminate() can signal the group at once.
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+        conn.send(("started", pid))
+        send_handle(conn, output_read, os.getppid())
+        send_handle(conn, status_read, os.getppid())
+        os.close(output_read)
+        os.close(status_read)
+
+
+def _run_child(
+    output_fd: int,
+    status_fd: int,
+    args: list[str],
+    env: dict[str, str],
+    cwd: str | None,
+    snapshot: dict[str, tuple[str, float]],
+) -> None:
+    code = 1
+    try:
+        os.setpgid(0, 0)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        os.dup2(output_fd, 1)
+        os.dup2(output_fd, 2)
+        os.close(output_fd)
+        sys.stdout = io.TextIOWrapper(os.fdopen(1, "wb", buffering=0), write_through=True)
+        sys.stderr = sys.stdout
+        # Project modules may read the environment at import time, and a run in
+        # another checkout must import that checkout's code, so either re-imports
+        # all of them.
+        stale = set(snapshot) if env or cwd else stale_modules(snapshot, sys.modules)
+        os.environ.update(env)
+        if cwd:
+            sys.path[:] = [cwd if entry == os.getcwd() else entry for entry in sys.path]
+            os.chdir(cwd)
+        tempfile.tempdir = None
+        for name in stale:
+            sys.modules.pop(name, None)
+        importlib.invalidate_caches()
+
+        import pytest
+
+        # Preloaded plugins (anyio) can no longer be assertion-rewritten; expected here.
+        code = int(pytest.main(["-W", "ignore::pytest.PytestAssertRewriteWarning", *args]))
+    except BaseException:  # noqa: BLE001 - the child must never return into the server loop
+        import traceback
+
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            os.write(status_fd, str(code).encode())
+        finally:
+            os._exit(code)
+
+
+@dataclass
+class WarmRun:
+    # Mirrors the subset of subprocess.Popen the runner uses.
+    stdout: io.TextIOBase
+    pid: int
+    _status: io.BufferedReader = field(repr=False)
+    returncode: int | None = None
+    _terminated: bool = field(default=False, init=False, repr=False)
+
+    def terminate(self) -> None:
+        self._terminated = True
+        try:
+            os.killpg(self.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def wait(self) -> int:
+        if self.returncode is None:
+            with self._status:
+                status = self._status.read()
+            # No status means the child was killed before it could report one.
+            if status:
+                self.returncode = int(status)
+            else:
+                self.returncode = -signal.SIGTERM if self._terminated else 1
+        return self.returncode
+
+
+@dataclass
+class WarmTestExecutor:
+    root: Path = ROOT
+    preload: tuple[str, ...] = DEFAULT_PRELOAD
+    start_timeout_seconds: float = 60.0
+    _conn: Connection | None = field(default=None, init=False, repr=False)
+    _pid: int | None = field(default=None, init=False, repr=False)
+    _runs: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def start(self) -> None:
+        if self._pid is not None:
+            return
+        # A plain fork rather than a multiprocessing.Process: the server starts from
+        # this interpreter's already-imported state, and its run children are not
+        # marked as daemonic, so tests can still start their own processes. The
+        # server stays single-threaded, which keeps forking a child per run safe.
+        parent_conn, child_conn = multiprocessing.Pipe()
+        pid = os.fork()
+        if pid == 0:
+            parent_conn.close()
+            # Descriptors another thread had open at fork time (a subprocess's
+            # pipes, say) would otherwise stay open in the server for good, and
+            # whoever reads their other end would never see EOF.
+            keep = child_conn.fileno()
+            os.closerange(3, keep)
+            os.closerange(keep + 1, os.sysconf("SC_OPEN_MAX"))
+            code = 1
+            try:
+                _serve(child_conn, str(self.root), self.preload)
+                code = 0
+            finally:
+                os._exit(code)
+        child_conn.close()
+        self._pid = pid
+        if not parent_conn.poll(self.start_timeout_seconds):
+            self._conn = parent_conn
+            self.close()
+            raise WarmExecutorError("warm test server did not start in time")
+        try:
+            parent_conn.recv()
+        except EOFError as exc:
+            self._conn = parent_conn
+            self.close()
+            raise WarmExecutorError("warm test server exited during startup") from exc
+        self._conn = parent_conn
+
+    def start_run(self, args: Iterable[str], env: dict[str, str] | None = None, cwd: Path | None = None) -> WarmRun:
+        # env is applied on top of the server's environment, and cwd replaces the
+        # project root (e.g. a candidate worktree), for this run only.
+        with self._lock:
+            self.start()
+            assert self._conn is not None
+            self._conn.send(("run", list(args), env or {}, str(cwd) if cwd else None))
+            try:
+                kind, pid = self._conn.recv()
+                output_fd = recv_handle(self._conn)
+                status_fd = recv_handle(self._conn)
+            except EOFError as exc:
+                raise WarmExecutorError("warm test server exited") from exc
+            self._runs += 1
+        if kind != "started":
+            raise WarmExecutorError(f"unexpected message from warm test server: {kind}")
+        # Both are closed by the caller: stdout by reading it, the status by wait().
+        stdout = open(output_fd, encoding="utf-8", errors="replace")  # noqa: SIM115
+        return WarmRun(stdout=stdout, pid=pid, _status=open(status_fd, "rb"))  # noqa: SIM115
+
+    def stats(self) -> dict[str, Any]:
+        return {"running": self._pid is not None and _alive(self._pid), "runs": self._runs}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass
+            self._conn.close()
+        if self._pid is not None:
+            deadline = time.monotonic() + 5
+            while _alive(self._pid) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if _alive(self._pid):
+                os.kill(self._pid, signal.SIGKILL)
+                os.waitpid(self._pid, 0)
+        self._conn = self._pid = None
+
+
+def _alive(pid: int) -> bool:
+    # Reaps the server once it has exited.
+    try:
+        return os.waitpid(pid, os.WNOHANG) == (0, 0)
+    except ChildProcessError:
+        return False
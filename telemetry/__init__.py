@@ -0,0 +1,31 @@
+from telemetry.metrics import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    collect_all,
+    counter,
+    fold_dead_snapshots,
+    gauge,
+    histogram,
+    render,
+    start_snapshot_flusher,
+    write_snapshot,
+)
+
+__all__ = [
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "collect_all",
+    "counter",
+    "fold_dead_snapshots",
+    "gauge",
+    "histogram",
+    "render",
+    "start_snapshot_flusher",
+    "write_snapshot",
+]
@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from bisect import bisect_left
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms fold without a cross-process lock
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+@dataclass
+class _Metric:
+    registry: Registry
+    name: str
+    help: str
+    kind: str
+    labelnames: tuple[str, ...]
+    buckets: tuple[float, ...] = ()
+    _children: dict[tuple[str, ...], Any] = field(default_factory=dict, init=False, repr=False)
+
+    def labels(self, *values: object, **named: object) -> Any:
+        if named:
+            values = tuple(named[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            factory = {COUNTER: _CounterChild, GAUGE: _GaugeChild, HISTOGRAM: _HistogramChild}[self.kind]
+            child = self._children.setdefault(key, factory(self, key))
+        return child
+
+
+class Counter(_Metric):
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> Any:
+        return self.labels().time()
+
+
+class _CounterChild:
+    __slots__ = ("_key", "_registry")
+
+    def __init__(self, metric: _Metric, labels: tuple[str, ...]) -> None:
+        self._registry = metric.registry
+        self._key = (metric.name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        shard = self._registry._shard()
+        shard[self._key] = shard.get(self._key, 0.0) + amount
+
+
+class _GaugeChild:
+    __slots__ = ("_key", "_registry")
+
+    def __init__(self, metric: _Metric, labels: tuple[str, ...]) -> None:
+        self._registry = metric.registry
+        self._key = (metric.name, labels)
+
+    def set(self, value: float) -> None:
+        # Last write wins, so gauges live outside the per-thread shards.
+        with self._registry._lock:
+            self._registry._gauges[self._key] = value
+
+
+class _HistogramChild:
+    __slots__ = ("_buckets", "_key", "_registry", "_width")
+
+    def __init__(self, metric: _Metric, labels: tuple[str, ...]) -> None:
+        self._registry = metric.registry
+        self._key = (metric.name, labels)
+        self._buckets = metric.buckets
+        # One slot per bucket, one for +Inf, then sum and count.
+        self._width = len(metric.buckets) + 3
+
+    def observe(self, value: float) -> None:
+        shard = self._registry._shard()
+        slots = shard.get(self._key)
+        if slots is None:
+            slots = shard[self._key] = [0.0] * self._width
+        slots[bisect_left(self._buckets, value)] += 1
+        slots[-2] += value
+        slots[-1] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+Values = dict[tuple[str, tuple[str, ...]], Any]
+
+
+@dataclass
+class Registry:
+    # Each thread records into its own shard without taking a lock; shards are only
+    # summed when metrics are collected. A finished thread's shard is folded into
+    # _retired so short-lived threads do not pile up shards.
+    _metrics: dict[str, _Metric] = field(default_factory=dict, init=False, repr=False)
+    _shards: list[tuple[weakref.ref[threading.Thread], Values]] = field(default_factory=list, init=False, repr=False)
+    _retired: Values = field(default_factory=dict, init=False, repr=False)
+    _gauges: dict[tuple[str, tuple[str, ...]], float] = field(default_factory=dict, init=False, repr=False)
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:  # noqa: A002
+        return self._register(Counter, name, help, COUNTER, tuple(labelnames), ())
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:  # noqa: A002
+        return self._register(Gauge, name, help, GAUGE, tuple(labelnames), ())
+
+    def histogram(
+        self,
+        name: str,
+        help: str,  # noqa: A002
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, help, HISTOGRAM, tuple(labelnames), tuple(sorted(buckets)))
+
+    def collect(self) -> dict[str, Any]:
+        merged: Values = {}
+        with self._lock:
+            self._retire_finished()
+            shards = [values for _, values in self._shards]
+            for key, value in self._retired.items():
+                _merge_value(merged, key, value)
+            merged.update(self._gauges)
+        for shard in shards:
+            for key, value in list(shard.items()):
+                _merge_value(merged, key, value)
+        metrics = {
+            name: [metric.kind, metric.help, list(metric.labelnames), list(metric.buckets)]
+            for name, metric in self._metrics.items()
+        }
+        return {"metrics": metrics, "values": [[name, list(labels), value] for (name, labels), value in merged.items()]}
+
+    def reset(self) -> None:
+        with self._lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+            self._gauges.clear()
+
+    def _shard(self) -> Values:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Values = {}
+            with self._lock:
+                self._retire_finished()
+                self._shards.append((weakref.ref(threading.current_thread()), values))
+            self._local.values = values
+            return values
+
+    def _retire_finished(self) -> None:
+        # Caller holds _lock. A finished thread no longer writes to its shard.
+        live = []
+        for thread_ref, values in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, values))
+                continue
+            for key, value in list(values.items()):
+                _merge_value(self._retired, key, value)
+        self._shards = live
+
+    def _register(
+        self,
+        cls: type,
+        name: str,
+        help: str,  # noqa: A002
+        kind: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ) -> Any:
+        with self._lock:
+            # Re-registering returns the existing metric so module reloads stay safe.
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, help, kind, labelnames, buckets)
+            elif metric.kind != kind or metric.labelnames != labelnames:
+                raise ValueError(f"metric {name} already registered with a different shape")
+            return metric
+
+
+def _merge_value(merged: dict[Any, Any], key: Any, value: Any) -> None:
+    current = merged.get(key)
+    if current is None:
+        merged[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            current[index] += item
+    else:
+        merged[key] = current + value
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:  # noqa: A002
+    return REGISTRY.counter(name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:  # noqa: A002
+    return REGISTRY.gauge(name, help, labelnames)
+
+
+def histogram(
+    name: str,
+    help: str,  # noqa: A002
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.histogram(name, help, labelnames, buckets)
+
+
+def metrics_dir() -> Path | None:
+    directory = os.getenv("METRICS_DIR", "")
+    return Path(directory) if directory else None
+
+
+AGGREGATE_FILE = "aggregate.json"
+_FOLD_LOCK_FILE = ".fold.lock"
+
+_SNAPSHOT_NAME: tuple[int, str] | None = None
+
+
+def _snapshot_name() -> str:
+    # "<pid>-<token>.json": the token keeps a later process that reuses the pid
+    # from overwriting (and so rolling back) the earlier process's counters.
+    global _SNAPSHOT_NAME
+    pid = os.getpid()
+    if _SNAPSHOT_NAME is None or _SNAPSHOT_NAME[0] != pid:
+        _SNAPSHOT_NAME = (pid, uuid.uuid4().hex[:12])
+    return f"{pid}-{_SNAPSHOT_NAME[1]}.json"
+
+
+def write_snapshot(registry: Registry = REGISTRY, directory: Path | None = None) -> Path | None:
+    directory = directory or metrics_dir()
+    if directory is None:
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / _snapshot_name()
+    temporary = target.with_suffix(".tmp")
+    temporary.write_text(json.dumps(registry.collect()))
+    os.replace(temporary, target)
+    return target
+
+
+def collect_all(registry: Registry = REGISTRY, directory: Path | None = None) -> dict[str, Any]:
+    # With several uvicorn workers each process publishes a snapshot file; any
+    # worker answering a scrape merges all of them. Gauges are summed across
+    # workers, so a state gauge counts the workers in each state.
+    directory = directory or metrics_dir()
+    if directory is None:
+        return registry.collect()
+
+    write_snapshot(registry, directory)
+    fold_dead_snapshots(directory)
+    folded = set((_read_snapshot(directory / AGGREGATE_FILE) or {}).get("folded", []))
+    metrics: dict[str, Any] = {}
+    merged: dict[Any, Any] = {}
+    for path in sorted(directory.glob("*.json")):
+        snapshot = None if path.name in folded else _read_snapshot(path)
+        if snapshot is None:
+            continue
+        metrics.update(snapshot["metrics"])
+        for name, labels, value in snapshot["values"]:
+            _merge_value(merged, (name, tuple(labels)), value)
+    return {"metrics": metrics, "values": [[name, list(labels), value] for (name, labels), value in merged.items()]}
+
+
+def fold_dead_snapshots(directory: Path) -> int:
+    # Adds the counters and histograms of exited processes to aggregate.json and
+    # deletes their snapshots, so the directory does not grow with every recycled
+    # worker. Their gauges are dropped. Folded names are remembered until the
+    # files are gone, so a scrape dying between the two steps cannot count twice.
+    with _fold_lock(directory):
+        aggregate_path = directory / AGGREGATE_FILE
+        aggregate = _read_snapshot(aggregate_path) or {"metrics": {}, "values": []}
+        folded = {name for name in aggregate.get("folded", []) if (directory / name).exists()}
+        dead = [
+            path
+            for path in sorted(directory.glob("*.json"))
+            if path.name != AGGREGATE_FILE and path.name not in folded and not _process_alive(path)
+        ]
+        if dead:
+            merged: dict[Any, Any] = {}
+            for name, labels, value in aggregate["values"]:
+                _merge_value(merged, (name, tuple(labels)), value)
+            for path in dead:
+                snapshot = _read_snapshot(path)
+                if snapshot is None:
+                    continue
+                for name, labels, value in snapshot["values"]:
+                    kind = snapshot["metrics"].get(name, [GAUGE])[0]
+                    if kind != GAUGE:
+                        aggregate["metrics"][name] = snapshot["metrics"][name]
+                        _merge_value(merged, (name, tuple(labels)), value)
+            aggregate["values"] = [[name, list(labels), value] for (name, labels), value in merged.items()]
+            folded.update(path.name for path in dead)
+        aggregate["folded"] = sorted(folded)
+        if dead or folded:
+            temporary = aggregate_path.with_suffix(f".{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(aggregate))
+            os.replace(temporary, aggregate_path)
+        for name in sorted(folded):
+            (directory / name).unlink(missing_ok=True)
+        return len(dead)
+
+
+def _read_snapshot(path: Path) -> dict[str, Any] | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _process_alive(path: Path) -> bool:
+    pid = path.stem.split("-", 1)[0]
+    if not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _fold_lock(directory: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(directory / _FOLD_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def render(snapshot: dict[str, Any]) -> str:
+    by_metric: dict[str, list[tuple[list[str], Any]]] = {}
+    for name, labels, value in snapshot["values"]:
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines: list[str] = []
+    for name in sorted(snapshot["metrics"]):
+        kind, help_text, labelnames, buckets = snapshot["metrics"][name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(by_metric.get(name, []), key=lambda item: item[0]):
+            pairs = list(zip(labelnames, labels))
+            if kind != HISTOGRAM:
+                lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip([*buckets, float("inf")], value):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{name}_bucket{_labels([*pairs, ('le', le)])} {_number(cumulative)}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-2])}")
+            lines.append(f"{name}_count{_labels(pairs)} {_number(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_FLUSHER: threading.Thread | None = None
+
+
+def start_snapshot_flusher(interval_seconds: float | None = None) -> None:
+    global _FLUSHER
+    if metrics_dir() is None or _FLUSHER is not None:
+        return
+    interval = interval_seconds or float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+    def _flush_forever() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot()
+            except OSError:
+                pass
+
+    _FLUSHER = threading.Thread(target=_flush_forever, name="metrics-flusher", daemon=True)
+    _FLUSHER.start()
+    atexit.register(write_snapshot)
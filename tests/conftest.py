@@ -12,6 +12,18 @@ def reset_health_marker() -> None:
         UNHEALTHY_MARKER.unlink()
 
 
+@pytest.fixture(autouse=True)
+def reset_heal_cache(monkeypatch) -> None:
+    monkeypatch.setattr("app.main._HEAL_CACHE", None)
+    monkeypatch.setattr("healer.signatures._CACHE", None)
+
+
+@pytest.fixture(autouse=True)
+def no_impact_index(monkeypatch) -> None:
+    # A locally built artifacts/test_impact.sqlite must not change what tests select.
+    monkeypatch.setenv("HEALER_IMPACT_INDEX", "")
+
+
 @pytest.fixture
 def client() -> TestClient:
     return TestClient(app)
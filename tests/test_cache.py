@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from webhook.cache import ResultCache
+
+
+def test_concurrent_callers_coalesce_onto_one_execution():
+    cache = ResultCache()
+    executions = 0
+
+    async def _compute() -> dict[str, str]:
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return {"status": "completed"}
+
+    async def _main() -> list[tuple[object, str]]:
+        return await asyncio.gather(*(cache.get_or_compute("corr:abc", _compute) for _ in range(5)))
+
+    results = asyncio.run(_main())
+    later = asyncio.run(cache.get_or_compute("corr:abc", _compute))
+
+    assert executions == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 4 + ["miss"]
+    assert later == ({"status": "completed"}, "hit")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_failures_are_shared_with_waiters_but_not_cached():
+    cache = ResultCache()
+
+    async def _fail() -> dict[str, str]:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("hub down")
+
+    async def _main() -> list[object]:
+        return await asyncio.gather(*(cache.get_or_compute("k", _fail) for _ in range(2)), return_exceptions=True)
+
+    errors = asyncio.run(_main())
+
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert cache.stats()["entries"] == 0
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute("k", _fail))
+
+
+def test_entries_expire_and_lru_evicts(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("webhook.cache.time.monotonic", lambda: clock[0])
+    cache = ResultCache(max_entries=2, ttl_seconds=10)
+
+    async def _value(value: str):  # type: ignore[no-untyped-def]
+        return value
+
+    for key in ("a", "b", "c"):
+        asyncio.run(cache.get_or_compute(key, lambda key=key: _value(key)))
+
+    assert cache.stats()["evictions"] == 1
+    assert asyncio.run(cache.get_or_compute("c", lambda: _value("new")))[1] == "hit"
+
+    clock[0] += 11
+    assert asyncio.run(cache.get_or_compute("c", lambda: _value("new"))) == ("new", "miss")
+    assert cache.stats()["expired"] == 1
@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-from healer.classifier import classify_pytest_output
+from healer.classifier import (
+    DEFAULT_RULES,
+    RULES,
+    Rule,
+    RuleSet,
+    StreamingClassifier,
+    classify_log_file,
+    classify_pytest_output,
+)
 from healer.types import FailureType
 
 
@@ -23,3 +31,186 @@ def test_classify_none_type_error():
 def test_classify_unknown():
     failure = classify_pytest_output("something unrelated")
     assert failure.failure_type == FailureType.UNKNOWN
+
+
+def test_classify_prefers_higher_priority_rule():
+    output = "\n".join(
+        [
+            "tests/test_other.py:4: AssertionError: assert 1 == 2",
+            "app/logic.py:6: TypeError: unsupported operand type(s) for /: 'NoneType' and 'int'",
+            "tests/test_compute.py:10: ZeroDivisionError: division by zero",
+        ]
+    )
+    failure = classify_pytest_output(output)
+
+    assert failure.failure_type == FailureType.ZERO_DIVISION
+    assert failure.file == "tests/test_compute.py"
+    assert failure.line == 10
+
+
+def test_classify_uses_nearest_preceding_file_line():
+    output = "\n".join(
+        [
+            "tests/test_a.py::test_ok PASSED",
+            "    tests/test_helpers.py:3: in helper",
+            "app/logic.py:6: in compute_ratio",
+            "    return numerator / denominator",
+            "E   ZeroDivisionError: division by zero",
+            "tests/test_z.py:99: summary",
+        ]
+    )
+    failure = classify_pytest_output(output)
+
+    assert failure.file == "app/logic.py"
+    assert failure.line == 6
+
+
+_MULTI_FRAME_TRACEBACK = [
+    "=================================== FAILURES ===================================",
+    "_________________________________ test_ratio _________________________________",
+    "",
+    "    def test_ratio():",
+    ">       compute_ratio(1, 0)",
+    "",
+    "tests/test_x.py:3: ",
+    "_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _",
+    "",
+    "    def compute_ratio(numerator, denominator):",
+    ">       return numerator / denominator",
+    "E       ZeroDivisionError: division by zero",
+    "",
+    "app/logic.py:2: ZeroDivisionError",
+    "=========================== short test summary info ============================",
+    "FAILED tests/test_x.py::test_ratio - ZeroDivisionError: division by zero",
+]
+
+
+def test_classify_prefers_the_crash_line_of_a_multi_frame_traceback(tmp_path, monkeypatch):
+    # Tiny windows make the log file scan cross window edges on its way to the crash line.
+    monkeypatch.setattr("healer.classifier._LOG_WINDOW_BYTES", 64)
+    monkeypatch.setattr("healer.classifier._MAX_REFERENCE_BYTES", 64)
+    output = "\n".join(_MULTI_FRAME_TRACEBACK)
+    log = tmp_path / "pytest.log"
+    log.write_text(output)
+    classifier = StreamingClassifier()
+    for line in _MULTI_FRAME_TRACEBACK:
+        classifier.feed(line)
+
+    failure = classify_pytest_output(output)
+
+    assert failure.failure_type == FailureType.ZERO_DIVISION
+    assert (failure.file, failure.line) == ("app/logic.py", 2)
+    assert classify_log_file(log) == failure
+    assert classifier.result() == failure
+
+
+def test_classify_falls_back_to_the_preceding_frame_before_the_next_test():
+    output = "\n".join(
+        [
+            "app/logic.py:6: in compute_ratio",
+            "E   ZeroDivisionError: division by zero",
+            "____ test_other ____",
+            "tests/test_other.py:9: AssertionError",
+        ]
+    )
+
+    assert classify_pytest_output(output).file == "app/logic.py"
+
+
+def test_classify_none_type_tokens_on_separate_lines():
+    output = "app/logic.py:6: in compute_ratio\nE   TypeError: unsupported operand\nE   (got NoneType)"
+    failure = classify_pytest_output(output)
+
+    assert failure.failure_type == FailureType.NONE_TYPE_ERROR
+    assert failure.line == 6
+
+
+def test_classify_custom_rule_set_with_alternation_scan():
+    extra = tuple(Rule(FailureType.UNKNOWN, (f"Custom{index}Error",), "custom") for index in range(40))
+    rules = RuleSet.compile((*RULES, *extra))
+    output = "Custom7Error first\ntests/test_compute.py:10: AssertionError"
+
+    assert rules.pattern is not None
+    assert rules.classify(output).failure_type == FailureType.ASSERTION_FAILURE
+    assert rules.classify("x.py:1: Custom7Error").message == "custom"
+    assert rules.classify(output) == DEFAULT_RULES.classify(output)
+
+
+def test_alternation_scan_matches_per_token_find_with_overlapping_tokens():
+    # Over the find limit, with tokens that overlap ("abcd" / "cdef") or prefix
+    # one another ("Value" / "ValueError"), so no occurrence may hide another.
+    extra = tuple(Rule(FailureType.UNKNOWN, (f"Custom{index}Error",), f"custom {index}") for index in range(40))
+    overlapping = (
+        Rule(FailureType.UNKNOWN, ("cdef",), "overlap"),
+        Rule(FailureType.UNKNOWN, ("Value", "ErrorX"), "prefix"),
+        Rule(FailureType.UNKNOWN, ("abcd",), "shadow"),
+        Rule(FailureType.UNKNOWN, ("ValueError",), "longer"),
+    )
+    scanned = RuleSet.compile((*RULES, *overlapping, *extra))
+    found = RuleSet(rules=scanned.rules, tokens=scanned.tokens, pattern=None)
+    outputs = [
+        "abcdef",
+        "xx ValueErrorX yy",
+        "ValueError then abcd",
+        "Custom1Error Custom12Error",
+        "Custom3 Custom33Error NoneType TypeError",
+        "no tokens at all",
+    ]
+
+    assert len(scanned.tokens) > 32 and scanned.pattern is not None
+    for output in outputs:
+        assert scanned.match(output) == found.match(output), output
+    assert scanned.classify("abcdef").message == "overlap"
+    assert scanned.classify("xx ValueErrorX yy").message == "prefix"
+
+
+def test_streaming_classifier_emits_once_signature_is_complete():
+    classifier = StreamingClassifier(tail_lines=2)
+
+    assert classifier.feed("app/logic.py:6: in compute_ratio") is None
+    assert classifier.feed("E   TypeError: unsupported operand") is None
+    failure = classifier.feed("E   (got NoneType)")
+    assert failure is not None
+    assert failure.failure_type == FailureType.NONE_TYPE_ERROR
+    assert (failure.file, failure.line) == ("app/logic.py", 6)
+    assert classifier.feed("E   (got NoneType)") is None
+
+    classifier.feed("tests/test_compute.py:10: ZeroDivisionError")
+    assert classifier.result().failure_type == FailureType.ZERO_DIVISION
+    assert classifier.tail() == "E   (got NoneType)\ntests/test_compute.py:10: ZeroDivisionError"
+
+
+def test_streaming_classifier_matches_batch_classification():
+    lines = [
+        "tests/test_a.py::test_ok PASSED",
+        "    tests/test_helpers.py:3: in helper",
+        "app/logic.py:6: in compute_ratio",
+        "E   AssertionError: assert 1 == 2",
+    ]
+    classifier = StreamingClassifier()
+    for line in lines:
+        classifier.feed(line)
+
+    assert classifier.result() == classify_pytest_output("\n".join(lines))
+
+
+def test_classify_log_file_matches_in_memory_classification(tmp_path, monkeypatch):
+    # Tiny windows force tokens and references across window edges.
+    monkeypatch.setattr("healer.classifier._LOG_WINDOW_BYTES", 64)
+    monkeypatch.setattr("healer.classifier._MAX_REFERENCE_BYTES", 64)
+    output = "\n".join(
+        [
+            "tests/test_a.py::test_ok PASSED " + "." * 90,
+            "    tests/test_helpers.py:3: in helper",
+            "app/logic.py:6: in compute_ratio" + " " * 70,
+            "E   TypeError: unsupported operand type(s) for /: 'NoneType' and 'int'",
+        ]
+    )
+    log = tmp_path / "pytest.log"
+    log.write_text(output)
+    empty = tmp_path / "empty.log"
+    empty.write_text("")
+
+    assert classify_log_file(log) == classify_pytest_output(output)
+    assert classify_log_file(log).file == "app/logic.py"
+    assert classify_log_file(empty).failure_type == FailureType.UNKNOWN
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+import app.logic as logic
+
+
+def test_compute_batch_returns_per_element_results_and_errors(client):
+    response = client.post(
+        "/compute/batch",
+        json={"numerators": [8, 1, None, 9], "denominators": [2, 0, 3, -3]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [4.0, None, None, -3.0],
+        "errors": [
+            None,
+            {"error": "invalid_input", "message": "denominator must be non-zero"},
+            {"error": "invalid_input", "message": "numerator and denominator must be numbers"},
+            None,
+        ],
+    }
+
+
+def test_compute_batch_rejects_mismatched_lengths(client):
+    response = client.post("/compute/batch", json={"numerators": [1, 2], "denominators": [1]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "invalid_input"
+
+
+def test_batch_routes_guarded_elements_through_compute_ratio(monkeypatch):
+    seen: list[tuple[object, object]] = []
+
+    def _guard(numerator, denominator):  # type: ignore[no-untyped-def]
+        seen.append((numerator, denominator))
+        raise ValueError("guarded")
+
+    monkeypatch.setattr(logic, "compute_ratio", _guard)
+
+    results = logic.compute_ratio_batch([6, 1, None], [3, 0, 2])
+
+    assert results == [(2.0, None), (None, "guarded"), (None, "guarded")]
+    assert seen == [(1, 0), (None, 2)]
+
+
+def test_batch_without_numpy_matches_vectorized_path(monkeypatch):
+    numerators = [8.0, 1.0, None, 5.0]
+    denominators = [2.0, 0.0, 1.0, 4.0]
+    vectorized = logic.compute_ratio_batch(numerators, denominators)
+
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    assert logic.compute_ratio_batch(numerators, denominators) == vectorized
+
+
+def test_batch_surfaces_unguarded_errors_like_scalar_path(monkeypatch):
+    monkeypatch.setattr(logic, "compute_ratio", lambda numerator, denominator: numerator / denominator)
+
+    with pytest.raises(ZeroDivisionError):
+        logic.compute_ratio_batch([1.0], [0.0])
+
+
+def test_batch_reports_overflowing_ratios_per_item(client, recwarn):
+    response = client.post(
+        "/compute/batch",
+        json={"numerators": [1e308, 6], "denominators": [1e-10, 3]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [None, 2.0],
+        "errors": [{"error": "invalid_input", "message": "result is not a finite number"}, None],
+    }
+    assert not [warning for warning in recwarn if issubclass(warning.category, RuntimeWarning)]
+
+
+def test_batch_without_numpy_reports_overflow_the_same_way(monkeypatch):
+    vectorized = logic.compute_ratio_batch([1e308, 6.0], [1e-10, 3.0])
+
+    monkeypatch.setitem(sys.modules, "numpy", None)
+
+    assert logic.compute_ratio_batch([1e308, 6.0], [1e-10, 3.0]) == vectorized == [
+        (None, logic.NON_FINITE_RESULT),
+        (2.0, None),
+    ]
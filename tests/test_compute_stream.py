@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+
+from app.streaming import NdjsonRatioStream
+
+
+def test_compute_stream_returns_results_and_inline_errors(client):
+    body = "\n".join(
+        [
+            '{"numerator": 8, "denominator": 2}',
+            '{"numerator": 1, "denominator": 0}',
+            "",
+            "not json",
+            '{"numerator": "8", "denominator": 2}',
+            '{"numerator": null, "denominator": 2}',
+            '{"numerator": 9, "denominator": 3}',
+        ]
+    )
+
+    response = client.post("/compute/stream", content=body)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records == [
+        {"result": 4.0},
+        {"line": 2, "error": "invalid_input", "message": "denominator must be non-zero"},
+        {"line": 4, "error": "invalid_json", "message": "expected an object with numerator and denominator"},
+        {"line": 5, "error": "invalid_input", "message": "numerator and denominator must be numbers"},
+        {"line": 6, "error": "invalid_input", "message": "numerator and denominator must be numbers"},
+        {"result": 3.0},
+    ]
+
+
+def test_stream_handles_records_split_across_chunks():
+    stream = NdjsonRatioStream()
+    data = b'{"numerator": 6, "denominator": 3}\n{"numerator": 1, "denominator": 4}\n'
+
+    out = b"".join(stream.feed(data[index : index + 7]) for index in range(0, len(data), 7))
+    out += stream.finish()
+
+    assert out.splitlines() == [b'{"result":2.0}', b'{"result":0.25}']
+    assert stream.records == 2
+
+
+def test_stream_discards_oversized_lines_without_buffering_them():
+    stream = NdjsonRatioStream(max_line_bytes=16)
+
+    out = stream.feed(b'{"numerator": 1, "denominator"')
+    out += stream.feed(b": 1, " + b" " * 100)
+    out += stream.feed(b'}\n{"numerator": 4, "denominator": 2}\n')
+    out += stream.finish()
+
+    lines = [json.loads(line) for line in out.splitlines()]
+    assert lines[0]["error"] == "invalid_json"
+    assert lines[1] == {"result": 2.0}
+
+
+def test_stream_reports_overflowing_integers_inline(monkeypatch):
+    # The stdlib parser keeps big integers exact, so the division itself overflows.
+    monkeypatch.setattr("app.streaming._loads", json.loads)
+    stream = NdjsonRatioStream()
+
+    out = stream.feed(b'{"numerator": 1' + b"0" * 400 + b', "denominator": 3}\n{"numerator": 1, "denominator": 2}\n')
+    out += stream.finish()
+
+    lines = [json.loads(line) for line in out.splitlines()]
+    assert lines[0]["line"] == 1 and lines[0]["error"] == "invalid_input"
+    assert lines[1] == {"result": 0.5}
+    assert stream.errors == 1
@@ -54,3 +54,52 @@ def test_apply_fix_restores_none_guard_and_adds_regression(monkeypatch, tmp_path
     assert tests in changed
     assert "must be numbers" in logic.read_text()
     assert "test_logic_none_type_regression" in tests.read_text()
+
+
+def test_fix_candidates_apply_inside_the_given_root(tmp_path: Path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "tests").mkdir()
+    logic = tmp_path / "app" / "logic.py"
+    logic.write_text("def compute_ratio(numerator, denominator):\n    return numerator / denominator\n")
+    (tmp_path / "tests" / "test_compute.py").write_text("def test_placeholder():\n    assert True\n")
+
+    candidates = fixers.fix_candidates([FailureInfo(failure_type=FailureType.ZERO_DIVISION)])
+    assert [candidate.name for candidate in candidates] == ["guard", "all_guards"]
+
+    changed = candidates[1].apply(tmp_path)
+
+    assert changed == [logic, tmp_path / "tests" / "test_compute.py"]
+    assert "denominator must be non-zero" in logic.read_text()
+    assert "must be numbers" in logic.read_text()
+
+
+def test_revert_candidate_is_only_proposed_when_asked_for(monkeypatch):
+    monkeypatch.setattr(fixers, "_committed_sources", lambda failures: {"app/logic.py": "committed\n"})
+    failures = [FailureInfo(failure_type=FailureType.UNKNOWN, file="app/logic.py")]
+
+    assert [candidate.name for candidate in fixers.fix_candidates(failures)] == ["guard"]
+    assert [candidate.name for candidate in fixers.fix_candidates(failures, revert=True)] == ["guard", "revert"]
+
+
+def test_write_atomically_leaves_the_old_file_when_interrupted(monkeypatch, tmp_path: Path):
+    logic = tmp_path / "logic.py"
+    logic.write_text("original\n")
+    logic.chmod(0o640)
+
+    def _killed(src, dst):  # type: ignore[no-untyped-def]
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patched:
+        patched.setattr(fixers.os, "replace", _killed)
+        try:
+            fixers.write_atomically(logic, "half written")
+        except KeyboardInterrupt:
+            pass
+
+    assert logic.read_text() == "original\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["logic.py"]
+
+    fixers.write_atomically(logic, "patched\n")
+
+    assert logic.read_text() == "patched\n"
+    assert logic.stat().st_mode & 0o777 == 0o640
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from webhook.jobs import HealJob, JobQueue
+from webhook.service import HealOutcome
+
+
+class _ReporterSpy:
+    def __init__(self) -> None:
+        self.calls: list[dict[str, object]] = []
+
+    async def emit_async(self, **kwargs):  # type: ignore[no-untyped-def]
+        self.calls.append(kwargs)
+        return {}
+
+
+def _auth_headers() -> dict[str, str]:
+    return {"Authorization": "Bearer healer-secret"}
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    monkeypatch.setenv("SELF_HEALER_TOKEN", "healer-secret")
+    queue = JobQueue(max_workers=1, max_pending=0)
+    monkeypatch.setattr("app.main._JOBS", queue)
+    yield queue
+    queue.close(timeout=1)
+
+
+def _blocking_heal(release: threading.Event):  # type: ignore[no-untyped-def]
+    def _heal(payload, signature=None):  # type: ignore[no-untyped-def]
+        release.wait(5)
+        return HealOutcome(
+            status="completed",
+            reason_code=None,
+            human_context=None,
+            patch_summary="Applied ZERO_DIVISION remediation.",
+            changed_files=["app/logic.py"],
+        )
+
+    return _heal
+
+
+def _wait_for_job(client, job_id: str) -> dict[str, object]:  # type: ignore[no-untyped-def]
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = client.get(f"/heal/jobs/{job_id}", headers=_auth_headers()).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_async_heal_returns_202_and_deduplicates_by_correlation_id(client, monkeypatch, jobs):
+    spy = _ReporterSpy()
+    release = threading.Event()
+    monkeypatch.setattr("app.main._reporter", lambda: spy)
+    monkeypatch.setattr("app.main.heal_from_payload", _blocking_heal(release))
+    body = {"correlationId": "corr-async", "payload": {"output": "ZeroDivisionError"}}
+
+    first = client.post("/heal?async=true", json=body, headers=_auth_headers())
+    second = client.post("/heal?async=true", json=body, headers=_auth_headers())
+
+    assert first.status_code == 202
+    assert first.headers["location"] == f"/heal/jobs/{first.json()['jobId']}"
+    assert second.json()["jobId"] == first.json()["jobId"]
+    assert second.json()["deduplicated"] is True
+
+    release.set()
+    job = _wait_for_job(client, first.json()["jobId"])
+
+    assert job["result"] == {
+        "status": "completed",
+        "patchSummary": "Applied ZERO_DIVISION remediation.",
+        "changedFiles": ["app/logic.py"],
+        "verificationTargets": [],
+    }
+    assert [event["stage"] for event in job["events"]] == [
+        "queued",
+        "running",
+        "heal.attempted",
+        "healer.finished",
+        "cache",
+        "succeeded",
+    ]
+    assert [call["event_type"] for call in spy.calls] == ["heal.attempted", "heal.completed"]
+
+
+def test_async_heal_rejects_when_queue_is_full(client, monkeypatch, jobs):
+    release = threading.Event()
+    monkeypatch.setattr("app.main._reporter", lambda: _ReporterSpy())
+    monkeypatch.setattr("app.main.heal_from_payload", _blocking_heal(release))
+
+    accepted = client.post(
+        "/heal?async=true",
+        json={"correlationId": "corr-a", "payload": {}},
+        headers=_auth_headers(),
+    )
+    rejected = client.post(
+        "/heal?async=true",
+        json={"correlationId": "corr-b", "payload": {}},
+        headers=_auth_headers(),
+    )
+    release.set()
+
+    assert accepted.status_code == 202
+    assert rejected.status_code == 503
+    assert rejected.json()["detail"]["error"] == "queue_full"
+    _wait_for_job(client, accepted.json()["jobId"])
+
+
+def test_job_events_stream_ends_with_result(client, monkeypatch, jobs):
+    release = threading.Event()
+    release.set()
+    monkeypatch.setattr("app.main._reporter", lambda: _ReporterSpy())
+    monkeypatch.setattr("app.main.heal_from_payload", _blocking_heal(release))
+
+    accepted = client.post(
+        "/heal?async=true",
+        json={"correlationId": "corr-sse", "payload": {}},
+        headers=_auth_headers(),
+    )
+    response = client.get(f"{accepted.json()['eventsUrl']}", headers=_auth_headers())
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: running" in response.text
+    assert response.text.rstrip().splitlines()[-2] == "event: result"
+
+
+def test_unknown_job_returns_404(client, jobs):
+    response = client.get("/heal/jobs/missing", headers=_auth_headers())
+
+    assert response.status_code == 404
+
+
+def test_next_events_wakes_the_subscriber_loop_from_another_thread():
+    job = HealJob(id="job-1", key="corr-1")
+    job.record("queued")
+
+    async def _subscribe() -> tuple[list[dict[str, object]], float]:
+        threading.Timer(0.05, job.record, args=("running",)).start()
+        started = time.monotonic()
+        events = await job.next_events(1, timeout=5)
+        return events, time.monotonic() - started
+
+    events, waited = asyncio.run(_subscribe())
+
+    assert [event["stage"] for event in events] == ["running"]
+    assert waited < 2
+    assert not job._watchers
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import time
 
-from webhook.service import HealOutcome
+from webhook.service import HealOutcome, failure_keys
 
 
 class _ReporterSpy:
@@ -13,6 +14,9 @@ class _ReporterSpy:
         self.calls.append(kwargs)
         return {}
 
+    async def emit_async(self, **kwargs):  # type: ignore[no-untyped-def]
+        return self.emit(**kwargs)
+
 
 def _auth_headers() -> dict[str, str]:
     return {"Authorization": "Bearer healer-secret"}
@@ -25,7 +29,7 @@ def test_heal_known_failure_emits_attempted_then_completed(client, monkeypatch):
     monkeypatch.setattr("app.main._reporter", lambda: spy)
     monkeypatch.setattr(
         "app.main.heal_from_payload",
-        lambda payload: HealOutcome(
+        lambda payload, signature=None: HealOutcome(
             status="completed",
             reason_code=None,
             human_context=None,
@@ -59,7 +63,7 @@ def test_heal_unknown_failure_emits_attempted_then_escalated(client, monkeypatch
     monkeypatch.setattr("app.main._reporter", lambda: spy)
     monkeypatch.setattr(
         "app.main.heal_from_payload",
-        lambda payload: HealOutcome(
+        lambda payload, signature=None: HealOutcome(
             status="escalated",
             reason_code="unknown_failure_signature",
             human_context={"summary": "Could not classify"},
@@ -95,7 +99,7 @@ def test_heal_timeout_emits_timeout_escalation(client, monkeypatch):
     spy = _ReporterSpy()
     monkeypatch.setattr("app.main._reporter", lambda: spy)
 
-    def _slow_heal(payload):  # type: ignore[no-untyped-def]
+    def _slow_heal(payload, signature=None):  # type: ignore[no-untyped-def]
         time.sleep(0.1)
         return HealOutcome(
             status="completed",
@@ -132,3 +136,107 @@ def test_heal_requires_bearer_auth(client, monkeypatch):
     )
 
     assert response.status_code == 401
+
+
+def test_heal_retries_with_same_failure_are_served_from_cache(client, monkeypatch):
+    monkeypatch.setenv("SELF_HEALER_TOKEN", "healer-secret")
+
+    spy = _ReporterSpy()
+    calls: list[dict[str, object]] = []
+    signatures: list[str | None] = []
+
+    def _heal(payload, signature=None):  # type: ignore[no-untyped-def]
+        calls.append(payload)
+        signatures.append(signature)
+        return HealOutcome(
+            status="completed",
+            reason_code=None,
+            human_context=None,
+            patch_summary="Applied ZERO_DIVISION remediation.",
+            changed_files=["app/logic.py"],
+        )
+
+    on_loop: list[bool] = []
+
+    def _failure_keys(payload):  # type: ignore[no-untyped-def]
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return failure_keys(payload)
+
+    monkeypatch.setattr("app.main._reporter", lambda: spy)
+    monkeypatch.setattr("app.main.heal_from_payload", _heal)
+    monkeypatch.setattr("webhook.service.failure_keys", _failure_keys)
+
+    def _post(output: str):  # type: ignore[no-untyped-def]
+        return client.post(
+            "/heal",
+            json={"correlationId": "corr-retry", "payload": {"output": output}},
+            headers=_auth_headers(),
+        )
+
+    first = _post("FAILED tests/test_compute.py - ZeroDivisionError in 0.42s")
+    retry = _post("FAILED tests/test_compute.py - ZeroDivisionError in 0.57s")
+
+    assert first.headers["x-heal-cache"] == "miss"
+    assert retry.headers["x-heal-cache"] == "hit"
+    assert on_loop == [False, False]
+    assert retry.json() == first.json()
+    assert len(calls) == 1
+    # The healer reuses the signature instead of hashing the log again.
+    assert signatures == [failure_keys(calls[0])[1]]
+    assert [call["event_type"] for call in spy.calls] == ["heal.attempted", "heal.completed"]
+
+
+def test_heal_windows_output_before_handing_it_to_a_worker(client, monkeypatch):
+    monkeypatch.setenv("SELF_HEALER_TOKEN", "healer-secret")
+    monkeypatch.setenv("HEALER_MAX_OUTPUT_CHARS", "4096")
+    sent: list[dict[str, object]] = []
+
+    class _Pool:
+        def run(self, payload, timeout, **options):  # type: ignore[no-untyped-def]
+            sent.append(payload)
+            return HealOutcome("escalated", "unknown_failure_signature", {"summary": "?"}, None, [])
+
+    monkeypatch.setattr("app.main._reporter", lambda: _ReporterSpy())
+    monkeypatch.setattr("app.main._worker_pool", lambda: _Pool())
+
+    response = client.post(
+        "/heal",
+        json={"correlationId": "corr-window", "payload": {"logs": "x" * 100_000}},
+        headers=_auth_headers(),
+    )
+
+    assert response.status_code == 200
+    assert list(sent[0]) == ["output"]
+    assert len(sent[0]["output"]) <= 4096
+
+
+def test_heal_returns_its_outcome_when_reporting_it_fails(client, monkeypatch, caplog):
+    from webhook.reporter import CircuitOpenError
+
+    monkeypatch.setenv("SELF_HEALER_TOKEN", "healer-secret")
+
+    class _OpensAfterAttempt(_ReporterSpy):
+        async def emit_async(self, **kwargs):  # type: ignore[no-untyped-def]
+            if kwargs["event_type"] != "heal.attempted":
+                raise CircuitOpenError("mission-control circuit is open; failing fast")
+            return self.emit(**kwargs)
+
+    monkeypatch.setattr("app.main._reporter", lambda: _OpensAfterAttempt())
+    monkeypatch.setattr(
+        "app.main.heal_from_payload",
+        lambda payload, signature=None: HealOutcome("completed", None, None, "Applied fix.", ["app/logic.py"]),
+    )
+
+    response = client.post(
+        "/heal",
+        json={"correlationId": "corr-open", "payload": {"output": "ZeroDivisionError"}},
+        headers=_auth_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    assert "Could not report heal.completed for corr-open" in caplog.text
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 
 def test_healthz(client):
     response = client.get("/healthz")
@@ -13,3 +15,45 @@ def test_readyz(client):
 
     assert response.status_code == 200
     assert response.json() == {"status": "ready"}
+
+
+def test_reporter_health_reports_open_circuit(client, monkeypatch):
+    from webhook.reporter import CircuitBreaker, EventReporter
+
+    breaker = CircuitBreaker(minimum_calls=1)
+    breaker.record_failure()
+    reporter = EventReporter(base_url="http://mission-control:3000", token="t", breaker=breaker)
+    monkeypatch.setattr("app.main._reporter", lambda: reporter)
+
+    response = client.get("/healthz/reporter")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "degraded"
+    assert body["circuit"]["state"] == "open"
+
+
+def test_background_startup_failure_is_logged_and_reported(monkeypatch, caplog):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    def _fail() -> None:
+        raise RuntimeError("worker spawn failed")
+
+    monkeypatch.setattr("app.main._start_background_services", _fail)
+    monkeypatch.setattr("app.main._STARTUP_ERROR", None)
+
+    with TestClient(app) as client:
+        # The startup task runs in a thread; wait for its done-callback.
+        for _ in range(500):
+            if "worker spawn failed" in caplog.text:
+                break
+            time.sleep(0.01)
+            client.get("/healthz")
+        reporter = client.get("/healthz/reporter").json()
+        healer = client.get("/healthz/healer").json()
+
+    assert "Background service startup failed" in caplog.text
+    assert reporter["status"] == healer["status"] == "degraded"
+    assert healer["startupError"] == "RuntimeError: worker spawn failed"
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import pytest
+
+from healer.impact import ImpactIndex, impact_index, line_spans, refresh
+
+
+def _project(root):
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "__init__.py").write_text("")
+    (root / "pkg" / "calc.py").write_text(
+        "def double(x):\n    # twice\n    y = x * 2\n\n    return y\n\n\n"
+        "def sign(x):\n    if x < 0:\n        return -1\n    return 1\n"
+    )
+    (root / "tests").mkdir()
+    (root / "tests" / "test_calc.py").write_text(
+        "from pkg.calc import double, sign\n\n\n"
+        "def test_double():\n    assert double(2) == 4\n\n\n"
+        "def test_sign():\n    assert sign(3) == 1\n"
+    )
+    (root / "tests" / "test_other.py").write_text("def test_other():\n    assert True\n")
+    return root
+
+
+def test_line_spans_merge_runs_of_executed_statements():
+    statements = [1, 3, 5, 8, 9, 10, 11]
+
+    assert line_spans([3, 5, 9, 11], statements) == [(3, 5), (9, 9), (11, 11)]
+    assert line_spans([1, 3, 5, 8, 9, 10, 11], statements) == [(1, 11)]
+    assert line_spans([], statements) == []
+
+
+def test_tests_for_looks_up_lines_while_the_file_is_unchanged(tmp_path):
+    root = _project(tmp_path)
+    index = ImpactIndex(tmp_path / "impact.sqlite")
+    index.record(
+        {
+            "tests/test_calc.py::test_double": {"pkg/calc.py": [(3, 5)]},
+            "tests/test_calc.py::test_sign": {"pkg/calc.py": [(9, 9), (11, 11)]},
+        },
+        root,
+    )
+
+    assert index.tests_for({"pkg/calc.py": {4}}, root) == ["tests/test_calc.py::test_double"]
+    assert index.tests_for({"pkg/calc.py": {10}}, root) == []
+    assert index.tests_for({"pkg/calc.py": None}, root) == [
+        "tests/test_calc.py::test_double",
+        "tests/test_calc.py::test_sign",
+    ]
+    assert index.tests_for({"pkg/new.py": None}, root) is None
+
+    # Recorded line numbers no longer apply once the file is edited.
+    calc = root / "pkg" / "calc.py"
+    calc.write_text("\n" + calc.read_text())
+    assert len(index.tests_for({"pkg/calc.py": {4}}, root) or []) == 2
+
+
+def test_impact_index_is_off_until_built(monkeypatch, tmp_path):
+    monkeypatch.setenv("HEALER_IMPACT_INDEX", str(tmp_path / "impact.sqlite"))
+    assert impact_index() is None
+
+    ImpactIndex(tmp_path / "impact.sqlite").create()
+    assert impact_index() is not None
+
+
+def test_refresh_records_the_suite_then_reruns_only_what_changed(tmp_path):
+    pytest.importorskip("coverage")
+    root = _project(tmp_path / "project")
+    index = ImpactIndex(tmp_path / "impact.sqlite")
+
+    built = refresh(index, root)
+
+    assert built["mode"] == "full" and built["tests"] == 3
+    assert index.tests_for({"pkg/calc.py": {3}}, root) == ["tests/test_calc.py::test_double"]
+    assert index.tests_for({"pkg/calc.py": {9}}, root) == ["tests/test_calc.py::test_sign"]
+
+    calc = root / "pkg" / "calc.py"
+    calc.write_text(calc.read_text().replace("return 1", "return +1"))
+    (root / "tests" / "test_negative.py").write_text(
+        "from pkg.calc import sign\n\n\ndef test_negative():\n    assert sign(-1) == -1\n"
+    )
+
+    changed, targets = index.stale(root)
+    assert changed == ["pkg/calc.py"]
+    # Every test that executed the edited file is re-run, not just the one on the edited line.
+    assert targets == ["tests/test_negative.py", "tests/test_calc.py::test_double", "tests/test_calc.py::test_sign"]
+
+    updated = refresh(index, root)
+
+    assert updated["mode"] == "incremental" and updated["targets"] == 3
+    assert index.stale(root) == ([], [])
+    assert index.tests_for({"pkg/calc.py": {10}}, root) == ["tests/test_negative.py::test_negative"]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import healer.fixers as fixers
+from healer.locks import FileLockManager
+from healer.types import FailureInfo, FailureType
+
+
+def test_same_file_is_serialized_and_disjoint_files_run_in_parallel(tmp_path: Path):
+    manager = FileLockManager(lock_dir=tmp_path / "locks", max_concurrent=4)
+    running: dict[str, int] = {"logic": 0, "max_logic": 0, "total": 0, "max_total": 0}
+    guard = threading.Lock()
+
+    def _work(path: Path, name: str) -> None:
+        with manager.hold([path]):
+            with guard:
+                running[name] = running.get(name, 0) + 1
+                running["total"] += 1
+                running["max_logic"] = max(running["max_logic"], running["logic"])
+                running["max_total"] = max(running["max_total"], running["total"])
+            time.sleep(0.05)
+            with guard:
+                running[name] -= 1
+                running["total"] -= 1
+
+    threads = [threading.Thread(target=_work, args=(tmp_path / "logic.py", "logic")) for _ in range(3)]
+    threads.append(threading.Thread(target=_work, args=(tmp_path / "other.py", "other")))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = manager.stats()
+    assert running["max_logic"] == 1
+    assert running["max_total"] == 2
+    assert stats["acquisitions"] == 4
+    assert stats["contended"] >= 2
+    assert stats["wait_seconds_max"] > 0
+    assert stats["active"] == 0
+
+
+def test_concurrency_cap_limits_holders_across_files(tmp_path: Path):
+    manager = FileLockManager(lock_dir=None, max_concurrent=1)
+    active = []
+    peak = []
+
+    def _work(index: int) -> None:
+        with manager.hold([tmp_path / f"file-{index}.py"]):
+            active.append(index)
+            peak.append(len(active))
+            time.sleep(0.02)
+            active.remove(index)
+
+    threads = [threading.Thread(target=_work, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 1
+
+
+def test_concurrent_fixes_do_not_lose_updates(monkeypatch, tmp_path: Path):
+    logic = tmp_path / "logic.py"
+    logic.write_text(
+        "def compute_ratio(numerator, denominator):\n"
+        "    return numerator / denominator\n"
+    )
+    tests = tmp_path / "test_compute.py"
+    tests.write_text("def test_placeholder():\n    assert True\n")
+    monkeypatch.setattr(fixers, "LOGIC_FILE", logic)
+    monkeypatch.setattr(fixers, "TEST_FILE", tests)
+
+    failures = [FailureType.ZERO_DIVISION, FailureType.NONE_TYPE_ERROR] * 4
+    threads = [
+        threading.Thread(target=fixers.apply_fix, args=(FailureInfo(failure_type=failure),))
+        for failure in failures
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    source = logic.read_text()
+    assert source.count("GUARD_ZERO_START") == 1
+    assert source.count("GUARD_NONE_START") == 1
+    assert tests.read_text().count("def test_logic_") == 2
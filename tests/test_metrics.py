@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from pathlib import Path
+
+from telemetry import Registry, collect_all, render, write_snapshot
+
+
+def test_histograms_aggregate_per_thread_shards():
+    registry = Registry()
+    latency = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+
+    def _work() -> None:
+        for _ in range(1000):
+            latency.labels("compute").observe(0.05)
+        latency.labels("compute").observe(5.0)
+
+    threads = [threading.Thread(target=_work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = render(registry.collect())
+
+    assert 'op_seconds_bucket{op="compute",le="0.1"} 4000' in text
+    assert 'op_seconds_bucket{op="compute",le="1.0"} 4000' in text
+    assert 'op_seconds_bucket{op="compute",le="+Inf"} 4004' in text
+    assert 'op_seconds_count{op="compute"} 4004' in text
+    assert "# TYPE op_seconds histogram" in text
+
+
+def test_collect_all_merges_snapshots_from_other_processes(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("telemetry.metrics._process_alive", lambda path: True)
+    registry = Registry()
+    other = Registry()
+    for target in (registry, other):
+        target.counter("events_total", "Events.", ("kind",)).labels('say "hi"').inc(2)
+    (tmp_path / "99999-a.json").write_text(json.dumps(other.collect()))
+
+    text = render(collect_all(registry, tmp_path))
+
+    assert 'events_total{kind="say \\"hi\\""} 4' in text
+    assert (tmp_path / "99999-a.json").exists()
+
+
+def test_snapshots_of_exited_processes_fold_into_the_aggregate(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr("telemetry.metrics._process_alive", lambda path: not path.name.startswith("99999-"))
+    registry = Registry()
+    registry.counter("events_total", "Events.").inc(2)
+    for token in ("a", "b"):
+        # Two processes that happened to get the same pid.
+        exited = Registry()
+        exited.counter("events_total", "Events.").inc(3)
+        exited.gauge("circuit_state", "State.").set(1)
+        (tmp_path / f"99999-{token}.json").write_text(json.dumps(exited.collect()))
+
+    first = render(collect_all(registry, tmp_path))
+    second = render(collect_all(registry, tmp_path))
+
+    assert "events_total 8" in first and "events_total 8" in second
+    assert "circuit_state 1" not in first
+    own = write_snapshot(registry, tmp_path)
+    assert own is not None
+    assert {path.name for path in tmp_path.glob("*.json")} == {"aggregate.json", own.name}
+
+
+def test_finished_threads_hand_their_shard_to_the_registry():
+    registry = Registry()
+    events = registry.counter("events_total", "Events.")
+
+    threads = [threading.Thread(target=events.inc) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert "events_total 20" in render(registry.collect())
+    assert registry._shards == []
+
+
+def test_gauges_keep_the_last_value_set():
+    registry = Registry()
+    state = registry.gauge("breaker_state", "Breaker state.", ("state",))
+    state.labels("open").set(1)
+    state.labels("open").set(0)
+    state.labels("closed").set(1)
+
+    text = render(registry.collect())
+
+    assert "# TYPE breaker_state gauge" in text
+    assert 'breaker_state{state="open"} 0' in text
+    assert 'breaker_state{state="closed"} 1' in text
+
+
+def test_metrics_endpoint_reports_request_latency(client):
+    client.post("/compute", json={"numerator": 1, "denominator": 2})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    match = re.search(
+        r'^http_request_duration_seconds_count\{method="POST",route="/compute",status="200"\} (\d+)$',
+        response.text,
+        re.MULTILINE,
+    )
+    assert match is not None
+    assert int(match.group(1)) >= 1
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from webhook.outbox import Outbox, OutboxLockedError, OutboxReplayer
+from webhook.reporter import EventRejectedError, EventReporter, ReporterError
+
+
+def _envelope(index: int) -> dict[str, object]:
+    return {"id": f"evt-{index}", "type": "heal.attempted", "payload": {"n": index}}
+
+
+class _FlakyReporter(EventReporter):
+    def __init__(self, failures: int) -> None:
+        super().__init__(base_url="http://mission-control:3000", token="mission-token")
+        self.failures = failures
+        self.delivered: list[str] = []
+
+    def deliver(self, envelope, body=None):  # type: ignore[no-untyped-def]
+        if self.failures:
+            self.failures -= 1
+            raise ReporterError("hub down")
+        self.delivered.append(envelope["id"])
+
+
+def test_outbox_streams_many_records_across_segments_and_compacts(tmp_path: Path):
+    outbox = Outbox(tmp_path, segment_max_bytes=64 * 1024, fsync_every=1000)
+    for index in range(20_000):
+        outbox.append(_envelope(index))
+    outbox.close()
+
+    assert outbox.stats()["segments"] > 5
+
+    reopened = Outbox(tmp_path)
+    seen = 0
+    for record in reopened.pending():
+        assert record.key == f"evt-{seen}"
+        seen += 1
+        if seen == 15_000:
+            reopened.ack(record)
+            break
+    reopened.commit()
+    removed = reopened.compact()
+
+    assert seen == 15_000
+    assert removed > 0
+
+    resumed = Outbox(tmp_path)
+    remaining = [record.key for record in resumed.pending()]
+    assert remaining[0] == "evt-15000"
+    assert len(remaining) == 5_000
+
+
+def test_outbox_drops_torn_tail_after_crash(tmp_path: Path):
+    outbox = Outbox(tmp_path)
+    outbox.append(_envelope(1))
+    outbox.close()
+
+    segment = next(tmp_path.glob("*.seg"))
+    with segment.open("ab") as handle:
+        handle.write(b'{"key":"evt-2","envel')
+
+    reopened = Outbox(tmp_path)
+    reopened.append(_envelope(3))
+
+    assert [record.key for record in reopened.pending()] == ["evt-1", "evt-3"]
+
+
+def test_claim_gives_each_live_outbox_its_own_directory(tmp_path: Path):
+    first = Outbox.claim(tmp_path)
+    second = Outbox.claim(tmp_path)
+    first.append(_envelope(1))
+    second.append(_envelope(2))
+
+    assert (first.directory.name, second.directory.name) == ("worker-0", "worker-1")
+    with pytest.raises(OutboxLockedError):
+        Outbox(first.directory, exclusive=True).stats()
+
+    # Once released, the next claim takes over the slot and what it still holds.
+    first.close()
+    successor = Outbox.claim(tmp_path)
+    assert successor.directory == first.directory
+    assert [record.key for record in successor.pending()] == ["evt-1"]
+
+
+def test_replayer_drains_in_order_once_hub_recovers(tmp_path: Path):
+    outbox = Outbox(tmp_path)
+    for index in range(3):
+        outbox.append(_envelope(index))
+
+    reporter = _FlakyReporter(failures=1)
+    replayer = OutboxReplayer(outbox=outbox, reporter=reporter, rate_per_second=0)
+
+    assert replayer.drain_once() is False
+    assert replayer.drain_once() is True
+    assert reporter.delivered == ["evt-0", "evt-1", "evt-2"]
+    assert list(outbox.pending()) == []
+
+
+def test_replayer_dead_letters_rejected_records_instead_of_stalling(tmp_path: Path):
+    class _RejectsFirst(_FlakyReporter):
+        def deliver(self, envelope, body=None):  # type: ignore[no-untyped-def]
+            if envelope["id"] == "evt-0":
+                raise EventRejectedError("mission-control rejected the event: 422", 422)
+            super().deliver(envelope, body)
+
+    outbox = Outbox(tmp_path)
+    for index in range(3):
+        outbox.append(_envelope(index))
+    reporter = _RejectsFirst(failures=0)
+    replayer = OutboxReplayer(outbox=outbox, reporter=reporter, rate_per_second=0)
+
+    assert replayer.drain_once() is True
+    assert reporter.delivered == ["evt-1", "evt-2"]
+    assert replayer.replayed == 2
+    assert list(outbox.pending()) == []
+    [dead] = (tmp_path / "dead-letter.jsonl").read_text().splitlines()
+    assert json.loads(dead)["envelope"]["id"] == "evt-0"
+    assert outbox.stats()["dead_lettered"] == 1
+
+
+def test_emit_persists_to_outbox_when_hub_is_down(tmp_path: Path):
+    outbox = Outbox(tmp_path)
+    reporter = _FlakyReporter(failures=1)
+    reporter.outbox = outbox
+
+    envelope = reporter.emit(
+        correlation_id="corr-1",
+        event_type="heal.attempted",
+        severity="info",
+        payload={"status": "started"},
+    )
+
+    [record] = list(outbox.pending())
+    assert record.key == envelope["id"]
+    assert record.envelope["correlationId"] == "corr-1"
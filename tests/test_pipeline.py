@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from webhook.outbox import Outbox
+from webhook.pipeline import EventPipeline
+from webhook.reporter import EventRejectedError, EventReporter, ReporterError
+
+
+class _FakeReporter(EventReporter):
+    def __init__(self, fail: bool = False) -> None:
+        super().__init__(base_url="http://mission-control:3000", token="mission-token")
+        self.batches: list[list[str]] = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = fail
+
+    def deliver_batch(self, envelopes):  # type: ignore[no-untyped-def]
+        self.gate.wait(5)
+        if self.fail:
+            raise ReporterError("hub down")
+        self.batches.append([envelope["correlationId"] for envelope in envelopes])
+
+
+def _emit(pipeline: EventPipeline, index: int) -> dict[str, object]:
+    return pipeline.emit(
+        correlation_id=f"corr-{index}",
+        event_type="heal.attempted",
+        severity="info",
+        payload={},
+    )
+
+
+def test_pipeline_flushes_in_batches_and_reports_depth():
+    reporter = _FakeReporter()
+    reporter.gate.clear()
+    pipeline = EventPipeline(reporter=reporter, batch_size=2, linger_seconds=0.2)
+
+    for index in range(5):
+        _emit(pipeline, index)
+
+    assert pipeline.stats()["enqueued"] == 5
+    reporter.gate.set()
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+
+    flattened = [item for batch in reporter.batches for item in batch]
+    assert flattened == [f"corr-{index}" for index in range(5)]
+    assert all(len(batch) <= 2 for batch in reporter.batches)
+    stats = pipeline.stats()
+    assert stats["delivered"] == 5
+    assert stats["depth"] == 0
+    assert stats["max_depth"] >= 2
+
+
+def test_pipeline_drop_oldest_keeps_newest_events():
+    reporter = _FakeReporter()
+    reporter.gate.clear()
+    pipeline = EventPipeline(
+        reporter=reporter, max_queue_size=2, batch_size=1, linger_seconds=0, policy="drop_oldest"
+    )
+
+    _emit(pipeline, 0)
+    assert _wait_for(lambda: pipeline.stats()["in_flight"] == 1)
+    for index in range(1, 5):
+        _emit(pipeline, index)
+
+    reporter.gate.set()
+    pipeline.close()
+
+    delivered = [item for batch in reporter.batches for item in batch]
+    assert delivered == ["corr-0", "corr-3", "corr-4"]
+    assert pipeline.stats()["dropped"] == 2
+
+
+def test_pipeline_block_policy_times_out_when_full():
+    reporter = _FakeReporter()
+    reporter.gate.clear()
+    pipeline = EventPipeline(
+        reporter=reporter,
+        max_queue_size=1,
+        batch_size=1,
+        linger_seconds=0,
+        block_timeout_seconds=0.05,
+    )
+
+    _emit(pipeline, 0)
+    assert _wait_for(lambda: pipeline.stats()["in_flight"] == 1)
+    _emit(pipeline, 1)
+
+    with pytest.raises(ReporterError, match="full"):
+        _emit(pipeline, 2)
+
+    reporter.gate.set()
+    pipeline.close()
+
+
+def test_pipeline_spills_failed_batches_to_outbox(tmp_path: Path):
+    outbox = Outbox(tmp_path / "outbox")
+    reporter = _FakeReporter(fail=True)
+    pipeline = EventPipeline(
+        reporter=reporter, batch_size=10, linger_seconds=0, policy="spill", outbox=outbox
+    )
+
+    for index in range(3):
+        _emit(pipeline, index)
+    pipeline.close()
+
+    spilled = [record.envelope["correlationId"] for record in outbox.pending()]
+    assert sorted(spilled) == ["corr-0", "corr-1", "corr-2"]
+    assert pipeline.stats()["spilled"] == 3
+
+
+def test_pipeline_spills_only_the_events_the_hub_rejected(tmp_path: Path):
+    class _OneDown(EventReporter):
+        def deliver(self, envelope, body=None):  # type: ignore[no-untyped-def]
+            if envelope["correlationId"] == "corr-1":
+                raise ReporterError("rejected")
+
+    outbox = Outbox(tmp_path / "outbox")
+    reporter = _OneDown(base_url="http://mission-control:3000", token="mission-token")
+    pipeline = EventPipeline(
+        reporter=reporter, batch_size=10, linger_seconds=0.05, policy="spill", outbox=outbox
+    )
+
+    for index in range(3):
+        _emit(pipeline, index)
+    pipeline.close()
+
+    spilled = [record.envelope["correlationId"] for record in outbox.pending()]
+    assert spilled == ["corr-1"]
+    assert pipeline.stats()["spilled"] == 1
+    assert pipeline.stats()["delivered"] == 2
+
+
+
+
+def test_pipeline_dead_letters_events_the_hub_refuses(tmp_path: Path):
+    class _Refuses(EventReporter):
+        def deliver(self, envelope, body=None):  # type: ignore[no-untyped-def]
+            if envelope["correlationId"] == "corr-1":
+                raise EventRejectedError("mission-control rejected the event: 400", 400)
+
+    outbox = Outbox(tmp_path / "outbox")
+    reporter = _Refuses(base_url="http://mission-control:3000", token="mission-token")
+    pipeline = EventPipeline(reporter=reporter, batch_size=10, linger_seconds=0.05, policy="spill", outbox=outbox)
+
+    for index in range(3):
+        _emit(pipeline, index)
+    pipeline.close()
+
+    assert list(outbox.pending()) == []
+    assert "corr-1" in (tmp_path / "outbox" / "dead-letter.jsonl").read_text()
+    assert (pipeline.stats()["rejected"], pipeline.stats()["delivered"]) == (1, 2)
+
+def test_pipeline_keeps_flushing_after_an_unexpected_error(caplog):
+    class _Flaky(_FakeReporter):
+        def deliver_batch(self, envelopes):  # type: ignore[no-untyped-def]
+            if envelopes[0]["correlationId"] == "corr-0":
+                raise OSError("No space left on device")
+            super().deliver_batch(envelopes)
+
+    reporter = _Flaky()
+    pipeline = EventPipeline(reporter=reporter, batch_size=1, linger_seconds=0)
+
+    _emit(pipeline, 0)
+    assert _wait_for(lambda: pipeline.stats()["lost_batches"] == 1)
+    _emit(pipeline, 1)
+    pipeline.close()
+
+    assert reporter.batches == [["corr-1"]]
+    assert pipeline.stats()["failed"] == 1
+    assert "lost a batch of 1 events" in caplog.text
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:  # type: ignore[no-untyped-def]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+
+import httpx
 import pytest
 
-from webhook.reporter import EventReporter, ReporterError
+from telemetry import REGISTRY
+from webhook.outbox import Outbox
+from webhook.reporter import CircuitBreaker, CircuitOpenError, EventRejectedError, EventReporter, ReporterError
 
 
 class _FakeResponse:
@@ -18,18 +24,19 @@ class _FakeClient:
     attempts = 0
     seen_headers: list[dict[str, str]] = []
     seen_timeout = None
+    instances = 0
+    closed = 0
 
-    def __init__(self, timeout: float) -> None:
+    def __init__(self, timeout: float, **kwargs) -> None:  # type: ignore[no-untyped-def]
         self.timeout = timeout
+        self.options = kwargs
         _FakeClient.seen_timeout = timeout
+        _FakeClient.instances += 1
 
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
+    def close(self) -> None:
+        _FakeClient.closed += 1
 
-    def post(self, url, json, headers):  # type: ignore[no-untyped-def]
+    def post(self, url, content, headers):  # type: ignore[no-untyped-def]
         _FakeClient.attempts += 1
         _FakeClient.seen_headers.append(headers)
         if _FakeClient.attempts < 3:
@@ -66,7 +73,7 @@ def test_reporter_raises_after_retry_budget(monkeypatch):
     class _Always500Client(_FakeClient):
         attempts = 0
 
-        def post(self, url, json, headers):  # type: ignore[no-untyped-def]
+        def post(self, url, content, headers):  # type: ignore[no-untyped-def]
             _Always500Client.attempts += 1
             return _FakeResponse(500)
 
@@ -89,3 +96,287 @@ def test_reporter_raises_after_retry_budget(monkeypatch):
         )
 
     assert _Always500Client.attempts == 3
+
+
+def test_rejected_event_is_neither_retried_nor_spilled(monkeypatch, tmp_path):
+    class _RejectingClient(_FakeClient):
+        attempts = 0
+
+        def post(self, url, content, headers):  # type: ignore[no-untyped-def]
+            _RejectingClient.attempts += 1
+            return httpx.Response(422, request=httpx.Request("POST", url))
+
+    monkeypatch.setattr("webhook.reporter.httpx.Client", _RejectingClient)
+    monkeypatch.setattr("webhook.reporter.time.sleep", lambda _: None)
+    outbox = Outbox(tmp_path)
+    reporter = EventReporter(base_url="http://mission-control:3000", token="t", max_attempts=3, outbox=outbox)
+
+    with pytest.raises(EventRejectedError) as raised:
+        reporter.emit(correlation_id="corr-4xx", event_type="heal.attempted", severity="info", payload={})
+
+    assert raised.value.status_code == 422
+    assert _RejectingClient.attempts == 1
+    assert list(outbox.pending()) == []
+
+
+def test_reporter_reuses_one_pooled_client_until_closed(monkeypatch):
+    class _OkClient(_FakeClient):
+        instances = 0
+        closed = 0
+
+        def __init__(self, timeout: float, **kwargs) -> None:  # type: ignore[no-untyped-def]
+            super().__init__(timeout, **kwargs)
+            _OkClient.instances += 1
+            _OkClient.last_options = kwargs
+
+        def close(self) -> None:
+            _OkClient.closed += 1
+
+        def post(self, url, content, headers):  # type: ignore[no-untyped-def]
+            return _FakeResponse(200)
+
+    monkeypatch.setattr("webhook.reporter.httpx.Client", _OkClient)
+
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="mission-token",
+        max_connections=4,
+        max_keepalive_connections=2,
+        http2=True,
+    )
+
+    for event_type in ("heal.attempted", "heal.completed"):
+        reporter.emit(
+            correlation_id="corr-3",
+            event_type=event_type,
+            severity="info",
+            payload={},
+        )
+
+    assert _OkClient.instances == 1
+    assert _OkClient.last_options["http2"] is True
+    assert _OkClient.last_options["limits"].max_connections == 4
+    assert _OkClient.last_options["limits"].max_keepalive_connections == 2
+
+    reporter.close()
+    reporter.close()
+    assert _OkClient.closed == 1
+
+
+class _FakeAsyncClient:
+    attempts = 0
+    delay_first_attempt = 0.0
+
+    def __init__(self, timeout: float, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        self.timeout = timeout
+
+    async def post(self, url, content, headers):  # type: ignore[no-untyped-def]
+        _FakeAsyncClient.attempts += 1
+        if _FakeAsyncClient.attempts == 1 and _FakeAsyncClient.delay_first_attempt:
+            await asyncio.sleep(_FakeAsyncClient.delay_first_attempt)
+        if _FakeAsyncClient.attempts < 3:
+            return _FakeResponse(503)
+        return _FakeResponse(200)
+
+    async def aclose(self) -> None:
+        return None
+
+
+def test_emit_async_retries_with_non_blocking_backoff(monkeypatch):
+    monkeypatch.setattr("webhook.reporter.httpx.AsyncClient", _FakeAsyncClient)
+    monkeypatch.setattr(_FakeAsyncClient, "attempts", 0)
+    monkeypatch.setattr("webhook.reporter.time.sleep", _fail_if_called)
+
+    delays: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def _record_sleep(delay: float) -> None:
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr("webhook.reporter.asyncio.sleep", _record_sleep)
+
+    reporter = EventReporter(base_url="http://mission-control:3000", token="mission-token")
+
+    async def _run() -> dict[str, object]:
+        try:
+            return await reporter.emit_async(
+                correlation_id="corr-4",
+                event_type="heal.completed",
+                severity="info",
+                payload={},
+            )
+        finally:
+            await reporter.aclose()
+
+    envelope = asyncio.run(_run())
+
+    assert envelope["type"] == "heal.completed"
+    assert _FakeAsyncClient.attempts == 3
+    assert len(delays) == 2
+
+
+def test_emit_async_enforces_per_attempt_deadline(monkeypatch):
+    monkeypatch.setattr("webhook.reporter.httpx.AsyncClient", _FakeAsyncClient)
+    monkeypatch.setattr(_FakeAsyncClient, "attempts", 0)
+    monkeypatch.setattr(_FakeAsyncClient, "delay_first_attempt", 5.0)
+    monkeypatch.setattr("webhook.reporter._retry_delay_seconds", lambda attempt: 0)
+
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="mission-token",
+        timeout_seconds=0.05,
+        max_attempts=1,
+    )
+
+    with pytest.raises(ReporterError, match="deadline"):
+        asyncio.run(
+            reporter.emit_async(
+                correlation_id="corr-5",
+                event_type="heal.attempted",
+                severity="info",
+                payload={},
+            )
+        )
+
+
+def test_aclose_closes_clients_opened_on_every_loop(monkeypatch):
+    closed_on: list[asyncio.AbstractEventLoop] = []
+
+    class _TrackedClient(_FakeAsyncClient):
+        async def aclose(self) -> None:
+            closed_on.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr("webhook.reporter.httpx.AsyncClient", _TrackedClient)
+    reporter = EventReporter(base_url="http://mission-control:3000", token="mission-token")
+
+    async def _open() -> None:
+        reporter._get_async_client()
+
+    other, stopped = asyncio.new_event_loop(), asyncio.new_event_loop()
+    worker = threading.Thread(target=other.run_forever, daemon=True)
+    worker.start()
+    try:
+        asyncio.run_coroutine_threadsafe(_open(), other).result(timeout=5)
+        stopped.run_until_complete(_open())
+
+        async def _close() -> asyncio.AbstractEventLoop:
+            await _open()
+            await reporter.aclose()
+            return asyncio.get_running_loop()
+
+        current = asyncio.run(_close())
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        worker.join(timeout=5)
+        other.close()
+        stopped.close()
+
+    assert not reporter._async_clients
+    # The running loop's client closes on that loop; the rest from the caller.
+    assert sorted(map(id, closed_on)) == sorted(map(id, [other, current, current]))
+
+
+def _fail_if_called(_: float) -> None:
+    raise AssertionError("emit_async must not block the event loop with time.sleep")
+
+
+def test_circuit_opens_on_failure_rate_and_fails_fast(monkeypatch):
+    class _DownClient(_FakeClient):
+        attempts = 0
+
+        def post(self, url, content, headers):  # type: ignore[no-untyped-def]
+            _DownClient.attempts += 1
+            return _FakeResponse(503)
+
+    monkeypatch.setattr("webhook.reporter.httpx.Client", _DownClient)
+    monkeypatch.setattr("webhook.reporter.time.sleep", lambda _: None)
+
+    breaker = CircuitBreaker(minimum_calls=3, failure_rate_threshold=0.5, open_seconds=60)
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="mission-token",
+        max_attempts=3,
+        breaker=breaker,
+    )
+
+    with pytest.raises(ReporterError):
+        reporter.emit(correlation_id="corr-6", event_type="heal.attempted", severity="info", payload={})
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        reporter.emit(correlation_id="corr-7", event_type="heal.attempted", severity="info", payload={})
+
+    assert _DownClient.attempts == 3
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_circuit_half_open_probe_closes_on_success(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("webhook.reporter.time.monotonic", lambda: clock[0])
+
+    breaker = CircuitBreaker(minimum_calls=2, open_seconds=10, half_open_max_calls=1)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+
+    clock[0] += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["opened"] == 1
+
+
+def test_circuit_publishes_state_gauge_and_transitions():
+    def _values() -> dict[tuple[str, str], float]:
+        return {
+            (name, labels[0]): value
+            for name, labels, value in REGISTRY.collect()["values"]
+            if name.startswith("mission_control_circuit_")
+        }
+
+    before = _values()
+    breaker = CircuitBreaker(minimum_calls=1, open_seconds=60)
+    breaker.record_failure()
+    after = _values()
+
+    assert after[("mission_control_circuit_state", "open")] == 1.0
+    assert after[("mission_control_circuit_state", "closed")] == 0.0
+    opened = ("mission_control_circuit_transitions_total", "open")
+    assert after[opened] - before.get(opened, 0.0) == 1.0
+
+
+def test_reporter_serializes_body_once_across_retries(monkeypatch):
+    bodies: list[bytes] = []
+
+    class _RecordingClient(_FakeClient):
+        attempts = 0
+
+        def post(self, url, content, headers):  # type: ignore[no-untyped-def]
+            _RecordingClient.attempts += 1
+            bodies.append(content)
+            return _FakeResponse(500 if _RecordingClient.attempts < 3 else 200)
+
+    calls = []
+
+    def _counting_serializer(value):  # type: ignore[no-untyped-def]
+        calls.append(value)
+        return b"{}"
+
+    monkeypatch.setattr("webhook.reporter.httpx.Client", _RecordingClient)
+    monkeypatch.setattr("webhook.reporter.time.sleep", lambda _: None)
+
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="mission-token",
+        serializer=_counting_serializer,
+    )
+    reporter.emit(correlation_id="corr-8", event_type="heal.attempted", severity="info", payload={})
+
+    assert len(calls) == 1
+    assert len(bodies) == 3
+    assert all(body is bodies[0] for body in bodies)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import io
+import json
+
+from healer.reports import (
+    _iter_json_report_tests,
+    distinct_failures,
+    parse_junit_xml,
+    parse_pytest_json_report,
+    primary_failure,
+)
+from healer.types import FailureType
+
+JUNIT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" errors="0" failures="2" tests="3">
+<testcase classname="tests.test_compute" name="test_ok" time="0.001" />
+<testcase classname="tests.test_compute" name="test_ratio_none" time="0.002">
+<failure message="TypeError: unsupported operand type(s) for /: 'NoneType' and 'int'">def test_ratio_none():
+&gt;       compute_ratio(None, 1)
+
+tests/test_compute.py:14:
+_ _ _ _ _ _ _ _
+
+    def compute_ratio(numerator, denominator):
+&gt;       return numerator / denominator
+E       TypeError: unsupported operand type(s) for /: 'NoneType' and 'int'
+
+app/logic.py:6: TypeError</failure>
+</testcase>
+<testcase classname="tests.test_compute.TestRatio" name="test_zero" time="0.002">
+<failure message="ZeroDivisionError: division by zero">app/logic.py:6: ZeroDivisionError</failure>
+</testcase>
+</testsuite></testsuites>
+"""
+
+
+def _json_report() -> dict:
+    return {
+        "created": 1700000000.5,
+        "duration": 12.25,
+        "exitcode": 1,
+        "root": "/repo",
+        "environment": {"Python": "3.12", "note": "tests"},
+        "summary": {"passed": 1, "failed": 2, "total": 3},
+        "tests": [
+            {"nodeid": "tests/test_compute.py::test_ok", "outcome": "passed", "call": {"outcome": "passed"}},
+            {
+                "nodeid": "tests/test_compute.py::test_zero",
+                "outcome": "failed",
+                "call": {
+                    "outcome": "failed",
+                    "crash": {"path": "app/logic.py", "lineno": 6, "message": "ZeroDivisionError: division by zero"},
+                    "longrepr": "tests/test_compute.py:10: in test_zero\nE   ZeroDivisionError: division by zero",
+                },
+            },
+            {
+                "nodeid": "tests/test_other.py::test_fixture",
+                "outcome": "error",
+                "setup": {
+                    "outcome": "failed",
+                    "crash": {"path": "tests/conftest.py", "lineno": 3, "message": "KeyError: 'db'"},
+                    "longrepr": "E   KeyError: 'db'",
+                },
+            },
+        ],
+        "warnings": [],
+    }
+
+
+def test_parse_junit_xml_returns_one_record_per_failing_test():
+    failures = parse_junit_xml(io.BytesIO(JUNIT_XML.encode()))
+
+    assert [failure.node_id for failure in failures] == [
+        "tests/test_compute.py::test_ratio_none",
+        "tests/test_compute.py::TestRatio::test_zero",
+    ]
+    none_type, zero = failures
+    assert none_type.failure_type == FailureType.NONE_TYPE_ERROR
+    assert none_type.exception_type == "TypeError"
+    assert (none_type.file, none_type.line) == ("app/logic.py", 6)
+    assert zero.failure_type == FailureType.ZERO_DIVISION
+    assert zero.exception_type == "ZeroDivisionError"
+
+
+def test_parse_pytest_json_report_from_stream_and_dict():
+    report = _json_report()
+    streamed = parse_pytest_json_report(io.StringIO(json.dumps(report, indent=2)))
+
+    assert streamed == parse_pytest_json_report(report)
+    assert [failure.node_id for failure in streamed] == [
+        "tests/test_compute.py::test_zero",
+        "tests/test_other.py::test_fixture",
+    ]
+    assert streamed[0].failure_type == FailureType.ZERO_DIVISION
+    assert (streamed[0].file, streamed[0].line) == ("app/logic.py", 6)
+    assert streamed[1].failure_type == FailureType.UNKNOWN
+    assert streamed[1].exception_type == "KeyError"
+
+
+def test_json_report_stream_survives_tiny_chunks():
+    text = json.dumps(_json_report())
+    tests = list(_iter_json_report_tests(io.StringIO(text), chunk_size=3))
+
+    assert tests == _json_report()["tests"]
+
+
+def test_primary_and_distinct_failures_follow_rule_priority():
+    failures = parse_junit_xml(io.BytesIO(JUNIT_XML.encode()))
+
+    assert primary_failure(failures).failure_type == FailureType.ZERO_DIVISION
+    assert [failure.failure_type for failure in distinct_failures(failures)] == [
+        FailureType.ZERO_DIVISION,
+        FailureType.NONE_TYPE_ERROR,
+    ]
+    assert primary_failure([]).failure_type == FailureType.UNKNOWN
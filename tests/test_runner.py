@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+
+from healer import runner
+from healer.reports import parse_junit_xml
+from healer.types import FailureType
+from healer.warm import WarmTestExecutor
+
+SLOW_FAILING_RUN = """
+import sys, time
+print("tests/test_a.py::test_ok PASSED", flush=True)
+print("app/logic.py:6: in compute_ratio", flush=True)
+print("E   ZeroDivisionError: division by zero", flush=True)
+time.sleep(30)
+sys.exit(1)
+"""
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_run_tests_classifies_streamed_output():
+    result = runner._run_tests(_python(SLOW_FAILING_RUN.replace("time.sleep(30)", "pass")))
+
+    assert result["passed"] is False
+    assert result["stopped_early"] is False
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+    assert result["failure"].file == "app/logic.py"
+    assert result["failure_detected_seconds"] is not None
+
+
+def test_run_tests_fail_fast_stops_at_first_healable_failure():
+    started = time.monotonic()
+    result = runner._run_tests(_python(SLOW_FAILING_RUN), fail_fast=True)
+
+    assert time.monotonic() - started < 10
+    assert result["passed"] is False
+    assert result["stopped_early"] is True
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+
+
+def test_run_tests_fail_fast_stops_a_real_pytest_run_at_the_failing_test(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner, "_pytest_command", lambda: [sys.executable, "-m", "pytest"])
+    monkeypatch.setenv("PYTHONPATH", str(runner.ROOT))
+    (tmp_path / "test_a.py").write_text(
+        "import time\n\n\ndef test_zero():\n    assert 1 / 0\n\n\ndef test_slow():\n    time.sleep(30)\n"
+    )
+    started = time.monotonic()
+    result = runner._run_tests(
+        fail_fast=True,
+        junit_report=tmp_path / "junit.xml",
+        targets=["-q", "-pno:cacheprovider"],
+        shards=1,
+        root=tmp_path,
+    )
+
+    assert time.monotonic() - started < 20
+    assert result["stopped_early"] is True
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+    assert (result["failure"].file, result["failure"].line) == ("test_a.py", 5)
+
+
+def test_run_tests_stops_every_process_when_cancelled():
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    started = time.monotonic()
+    result = runner._run_tests(_python("import time; print('started', flush=True); time.sleep(30)"), cancel=cancel)
+
+    assert time.monotonic() - started < 10
+    assert result["cancelled"] is True
+    assert result["passed"] is False
+
+
+def test_run_tests_keeps_bounded_output_tail(monkeypatch):
+    monkeypatch.setenv("HEALER_OUTPUT_TAIL_LINES", "5")
+    result = runner._run_tests(_python("for i in range(1000): print(f'line {i}')"))
+
+    assert result["passed"] is True
+    assert result["output"].splitlines() == [f"line {i}" for i in range(995, 1000)]
+    assert result["failure"].failure_type == FailureType.UNKNOWN
+
+
+def test_run_tests_reads_failures_from_junit_report(tmp_path):
+    report = tmp_path / "junit.xml"
+    code = f"""
+import json
+import sys
+open({str(report)!r}, "w").write(
+    '<testsuite><testcase classname="tests.test_compute" name="test_zero">'
+    '<failure message="ZeroDivisionError: division by zero">app/logic.py:6: ZeroDivisionError</failure>'
+    '</testcase></testsuite>'
+)
+print("1 failed")
+sys.exit(1)
+"""
+    result = runner._run_tests(_python(code), junit_report=report)
+
+    assert [failure.node_id for failure in result["failures"]] == ["tests/test_compute.py::test_zero"]
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+    assert result["failure"].exception_type == "ZeroDivisionError"
+
+
+def test_main_classifies_log_file_without_running_tests(tmp_path, capsys):
+    log = tmp_path / "pytest.log"
+    log.write_text("progress\n" * 1000 + "app/logic.py:6: in compute_ratio\nE   ZeroDivisionError: division by zero\n")
+
+    assert runner.main(["--log-file", str(log)]) == 0
+    assert '"failure_type": "ZERO_DIVISION"' in capsys.readouterr().out
+
+
+def _fake_run(calls, passed=True):
+    def run_tests(targets=None, **_):
+        calls.append(targets)
+        return {"passed": passed, "returncode": 0 if passed else 1, "duration_seconds": 0.5}
+
+    return run_tests
+
+
+def test_verify_background_mode_runs_targeted_stage_and_defers_full_suite(monkeypatch):
+    calls = []
+    monkeypatch.setattr(runner, "_run_tests", _fake_run(calls))
+    monkeypatch.setenv("HEALER_FULL_VERIFICATION", "background")
+
+    result, stages = runner._verify(["tests/test_api.py::test_compute"], [runner.ROOT / "app" / "logic.py"])
+
+    assert result["passed"] is True
+    assert calls[0][0] == "tests/test_api.py::test_compute"
+    assert "tests/test_compute.py" in calls[0]
+    assert len(calls) == 1
+    assert [(stage["name"], stage["status"]) for stage in stages] == [("targeted", "passed"), ("full", "running")]
+
+
+def test_verify_runs_full_suite_after_targets_by_default(monkeypatch):
+    calls = []
+    refreshed = []
+    monkeypatch.setattr(runner, "_run_tests", _fake_run(calls))
+    monkeypatch.setattr(runner, "_refresh_impact_index", lambda: refreshed.append(True))
+    monkeypatch.delenv("HEALER_FULL_VERIFICATION", raising=False)
+
+    _, stages = runner._verify(["tests/test_api.py::test_compute"], [])
+
+    assert calls == [["tests/test_api.py::test_compute"], None]
+    assert refreshed == [True]
+    assert [stage["name"] for stage in stages] == ["targeted", "full"]
+    assert stages[1]["duration_seconds"] == 0.5
+
+
+def test_confirm_full_suite_records_stage_and_downgrades_status(monkeypatch, tmp_path):
+    incident = tmp_path / "incident_report.json"
+    incident.write_text(
+        '{"id": "abc", "status": "healed", "tests_after": {"passed": true, "returncode": 0}, "signature": null,'
+        ' "verification": {"stages": [{"name": "targeted", "status": "passed"}, {"name": "full", "status": "running"}]}}'
+    )
+    reports = []
+
+    def _run_tests(junit_report):  # type: ignore[no-untyped-def]
+        reports.append(junit_report)
+        return _fake_run([], passed=False)()
+
+    monkeypatch.setattr(runner, "INCIDENT_FILE", incident)
+    monkeypatch.setattr(runner, "_run_tests", _run_tests)
+
+    assert runner._confirm_full_suite("abc", tmp_path / "junit-full-abc.xml") == 1
+
+    report = json.loads(incident.read_text())
+    assert reports == [tmp_path / "junit-full-abc.xml"]
+    assert report["status"] == "failed"
+    assert [(stage["name"], stage["status"]) for stage in report["verification"]["stages"]] == [
+        ("targeted", "passed"),
+        ("full", "failed"),
+    ]
+
+
+def test_confirm_full_suite_leaves_a_newer_incident_alone(monkeypatch, tmp_path):
+    incident = tmp_path / "incident_report.json"
+    newer = '{"id": "new", "status": "healed", "verification": {"stages": []}}'
+    incident.write_text(newer)
+    monkeypatch.setattr(runner, "INCIDENT_FILE", incident)
+    monkeypatch.setattr(runner, "_run_tests", _fake_run([], passed=False))
+
+    assert runner._confirm_full_suite("old", tmp_path / "junit-full-old.xml") == 1
+    assert incident.read_text() == newer
+
+
+def test_run_tests_uses_warm_executor_and_reads_its_junit_report(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner, "DURATIONS_FILE", tmp_path / "durations.json")
+    (tmp_path / "test_zero.py").write_text("def test_zero():\n    assert 1 / 0\n")
+    executor = WarmTestExecutor(root=tmp_path, preload=("pytest",))
+    try:
+        result = runner._run_tests(
+            junit_report=tmp_path / "junit.xml",
+            targets=["-pno:cacheprovider"],
+            executor=executor,
+            shards=1,
+        )
+    finally:
+        executor.close()
+
+    assert result["returncode"] == 1
+    assert result["failed_node_ids"] == ["test_zero.py::test_zero"]
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+    assert executor.stats()["runs"] == 1
+
+
+def test_run_tests_shards_and_merges_results(monkeypatch, tmp_path):
+    monkeypatch.setattr(runner, "DURATIONS_FILE", tmp_path / "durations.json")
+    (tmp_path / "test_a.py").write_text(
+        "import os\n\n\ndef test_tmpdir():\n"
+        "    print('TMPDIR', os.environ['TMPDIR'], os.environ['SELF_HEALING_UNHEALTHY_MARKER'])\n\n\n"
+        "def test_ok():\n    pass\n"
+    )
+    (tmp_path / "test_b.py").write_text("def test_zero():\n    assert 1 / 0\n\n\ndef test_ok():\n    pass\n")
+    executor = WarmTestExecutor(root=tmp_path, preload=("pytest",))
+    try:
+        result = runner._run_tests(
+            junit_report=tmp_path / "junit.xml",
+            targets=["-s", "-pno:cacheprovider"],
+            executor=executor,
+            shards=2,
+        )
+    finally:
+        executor.close()
+
+    assert result["shards"] == 2
+    assert result["returncode"] == 1
+    assert result["failed_node_ids"] == ["test_b.py::test_zero"]
+    assert result["failure"].failure_type == FailureType.ZERO_DIVISION
+    assert "==== shard 1/2" in result["output"] and "==== shard 2/2" in result["output"]
+    assert "healer-shards-" in result["output"] and "/force_unhealthy" in result["output"]
+    assert len(parse_junit_xml(tmp_path / "junit.xml")) == 1
+    assert set(json.loads((tmp_path / "durations.json").read_text())) == {
+        "test_a.py::test_tmpdir",
+        "test_a.py::test_ok",
+        "test_b.py::test_zero",
+        "test_b.py::test_ok",
+    }
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+
+from healer.impact import ImpactIndex
+from healer.selection import module_name, summary_node_id, affected_test_files, verification_targets
+from healer.types import FailureInfo, FailureType
+
+
+def _tree(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "logic.py").write_text("def compute_ratio(a, b):\n    return a / b\n")
+    tests = tmp_path / "tests"
+    tests.mkdir()
+    (tests / "test_logic.py").write_text("from app.logic import compute_ratio\n")
+    (tests / "test_pkg.py").write_text("from app import other, logic\n")
+    (tests / "test_api.py").write_text("import app.main\n")
+    (tests / "test_regression.py").write_text("def test_x():\n    pass\n")
+    return tmp_path
+
+
+def test_summary_node_id_parses_short_summary_lines():
+    assert summary_node_id("FAILED tests/test_a.py::test_b[1-2] - ZeroDivisionError: x") == "tests/test_a.py::test_b[1-2]"
+    assert summary_node_id("ERROR tests/test_a.py") == "tests/test_a.py"
+    assert summary_node_id("tests/test_a.py::test_b FAILED") is None
+
+
+def test_affected_test_files_finds_direct_importers_and_changed_tests(tmp_path):
+    root = _tree(tmp_path)
+
+    assert module_name(root / "app" / "logic.py", root) == "app.logic"
+    assert affected_test_files([root / "app" / "logic.py", root / "tests" / "test_regression.py"], root) == [
+        "tests/test_regression.py",
+        "tests/test_logic.py",
+        "tests/test_pkg.py",
+    ]
+
+
+def test_verification_targets_drop_node_ids_covered_by_selected_files(tmp_path):
+    root = _tree(tmp_path)
+    failed = ["tests/test_logic.py::test_zero", "tests/test_api.py::test_compute", "tests/test_api.py::test_compute"]
+
+    assert verification_targets(failed, [root / "app" / "logic.py"], root) == [
+        "tests/test_api.py::test_compute",
+        "tests/test_logic.py",
+        "tests/test_pkg.py",
+    ]
+
+
+def test_verification_targets_use_the_impact_index_when_it_knows_the_changed_files(tmp_path):
+    root = _tree(tmp_path)
+    (root / "app" / "other.py").write_text("VALUE = 1\n")
+    index = ImpactIndex(tmp_path / "impact.sqlite")
+    index.record(
+        {
+            "tests/test_api.py::test_compute": {"app/logic.py": [(2, 2)]},
+            "tests/test_api.py::test_health": {},
+            "tests/test_logic.py::test_ratio": {"app/logic.py": [(2, 2)]},
+        },
+        root,
+    )
+    failure = FailureInfo(FailureType.ZERO_DIVISION, file="app/logic.py", line=2)
+    changed = [root / "app" / "logic.py", root / "tests" / "test_regression.py"]
+
+    assert verification_targets(["tests/test_api.py::test_compute"], changed, root, [failure], index) == [
+        "tests/test_api.py::test_compute",
+        "tests/test_logic.py::test_ratio",
+        "tests/test_regression.py",
+    ]
+    # A changed file the index has never seen falls back to the import scan.
+    assert verification_targets([], [root / "app" / "other.py"], root, [failure], index) == ["tests/test_pkg.py"]
+
+
+def test_verification_targets_without_import_scan_read_no_test_files(tmp_path, monkeypatch):
+    root = tmp_path
+    (root / "tests").mkdir()
+    (root / "tests" / "test_logic.py").write_text("from app import logic\n")
+    monkeypatch.setattr("healer.selection.affected_test_files", lambda *args: pytest.fail("scanned imports"))
+    changed = [root / "app" / "logic.py", root / "tests" / "test_compute.py"]
+
+    targets = verification_targets(["tests/test_api.py::test_compute"], changed, root, scan_imports=False)
+
+    assert targets == ["tests/test_api.py::test_compute", "tests/test_compute.py"]
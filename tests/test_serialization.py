@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import json
+import re
+
+import pytest
+
+from webhook.reporter import EventReporter, _utc_timestamp
+from webhook.serialization import get_serializer, stdlib_dumps
+
+
+def test_serializers_produce_equivalent_json():
+    value = {"id": "evt-1", "payload": {"changedFiles": ["app/logic.py"], "note": "ünïcode"}}
+
+    assert json.loads(get_serializer("auto")(value)) == value
+    assert json.loads(stdlib_dumps(value)) == value
+
+
+def test_unknown_serializer_is_rejected():
+    with pytest.raises(ValueError):
+        get_serializer("pickle")
+
+
+def test_envelope_uses_schema_compatible_utc_timestamp():
+    reporter = EventReporter(base_url="http://mission-control:3000", token="t")
+    envelope = reporter.build_envelope(
+        correlation_id="corr-1", event_type="heal.attempted", severity="info", payload={}
+    )
+
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", envelope["timestamp"])
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", _utc_timestamp())
+    assert envelope["schemaVersion"] == "1.0.0"
+    assert envelope["source"] == "self-healing-systems"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from healer.shards import (
+    collected_node_ids,
+    estimated_seconds,
+    load_durations,
+    partition,
+    save_durations,
+    shard_count,
+)
+
+
+def test_partition_balances_recorded_durations_and_keeps_collection_order():
+    node_ids = [f"tests/test_a.py::test_{index}" for index in range(6)]
+    durations = dict(zip(node_ids, [8.0, 1.0, 1.0, 4.0, 3.0, 1.0]))
+
+    groups = partition(node_ids, durations, 2)
+
+    assert sorted(sum(durations[node_id] for node_id in group) for group in groups) == [9.0, 9.0]
+    assert groups[0] == ["tests/test_a.py::test_0", "tests/test_a.py::test_2"]
+    assert all(group == sorted(group, key=node_ids.index) for group in groups)
+
+
+def test_partition_counts_unrecorded_tests_as_the_median_and_drops_empty_shards():
+    durations = {"t.py::slow": 10.0, "t.py::a": 2.0, "t.py::b": 2.0}
+    groups = partition(["t.py::slow", "t.py::a", "t.py::b", "t.py::new"], durations, 2)
+
+    assert groups == [["t.py::slow"], ["t.py::a", "t.py::b", "t.py::new"]]
+    assert partition(["t.py::a"], {}, 8) == [["t.py::a"]]
+
+
+def test_collected_node_ids_stop_at_the_summary():
+    lines = ["tests/test_a.py::test_x\n", "tests/test_a.py::test_y[a b]\n", "\n", "2 tests collected in 0.01s\n"]
+
+    assert collected_node_ids(lines) == ["tests/test_a.py::test_x", "tests/test_a.py::test_y[a b]"]
+
+
+def test_estimated_seconds_sums_recorded_tests_selected_by_targets():
+    durations = {"tests/test_a.py::test_x": 1.5, "tests/test_a.py::test_y[1]": 0.5, "tests/test_b.py::test_z": 4.0}
+
+    assert estimated_seconds([], durations) == 6.0
+    assert estimated_seconds(["-q", "tests/test_a.py"], durations) == 2.0
+    assert estimated_seconds(["tests/test_a.py::test_y"], durations) == 0.5
+    assert estimated_seconds(["tests/test_c.py"], durations) is None
+
+
+def test_save_durations_merges_with_recorded_runs(tmp_path):
+    path = tmp_path / "durations.json"
+    save_durations(path, {"t.py::a": 1.0, "t.py::b": 2.0})
+    save_durations(path, {"t.py::b": 3.0})
+
+    assert load_durations(path) == {"t.py::a": 1.0, "t.py::b": 3.0}
+    assert load_durations(tmp_path / "missing.json") == {}
+
+
+def test_shard_count_reads_the_environment(monkeypatch):
+    monkeypatch.setenv("HEALER_TEST_SHARDS", "3")
+    assert shard_count() == 3
+    monkeypatch.delenv("HEALER_TEST_SHARDS")
+    assert shard_count() == 1
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from healer.signatures import (
+    MAX_SIGNATURE_CHARS,
+    SignatureCache,
+    failure_section,
+    normalize_output,
+    signature_hash,
+    signature_is_complete,
+)
+from healer.types import FailureInfo, FailureType
+from webhook.service import failure_fingerprint, failure_keys, heal_from_payload
+
+FAILURE = """=================================== FAILURES ===================================
+____________________________ test_zero ____________________________
+app/logic.py:6: in compute_ratio
+E   ZeroDivisionError: division by zero
+{tmp} at 0x{addr}
+========================= 1 failed, {passed} passed in {duration}s ========================="""
+
+
+def _run(shard: int) -> str:
+    progress = "\n".join(f"tests/test_{shard}_{i}.py . [{i:3d}%]" for i in range(shard * 3))
+    failure = FAILURE.format(
+        tmp=f"/tmp/pytest-of-ci/pytest-{shard}/test0",
+        addr=f"{shard:x}7f3a",
+        passed=10 + shard,
+        duration=f"{shard}.{shard}3",
+    )
+    return f"2026-01-0{shard + 1}T10:00:0{shard}Z starting shard {shard}\n{progress}\n{failure}\n"
+
+
+def test_signature_ignores_volatile_parts_and_shard_progress():
+    assert signature_hash(_run(1)) == signature_hash(_run(2))
+    assert failure_section(_run(1)).startswith("====")
+    assert "ZeroDivisionError" in normalize_output(_run(1))
+    assert signature_hash(_run(1)) != signature_hash(_run(1).replace("logic.py:6", "logic.py:7"))
+
+
+def test_signature_cache_reports_hits_and_evicts_oldest():
+    cache = SignatureCache(max_entries=2)
+    calls = []
+
+    def classify(output):
+        calls.append(output)
+        return FailureInfo(failure_type=FailureType.ZERO_DIVISION)
+
+    first, _, cached = cache.classify(_run(1), classify)
+    assert cached is False
+    assert cache.classify(_run(2), classify)[1:] == (FailureInfo(failure_type=FailureType.ZERO_DIVISION), True)
+    assert len(calls) == 1
+
+    cache.put("b", FailureInfo(failure_type=FailureType.UNKNOWN))
+    cache.put("c", FailureInfo(failure_type=FailureType.UNKNOWN))
+    assert cache.get(first) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 2, 1, 2)
+    assert stats["hit_rate"] == 0.3333
+
+
+def test_signature_cache_persists_entries_and_outcomes(tmp_path):
+    path = tmp_path / "signatures.json"
+    cache = SignatureCache(path=path)
+    signature, _, _ = cache.classify(_run(1), lambda output: FailureInfo(FailureType.NONE_TYPE_ERROR, "app/logic.py", 6))
+    cache.record_outcome(signature, "completed")
+
+    reloaded = SignatureCache(path=path).get(signature)
+
+    assert reloaded is not None
+    assert reloaded.failure == FailureInfo(FailureType.NONE_TYPE_ERROR, "app/logic.py", 6)
+    assert reloaded.last_outcome == "completed"
+
+
+def test_heal_from_payload_reuses_cached_classification(monkeypatch):
+    calls = []
+
+    def classify(output):
+        calls.append(output)
+        return FailureInfo(failure_type=FailureType.UNKNOWN, message="unknown")
+
+    monkeypatch.setattr("webhook.service.classify_pytest_output", classify)
+
+    heal_from_payload({"output": _run(1)})
+    heal_from_payload({"output": _run(2)})
+
+    assert len(calls) == 1
+
+
+def test_signature_hashes_a_bounded_slice_of_the_failures_section():
+    later_failures = "\n".join(f"tests/test_{i}.py:1: AssertionError {i}" for i in range(5000))
+    output = f"{_run(1)}{later_failures}\n"
+
+    assert len(failure_section(output)) == MAX_SIGNATURE_CHARS
+    assert signature_hash(output) == signature_hash(f"{_run(2)}{later_failures.replace('4999', 'x')}\n")
+    assert len(failure_section("." * 100_000)) == MAX_SIGNATURE_CHARS
+
+
+def test_signature_cache_reclassifies_output_longer_than_the_hashed_slice():
+    from healer.classifier import classify_pytest_output
+
+    assertions = "\n".join(f"E   AssertionError: assert {i} == 0" for i in range(1000))
+    prefix = f"=== FAILURES ===\n{assertions}\n"
+    zero_division = f"{prefix}app/logic.py:6: ZeroDivisionError\nE   ZeroDivisionError: division by zero\n"
+    cache = SignatureCache()
+
+    cache.classify(prefix, classify_pytest_output)
+    signature, failure, cached = cache.classify(zero_division, classify_pytest_output)
+
+    assert not signature_is_complete(zero_division)
+    assert signature_is_complete(_run(1))
+    assert signature != signature_hash(failure_section(zero_division))
+    assert failure == classify_pytest_output(zero_division)
+    assert failure.failure_type is FailureType.ZERO_DIVISION
+    assert not cached
+    assert cache.stats()["partial"] == 2
+
+
+def test_fingerprint_is_the_signature_heal_from_payload_caches(monkeypatch):
+    cache = SignatureCache()
+    monkeypatch.setattr("webhook.service.signature_cache", lambda: cache)
+    monkeypatch.setattr("webhook.service.classify_pytest_output", lambda output: FailureInfo(FailureType.UNKNOWN))
+    payload = {"output": _run(1)}
+
+    heal_from_payload(payload, failure_keys(payload)[1])
+
+    assert failure_fingerprint(payload) == signature_hash(_run(1))
+    assert cache.get(signature_hash(_run(1))) is not None
+
+
+def test_fingerprint_tells_apart_failures_that_differ_past_the_hashed_slice():
+    assertions = "\n".join(f"E   AssertionError: assert {i} == 0" for i in range(1000))
+    first = {"output": f"=== FAILURES ===\n{assertions}\nE   ZeroDivisionError: division by zero\n"}
+    second = {"output": f"=== FAILURES ===\n{assertions}\nE   TypeError: unsupported operand\n"}
+
+    (first_key, first_signature), (second_key, second_signature) = failure_keys(first), failure_keys(second)
+
+    assert first_signature == second_signature
+    assert first_key != second_key
+    assert first_key.startswith(first_signature)  # type: ignore[arg-type]
+
+
+def test_signature_cache_save_merges_other_processes_entries(tmp_path):
+    path = tmp_path / "signatures.json"
+    first, second = SignatureCache(path=path), SignatureCache(path=path)
+    one, _, _ = first.classify(_run(1), lambda output: FailureInfo(FailureType.ZERO_DIVISION))
+    other, _, _ = second.classify("E   TypeError: x", lambda output: FailureInfo(FailureType.NONE_TYPE_ERROR))
+
+    first.record_outcome(one, "completed")
+    second.record_outcome(other, "escalated")
+
+    reloaded = SignatureCache(path=path)
+    assert reloaded.get(one).last_outcome == "completed"  # type: ignore[union-attr]
+    assert reloaded.get(other).last_outcome == "escalated"  # type: ignore[union-attr]
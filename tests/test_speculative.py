@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from healer import runner
+from healer.fixers import FixCandidate
+from healer.speculative import create_worktree, promote, race
+from healer.warm import WarmTestExecutor
+
+
+def _project(root):
+    root.mkdir()
+    (root / "calc.py").write_text("def double(x):\n    return x + 1\n")
+    (root / "test_calc.py").write_text("from calc import double\n\n\ndef test_double():\n    assert double(3) == 6\n")
+    (root / ".git").mkdir()
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (root / "artifacts").mkdir()
+    (root / "artifacts" / "junit.xml").write_text("<testsuites/>")
+    return root
+
+
+def _writer(source):
+    def apply(worktree):
+        path = worktree / "calc.py"
+        path.write_text(source)
+        return [path]
+
+    return apply
+
+
+def test_create_worktree_copies_the_tree_without_history_or_artifacts(tmp_path):
+    root = _project(tmp_path / "repo")
+
+    worktree = create_worktree(tmp_path / "candidate", root)
+
+    assert (worktree / "calc.py").read_text() == (root / "calc.py").read_text()
+    assert not (worktree / ".git").exists()
+    assert list((worktree / "artifacts").iterdir()) == []
+
+
+def test_race_promotes_the_best_ranked_pass_and_cancels_the_rest(tmp_path):
+    root = _project(tmp_path / "repo")
+    (tmp_path / "work").mkdir()
+    plan = {"0-first": (0.3, False), "1-second": (0.05, True), "2-third": (5.0, True)}
+
+    def verify(worktree, changed, cancel):
+        seconds, passed = plan[worktree.name]
+        cancelled = cancel.wait(seconds)
+        return {"passed": passed and not cancelled, "cancelled": cancelled, "returncode": 0 if passed else 1}
+
+    candidates = [FixCandidate(name, _writer(f"# {name}\n")) for name in ("first", "second", "third")]
+    started = time.monotonic()
+    winner, outcomes = race(candidates, verify, tmp_path / "work", root)
+
+    assert time.monotonic() - started < 3
+    assert winner is not None and winner.name == "second"
+    assert [outcome.status for outcome in outcomes] == ["failed", "passed", "cancelled"]
+    assert all(outcome.duration_seconds is not None for outcome in outcomes)
+    assert outcomes[1].report()["files"] == ["calc.py"]
+
+
+def test_race_reports_empty_and_broken_candidates(tmp_path):
+    root = _project(tmp_path / "repo")
+    (tmp_path / "work").mkdir()
+
+    def broken(worktree):
+        raise ValueError("anchor not found")
+
+    candidates = [FixCandidate("noop", lambda worktree: []), FixCandidate("broken", broken)]
+    winner, outcomes = race(candidates, lambda *_: {"passed": True}, tmp_path / "work", root)
+
+    assert winner is None
+    assert [(outcome.status, outcome.error) for outcome in outcomes] == [
+        ("empty", None),
+        ("error", "ValueError: anchor not found"),
+    ]
+
+
+def test_candidates_are_verified_in_their_own_worktree_and_promoted(monkeypatch, tmp_path):
+    root = _project(tmp_path / "repo")
+    (tmp_path / "work").mkdir()
+    monkeypatch.setattr(runner, "DURATIONS_FILE", tmp_path / "durations.json")
+    executor = WarmTestExecutor(root=root, preload=("pytest", "calc"))
+
+    def verify(worktree, changed, cancel: threading.Event):
+        return runner._run_tests(
+            junit_report=worktree / "artifacts" / "junit.xml",
+            targets=["-pno:cacheprovider"],
+            executor=executor,
+            shards=1,
+            root=worktree,
+            cancel=cancel,
+        )
+
+    candidates = [
+        FixCandidate("wrong", _writer("def double(x):\n    return x * 3\n")),
+        FixCandidate("right", _writer("def double(x):\n    return x * 2\n")),
+    ]
+    try:
+        winner, outcomes = race(candidates, verify, tmp_path / "work", root)
+        assert winner is not None and winner.name == "right"
+        assert [outcome.status for outcome in outcomes] == ["failed", "passed"]
+        assert (root / "calc.py").read_text() == "def double(x):\n    return x + 1\n"
+
+        promoted = promote(winner, tmp_path / "work", root)
+    finally:
+        executor.close()
+
+    assert promoted == [root / "calc.py"]
+    assert "x * 2" in (root / "calc.py").read_text()
+    assert not list(root.glob(".calc.py.*.tmp"))
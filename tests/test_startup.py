@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Packages that only the heal/report path needs; /healthz and /compute must not load them.
+DEFERRED_PACKAGES = ("httpx", "healer", "webhook", "numpy", "multiprocessing")
+
+
+def _imported_modules(statement: str) -> set[str]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def test_app_import_defers_heal_and_report_stack():
+    modules = _imported_modules("import app.main")
+
+    assert "app.main" in modules
+    loaded = sorted(
+        module for module in modules if module.split(".")[0] in DEFERRED_PACKAGES
+    )
+    assert loaded == []
+
+
+def test_webhook_submodules_import_without_the_reporter():
+    modules = _imported_modules("import webhook.jobs")
+
+    assert "webhook.jobs" in modules
+    assert "httpx" not in modules
+    assert "healer" not in modules
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from webhook.reporter import EnvelopeValidationError, EventReporter
+from webhook.validation import compile_schema, load_envelope_validator
+
+FIXTURES = Path(__file__).resolve().parent / "contracts" / "fixtures"
+
+
+def _fixtures(kind: str) -> list[dict]:
+    return [json.loads(path.read_text()) for path in sorted((FIXTURES / kind).glob("*.json"))]
+
+
+def test_compiled_validator_matches_contract_fixtures():
+    validate = load_envelope_validator()
+
+    for envelope in _fixtures("valid"):
+        assert validate(envelope) == []
+    for envelope in _fixtures("invalid"):
+        assert validate(envelope)
+
+
+def test_compiled_validator_reports_each_violation():
+    validate = load_envelope_validator()
+    errors = validate(
+        {
+            "id": "",
+            "schemaVersion": "2.0.0",
+            "eventVersion": 0,
+            "source": "self-healing-systems",
+            "type": "heal.unknown",
+            "severity": "info",
+            "timestamp": "yesterday",
+            "correlationId": "corr-1",
+            "payload": [],
+        }
+    )
+
+    assert sorted(errors) == [
+        "$.eventVersion: below minimum",
+        "$.id: too short",
+        "$.payload: expected object",
+        "$.schemaVersion: must equal '1.0.0'",
+        "$.timestamp: not a date-time",
+        "$.type: not an allowed value",
+    ]
+
+
+def test_unsupported_keywords_fail_at_compile_time():
+    with pytest.raises(ValueError, match="pattern"):
+        compile_schema({"type": "string", "pattern": "^x$"})
+
+
+def test_strict_mode_rejects_envelope_before_sending():
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="t",
+        validator=load_envelope_validator(),
+        validation_mode="strict",
+    )
+
+    with pytest.raises(EnvelopeValidationError, match="severity"):
+        reporter.build_envelope(
+            correlation_id="corr-1", event_type="heal.attempted", severity="fatal", payload={}
+        )
+
+
+def test_debug_mode_logs_and_keeps_envelope(caplog):
+    reporter = EventReporter(
+        base_url="http://mission-control:3000",
+        token="t",
+        validator=load_envelope_validator(),
+        validation_mode="debug",
+    )
+
+    with caplog.at_level(logging.WARNING, logger="webhook.reporter"):
+        envelope = reporter.build_envelope(
+            correlation_id="", event_type="heal.attempted", severity="info", payload={}
+        )
+
+    assert envelope["correlationId"] == ""
+    assert "correlationId" in caplog.text
+
+
+def test_unknown_validation_mode_is_rejected_at_construction():
+    with pytest.raises(ValueError, match="validation mode"):
+        EventReporter(base_url="http://mission-control:3000", token="t", validation_mode="Strict")
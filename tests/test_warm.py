@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import os
+import types
+
+import pytest
+
+from healer.warm import WarmTestExecutor, stale_modules
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    vars(module).update(attributes)
+    return module
+
+
+def test_stale_modules_include_dependents_of_changed_files(tmp_path):
+    sources = {name: tmp_path / f"{name}.py" for name in ("logic", "main", "other")}
+    for path in sources.values():
+        path.write_text("")
+    snapshot = {name: (str(path), os.stat(path).st_mtime) for name, path in sources.items()}
+    logic = _module("logic")
+
+    def compute_ratio():
+        pass
+
+    compute_ratio.__module__ = "logic"
+    modules = {
+        "logic": logic,
+        "main": _module("main", compute_ratio=compute_ratio),
+        "other": _module("other", value=1),
+    }
+
+    assert stale_modules(snapshot, modules) == set()
+    os.utime(sources["logic"], (0, 0))
+    assert stale_modules(snapshot, modules) == {"logic", "main"}
+
+
+@pytest.fixture()
+def project(tmp_path):
+    (tmp_path / "warm_target.py").write_text("def value():\n    return 1\n")
+    (tmp_path / "warm_helper.py").write_text("from warm_target import value\n")
+    (tmp_path / "test_warm_target.py").write_text(
+        "from warm_helper import value\n\n\n"
+        "def test_value():\n    print('running test_value')\n    assert value() == 1\n"
+    )
+    executor = WarmTestExecutor(root=tmp_path, preload=("pytest", "warm_target", "warm_helper"))
+    yield tmp_path, executor
+    executor.close()
+
+
+def _run(executor, *args):
+    run = executor.start_run(["-q", "-s", "-p", "no:cacheprovider", *args])
+    with run.stdout:
+        output = run.stdout.read()
+    return run.wait(), output
+
+
+def test_warm_executor_streams_output_and_reloads_changed_modules(project):
+    root, executor = project
+
+    returncode, output = _run(executor, "test_warm_target.py")
+    assert returncode == 0
+    assert "running test_value" in output and "1 passed" in output
+
+    target = root / "warm_target.py"
+    target.write_text("def value():\n    return 2\n")
+    os.utime(target, (1, 1))
+    returncode, output = _run(executor, "test_warm_target.py")
+    assert returncode == 1
+    assert "assert 2 == 1" in output
+    assert executor.stats() == {"running": True, "runs": 2}
+
+
+def test_warm_run_terminate_stops_the_run(project):
+    root, executor = project
+    (root / "test_slow.py").write_text(
+        "import time\n\n\ndef test_slow():\n    print('started', flush=True)\n    time.sleep(60)\n"
+    )
+
+    run = executor.start_run(["-q", "-s", "-p", "no:cacheprovider", "test_slow.py"])
+    with run.stdout:
+        for line in run.stdout:
+            if "started" in line:
+                run.terminate()
+                break
+    assert run.wait() != 0
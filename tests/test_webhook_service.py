@@ -2,7 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from webhook.service import heal_from_payload
+import pytest
+
+from healer.fixers import ROOT
+from healer.impact import ImpactIndex
+from webhook.service import heal_from_payload, preview_lines, window_output, window_payload
 
 
 def test_service_known_signature_uses_fixer(monkeypatch):
@@ -16,6 +20,17 @@ def test_service_known_signature_uses_fixer(monkeypatch):
     assert len(outcome.changed_files) == 2
 
 
+def test_service_selects_verification_tests_from_the_impact_index(monkeypatch, tmp_path):
+    index = ImpactIndex(tmp_path / "impact.sqlite")
+    index.record({"tests/test_compute.py::test_ratio": {"app/logic.py": [(1, 40)]}}, ROOT)
+    monkeypatch.setenv("HEALER_IMPACT_INDEX", str(index.path))
+    monkeypatch.setattr("webhook.service.apply_fix", lambda failure: [ROOT / "app" / "logic.py"])
+
+    outcome = heal_from_payload({"output": "ZeroDivisionError: division by zero"})
+
+    assert outcome.verification_targets == ["tests/test_compute.py::test_ratio"]
+
+
 def test_service_unknown_signature_escalates_with_context():
     noisy = "\n".join(f"line {i}" for i in range(150))
 
@@ -25,3 +40,97 @@ def test_service_unknown_signature_escalates_with_context():
     assert outcome.reason_code == "unknown_failure_signature"
     assert outcome.human_context is not None
     assert len(outcome.human_context["failingOutputPreview"]) == 100
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"junitXml": '<testsuite><testcase classname="tests.test_compute" name="test_zero"><failure'},
+        {"pytestJsonReport": '{"tests": [{"nodeid": "tests/test_compute.py::test_zero", "outcome": "fa'},
+    ],
+    ids=["junit", "pytest-json"],
+)
+def test_service_truncated_report_escalates_as_invalid(monkeypatch, payload):
+    monkeypatch.setattr("webhook.service.apply_fix", lambda failure: pytest.fail("must not fix"))
+
+    outcome = heal_from_payload(payload)
+
+    assert outcome.status == "escalated"
+    assert outcome.reason_code == "invalid_report"
+    assert outcome.human_context is not None
+    assert outcome.human_context["summary"].startswith("Could not parse the failure report")
+
+
+def test_service_structured_report_fixes_every_known_failure_type(monkeypatch):
+    junit = (
+        "<testsuite>"
+        '<testcase classname="tests.test_compute" name="test_none">'
+        "<failure message=\"TypeError: unsupported operand type(s) for /: 'NoneType' and 'int'\">"
+        "app/logic.py:6: TypeError</failure></testcase>"
+        '<testcase classname="tests.test_compute" name="test_zero">'
+        '<failure message="ZeroDivisionError: division by zero">app/logic.py:6: ZeroDivisionError</failure>'
+        "</testcase></testsuite>"
+    )
+    fixed = []
+    monkeypatch.setattr(
+        "webhook.service.apply_fix",
+        lambda failure: fixed.append(failure.failure_type) or [Path("/repo/app/logic.py")],
+    )
+
+    outcome = heal_from_payload({"junitXml": junit})
+
+    assert outcome.status == "completed"
+    assert [failure_type.value for failure_type in fixed] == ["ZERO_DIVISION", "NONE_TYPE_ERROR"]
+    assert outcome.changed_files == ["/repo/app/logic.py"]
+
+
+def test_service_structured_report_escalates_with_failing_tests():
+    report = {
+        "tests": [
+            {
+                "nodeid": "tests/test_other.py::test_lookup",
+                "outcome": "failed",
+                "call": {"outcome": "failed", "crash": {"path": "app/x.py", "lineno": 2, "message": "KeyError: 'a'"}},
+            }
+        ]
+    }
+
+    outcome = heal_from_payload({"pytestJsonReport": report})
+
+    assert outcome.status == "escalated"
+    assert outcome.human_context["failingTests"] == [
+        {"nodeId": "tests/test_other.py::test_lookup", "exceptionType": "KeyError", "file": "app/x.py", "line": 2}
+    ]
+
+
+def test_service_windows_huge_output_and_previews_lazily(monkeypatch):
+    monkeypatch.setenv("HEALER_MAX_OUTPUT_CHARS", "4096")
+    huge = "\n".join(f"noise line {i}" for i in range(100_000)) + "\nE   KeyError: 'missing'"
+
+    outcome = heal_from_payload({"output": huge})
+
+    preview = outcome.human_context["failingOutputPreview"]
+    assert preview[:2] == ["noise line 0", "noise line 1"]
+    assert len(preview) == 100
+
+
+def test_window_output_keeps_head_and_tail():
+    output = "HEAD" + "x" * 10_000 + "TAIL"
+    windowed = window_output(output, max_chars=1000)
+
+    assert windowed.startswith("HEAD") and windowed.endswith("TAIL")
+    assert "characters omitted" in windowed
+    assert len(windowed) < 1100
+    assert preview_lines("a\r\nb\nc", limit=2) == ["a", "b"]
+
+
+def test_window_payload_sends_only_the_window_to_workers():
+    log = "HEAD" + "x" * 10_000 + "TAIL"
+    payload = {"correlation": "c", "logs": log, "build": {"id": 7, "output": log}}
+
+    windowed = window_payload(payload, max_chars=1000)
+
+    assert windowed == {"correlation": "c", "build": {"id": 7}, "output": window_output(log, max_chars=1000)}
+    assert len(windowed["output"]) <= 1000
+    assert window_output(windowed["output"], max_chars=1000) == windowed["output"]
+    assert window_payload({"output": "short"}, max_chars=1000) == {"output": "short"}
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from webhook.workers import HealWorkerError, HealWorkerPool
+
+
+def test_pool_runs_heal_in_a_worker_process():
+    pool = HealWorkerPool(processes=1)
+    try:
+        outcome = pool.run({"output": "nothing recognizable here"}, timeout=30)
+    finally:
+        pool.close()
+
+    assert outcome.status == "escalated"
+    assert outcome.reason_code == "unknown_failure_signature"
+
+
+def test_timed_out_worker_is_killed_and_replaced():
+    pool = HealWorkerPool(processes=1, target=time.sleep)
+    try:
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            pool.run(30, timeout=0.5)
+        assert time.monotonic() - started < 5
+
+        assert pool.run(0, timeout=30) is None
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert stats["timeouts"] == 1
+    assert stats["spawned"] == 2
+
+
+def test_workers_are_recycled_after_max_jobs_and_memory_ceiling():
+    pool = HealWorkerPool(processes=1, max_jobs_per_worker=2, target=abs)
+    try:
+        assert [pool.run(-index, timeout=30) for index in range(3)] == [0, 1, 2]
+        assert pool.stats()["recycled"] == 1
+
+        pool.max_memory_mb = 0
+        pool.run(-1, timeout=30)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert stats["recycled"] == 2
+    assert stats["spawned"] == 2
+
+
+def test_worker_exceptions_are_reported_to_the_caller():
+    pool = HealWorkerPool(processes=1, target=int)
+    try:
+        with pytest.raises(HealWorkerError, match="ValueError"):
+            pool.run("not a number", timeout=30)
+    finally:
+        pool.close()
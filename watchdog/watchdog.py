@@ -8,12 +8,26 @@ import urllib.error
 import urllib.request
 from pathlib import Path
 
+from telemetry import histogram, start_snapshot_flusher
 from watchdog.runtime_report import write_runtime_incident
 
 ROOT = Path(__file__).resolve().parents[1]
 
+_PROBE_SECONDS = histogram(
+    "watchdog_probe_duration_seconds",
+    "Health probe latency, by probe result.",
+    ("healthy",),
+)
+
 
 def is_healthy(url: str, timeout: float = 2.0) -> bool:
+    started = time.perf_counter()
+    healthy = _probe(url, timeout)
+    _PROBE_SECONDS.labels(str(healthy).lower()).observe(time.perf_counter() - started)
+    return healthy
+
+
+def _probe(url: str, timeout: float) -> bool:
     try:
         with urllib.request.urlopen(url, timeout=timeout) as response:  # nosec B310
             return 200 <= response.status < 300
@@ -50,6 +64,7 @@ def main() -> int:
     parser.add_argument("--image-base", default="self-healing-lab/app")
     parser.add_argument("--max-cycles", type=int, default=20)
     args = parser.parse_args()
+    start_snapshot_flusher()
 
     compose_file = Path(args.compose_file)
     consecutive_failures = 0
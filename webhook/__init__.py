@@ -1,9 +1,45 @@
-from webhook.reporter import EventReporter, ReporterError
-from webhook.service import HealOutcome, heal_from_payload
-
-__all__ = [
-    "EventReporter",
-    "ReporterError",
-    "HealOutcome",
-    "heal_from_payload",
-]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+
+# Exports resolve on first access, so importing one submodule (for example
+# webhook.jobs) does not pull in httpx and the healer stack.
+_EXPORTS = {
+    "BatchDeliveryError": "webhook.reporter",
+    "CircuitBreaker": "webhook.reporter",
+    "CircuitOpenError": "webhook.reporter",
+    "EnvelopeValidationError": "webhook.reporter",
+    "EventRejectedError": "webhook.reporter",
+    "EventPipeline": "webhook.pipeline",
+    "EventReporter": "webhook.reporter",
+    "HealJob": "webhook.jobs",
+    "HealWorkerError": "webhook.workers",
+    "HealWorkerPool": "webhook.workers",
+    "JobQueue": "webhook.jobs",
+    "JobQueueFullError": "webhook.jobs",
+    "Outbox": "webhook.outbox",
+    "OutboxLockedError": "webhook.outbox",
+    "OutboxReplayer": "webhook.outbox",
+    "ReporterError": "webhook.reporter",
+    "ResultCache": "webhook.cache",
+    "WorkerCrashedError": "webhook.workers",
+    "HealOutcome": "webhook.service",
+    "heal_cache_key": "webhook.service",
+    "heal_from_payload": "webhook.service",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'webhook' has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
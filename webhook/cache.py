@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_COALESCED = "coalesced"
+
+
+@dataclass
+class ResultCache:
+    max_entries: int = 1024
+    ttl_seconds: float = 600.0
+    should_cache: Callable[[Any], bool] = lambda value: True
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _entries: OrderedDict[str, tuple[float, Any]] = field(default_factory=OrderedDict, init=False, repr=False)
+    _inflight: dict[str, Future[Any]] = field(default_factory=dict, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0},
+        init=False,
+        repr=False,
+    )
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> tuple[Any, str]:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._counters["hits"] += 1
+                return value, CACHE_HIT
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self._counters["misses"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not owner:
+            # A concurrent.futures.Future can be awaited from any event loop, so callers
+            # on the request loop and on the job loop share one execution.
+            return await asyncio.wrap_future(future), CACHE_COALESCED
+
+        try:
+            value = await compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+            else:
+                future.cancel()
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.max_entries > 0 and self.ttl_seconds > 0 and self.should_cache(value):
+                self._store(key, value)
+        future.set_result(value)
+        return value, CACHE_MISS
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "inflight": len(self._inflight), **self._counters}
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._counters["expired"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_FINAL_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobQueueFullError(RuntimeError):
+    pass
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@dataclass
+class HealJob:
+    id: str
+    key: str
+    status: str = JOB_QUEUED
+    created_at: str = field(default_factory=_utc_now)
+    started_at: str | None = None
+    finished_at: str | None = None
+    result: dict[str, Any] | None = None
+    error: Any = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _watchers: list[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    @property
+    def done(self) -> bool:
+        return self.status in JOB_FINAL_STATES
+
+    def record(self, stage: str, **data: Any) -> None:
+        with self._lock:
+            self.events.append({"seq": len(self.events), "stage": stage, "at": _utc_now(), **data})
+            self._notify()
+
+    def _transition(self, status: str, **changes: Any) -> None:
+        with self._lock:
+            self.status = status
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self.events.append({"seq": len(self.events), "stage": status, "at": _utc_now()})
+            self._notify()
+
+    def _notify(self) -> None:
+        for loop, wake in self._watchers:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # the subscriber's loop has already closed
+
+    async def next_events(self, after: int, timeout: float) -> list[dict[str, Any]]:
+        # Waits on an asyncio.Event that the recording thread sets through the
+        # subscriber's loop, so an idle subscriber holds no executor thread.
+        watcher = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if len(self.events) > after or self.done:
+                return self.events[after:]
+            self._watchers.append(watcher)
+        try:
+            await asyncio.wait_for(watcher[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._watchers.remove(watcher)
+        with self._lock:
+            return self.events[after:]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "jobId": self.id,
+                "correlationId": self.key,
+                "status": self.status,
+                "createdAt": self.created_at,
+                "startedAt": self.started_at,
+                "finishedAt": self.finished_at,
+                "result": self.result,
+                "error": self.error,
+                "events": list(self.events),
+            }
+
+
+JobRunner = Callable[[HealJob], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class JobQueue:
+    max_workers: int = 2
+    max_pending: int = 100
+    retain_finished: int = 1000
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _jobs: OrderedDict[str, HealJob] = field(default_factory=OrderedDict, init=False, repr=False)
+    _active: dict[str, HealJob] = field(default_factory=dict, init=False, repr=False)
+    _loop: asyncio.AbstractEventLoop | None = field(default=None, init=False, repr=False)
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+    _semaphore: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"submitted": 0, "deduplicated": 0, "rejected": 0, "succeeded": 0, "failed": 0},
+        init=False,
+        repr=False,
+    )
+
+    def submit(self, key: str, runner: JobRunner) -> tuple[HealJob, bool]:
+        with self._lock:
+            existing = self._active.get(key)
+            if existing is not None:
+                self._counters["deduplicated"] += 1
+                return existing, False
+            if len(self._active) >= self.max_workers + self.max_pending:
+                self._counters["rejected"] += 1
+                raise JobQueueFullError(f"heal job queue is full ({len(self._active)} active jobs)")
+
+            job = HealJob(id=uuid.uuid4().hex, key=key)
+            job.record(JOB_QUEUED)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._counters["submitted"] += 1
+            self._evict_finished()
+            loop = self._ensure_loop()
+
+        asyncio.run_coroutine_threadsafe(self._run(job, runner), loop)
+        return job, True
+
+    def get(self, job_id: str) -> HealJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            running = sum(1 for job in self._active.values() if job.status == JOB_RUNNING)
+            return {
+                "active": len(self._active),
+                "running": running,
+                "queued": len(self._active) - running,
+                "retained": len(self._jobs),
+                **self._counters,
+            }
+
+    def close(self, timeout: float = 5.0, finalizer: Callable[[], Awaitable[None]] | None = None) -> None:
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def _shutdown() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+            if finalizer is not None:
+                await finalizer()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), loop).result(timeout=timeout + 5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            loop = asyncio.new_event_loop()
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._thread = threading.Thread(target=self._serve, args=(loop,), name="heal-jobs", daemon=True)
+            self._loop = loop
+            self._thread.start()
+        return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _run(self, job: HealJob, runner: JobRunner) -> None:
+        assert self._semaphore is not None
+        try:
+            async with self._semaphore:
+                job._transition(JOB_RUNNING, started_at=_utc_now())
+                result = await runner(job)
+        except Exception as exc:  # noqa: BLE001 - any failure is reported on the job
+            error = getattr(exc, "detail", None) or {"error": "job_failed", "message": str(exc)}
+            self._finish(job, JOB_FAILED, error=error)
+        except asyncio.CancelledError:
+            self._finish(job, JOB_FAILED, error={"error": "job_cancelled", "message": "server shutting down"})
+            raise
+        else:
+            self._finish(job, JOB_SUCCEEDED, result=result)
+
+    def _finish(self, job: HealJob, status: str, **changes: Any) -> None:
+        with self._lock:
+            if self._active.get(job.key) is job:
+                del self._active[job.key]
+            self._counters[status] += 1
+        job._transition(status, finished_at=_utc_now(), **changes)
+
+    def _evict_finished(self) -> None:
+        finished = len(self._jobs) - len(self._active)
+        if finished <= self.retain_finished:
+            return
+        for job_id in list(self._jobs):
+            if self._jobs[job_id].done:
+                del self._jobs[job_id]
+                finished -= 1
+                if finished <= self.retain_finished:
+                    return
@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+from webhook.reporter import EventRejectedError, EventReporter, ReporterError
+from webhook.serialization import dumps
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms only get in-process locking
+    fcntl = None  # type: ignore[assignment]
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE = "cursor.json"
+LOCK_FILE = "outbox.lock"
+# Events the hub refused with a 4xx, kept for inspection instead of replayed.
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+
+
+class OutboxLockedError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class OutboxRecord:
+    segment: int
+    end_offset: int
+    key: str
+    envelope: dict[str, Any]
+
+
+@dataclass
+class Outbox:
+    directory: Path
+    segment_max_bytes: int = 4 * 1024 * 1024
+    fsync_every: int = 32
+    fsync_interval_seconds: float = 0.2
+    # Hold an exclusive flock on the directory while open, so no other process
+    # appends to it, replays it or truncates its tail as torn.
+    exclusive: bool = False
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+    _appended: threading.Condition = field(init=False, repr=False)
+    _handle: IO[bytes] | None = field(default=None, init=False, repr=False)
+    _segment: int = field(default=0, init=False, repr=False)
+    _unsynced: int = field(default=0, init=False, repr=False)
+    _last_sync: float = field(default_factory=time.monotonic, init=False, repr=False)
+    _cursor: tuple[int, int] = field(default=(0, 0), init=False, repr=False)
+    _opened: bool = field(default=False, init=False, repr=False)
+    _lock_fd: int | None = field(default=None, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"appended": 0, "acked": 0, "fsyncs": 0, "compacted_segments": 0, "dead_lettered": 0},
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        self.directory = Path(self.directory)
+        self._appended = threading.Condition(self._lock)
+
+    @classmethod
+    def claim(cls, root: Path, **kwargs: Any) -> Outbox:
+        # One directory per live process: takes the first worker-N under root that
+        # no other process holds, so a restarted worker picks up what its
+        # predecessor left behind.
+        slot = 0
+        while True:
+            outbox = cls(Path(root) / f"worker-{slot}", exclusive=True, **kwargs)
+            try:
+                with outbox._lock:
+                    outbox._open()
+            except OutboxLockedError:
+                slot += 1
+                continue
+            return outbox
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.exclusive:
+            self._acquire_directory()
+        self._cursor = self._read_cursor()
+
+        segments = self._segments()
+        if segments:
+            self._segment = segments[-1]
+            _truncate_torn_tail(self._segment_path(self._segment))
+        else:
+            self._segment = max(1, self._cursor[0])
+        self._opened = True
+
+    def _acquire_directory(self) -> None:
+        if fcntl is None:
+            return
+        fd = os.open(self.directory / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise OutboxLockedError(f"{self.directory} is held by another process") from None
+        self._lock_fd = fd
+
+    def _segments(self) -> list[int]:
+        return sorted(
+            int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}") if path.stem.isdigit()
+        )
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"{segment:020d}{SEGMENT_SUFFIX}"
+
+    def _read_cursor(self) -> tuple[int, int]:
+        path = self.directory / CURSOR_FILE
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return (0, 0)
+        return (int(data["segment"]), int(data["offset"]))
+
+    def _write_cursor(self, cursor: tuple[int, int]) -> None:
+        path = self.directory / CURSOR_FILE
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w") as handle:
+            json.dump({"segment": cursor[0], "offset": cursor[1]}, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+
+    def append(
+        self, envelope: dict[str, Any], key: str | None = None, body: bytes | None = None
+    ) -> None:
+        # Reuse the already-serialized request body when the reporter has one.
+        encoded_key = dumps(key or envelope["id"])
+        line = b'{"key":' + encoded_key + b',"envelope":' + (body or dumps(envelope)) + b"}\n"
+
+        with self._lock:
+            self._open()
+            if self._handle is None:
+                self._handle = self._segment_path(self._segment).open("ab")
+            elif self._handle.tell() + len(line) > self.segment_max_bytes and self._handle.tell() > 0:
+                self._rotate()
+
+            assert self._handle is not None
+            self._handle.write(line)
+            self._handle.flush()
+            self._unsynced += 1
+            self._counters["appended"] += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval_seconds
+            ):
+                self._sync_locked()
+            self._appended.notify_all()
+
+    def _rotate(self) -> None:
+        self._sync_locked()
+        assert self._handle is not None
+        self._handle.close()
+        self._segment += 1
+        self._handle = self._segment_path(self._segment).open("ab")
+
+    def _sync_locked(self) -> None:
+        if self._handle is not None and self._unsynced:
+            os.fsync(self._handle.fileno())
+            self._counters["fsyncs"] += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def pending(self) -> Iterator[OutboxRecord]:
+        with self._lock:
+            self._open()
+            cursor_segment, cursor_offset = self._cursor
+            segments = [segment for segment in self._segments() if segment >= cursor_segment]
+
+        for segment in segments:
+            offset = cursor_offset if segment == cursor_segment else 0
+            try:
+                handle = self._segment_path(segment).open("rb")
+            except FileNotFoundError:
+                continue
+            with handle:
+                handle.seek(offset)
+                for line in iter(handle.readline, b""):
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    yield OutboxRecord(
+                        segment=segment,
+                        end_offset=offset,
+                        key=record["key"],
+                        envelope=record["envelope"],
+                    )
+
+    def ack(self, record: OutboxRecord) -> None:
+        with self._lock:
+            self._cursor = (record.segment, record.end_offset)
+            self._counters["acked"] += 1
+
+    def dead_letter(self, envelope: dict[str, Any], reason: str) -> None:
+        line = dumps({"envelope": envelope, "reason": reason}) + b"\n"
+        with self._lock:
+            self._open()
+            with (self.directory / DEAD_LETTER_FILE).open("ab") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._counters["dead_lettered"] += 1
+
+    def commit(self) -> None:
+        # Cursor writes are batched; a crash replays at most the acks since the
+        # last commit, and the hub de-duplicates them by Idempotency-Key.
+        with self._lock:
+            self._open()
+            self._write_cursor(self._cursor)
+
+    def compact(self) -> int:
+        with self._lock:
+            self._open()
+            self._write_cursor(self._cursor)
+            cursor_segment, cursor_offset = self._cursor
+            removed = 0
+            for segment in self._segments():
+                if segment > cursor_segment or segment == self._segment:
+                    break
+                path = self._segment_path(segment)
+                if segment == cursor_segment and cursor_offset < path.stat().st_size:
+                    break
+                path.unlink()
+                removed += 1
+            self._counters["compacted_segments"] += removed
+            return removed
+
+    def wait_for_append(self, timeout: float) -> None:
+        with self._appended:
+            self._appended.wait(timeout)
+
+    def wake(self) -> None:
+        with self._appended:
+            self._appended.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            self._open()
+            cursor_segment, cursor_offset = self._cursor
+            pending_bytes = 0
+            segments = self._segments()
+            for segment in segments:
+                if segment < cursor_segment:
+                    continue
+                size = self._segment_path(segment).stat().st_size
+                pending_bytes += size - (cursor_offset if segment == cursor_segment else 0)
+            return {"segments": len(segments), "pending_bytes": max(0, pending_bytes), **self._counters}
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync_locked()
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if self._lock_fd is not None:
+                # Closing the descriptor releases the flock; reuse claims it again.
+                os.close(self._lock_fd)
+                self._lock_fd = None
+                self._opened = False
+
+
+def _truncate_torn_tail(path: Path) -> None:
+    # A crash mid-append can leave a partial last line; drop it so new records
+    # start on a clean line boundary.
+    with path.open("rb+") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            handle.seek(position - step)
+            chunk = handle.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                keep = position - step + newline + 1
+                if keep != size:
+                    handle.truncate(keep)
+                return
+            position -= step
+        handle.truncate(0)
+
+
+@dataclass
+class OutboxReplayer:
+    outbox: Outbox
+    reporter: EventReporter
+    rate_per_second: float = 20.0
+    idle_seconds: float = 1.0
+    max_backoff_seconds: float = 30.0
+    commit_every: int = 100
+    _stop: threading.Event = field(default_factory=threading.Event, init=False, repr=False)
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+    replayed: int = field(default=0, init=False)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="outbox-replayer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.outbox.wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def drain_once(self) -> bool:
+        interval = 1.0 / self.rate_per_second if self.rate_per_second > 0 else 0.0
+        next_send = time.monotonic()
+        uncommitted = 0
+        try:
+            for record in self.outbox.pending():
+                if self._stop.is_set():
+                    return True
+                delay = next_send - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return True
+                next_send = max(next_send, time.monotonic()) + interval
+
+                try:
+                    self.reporter.deliver(record.envelope)
+                except EventRejectedError as exc:
+                    # Replaying it again would stall every record behind it.
+                    self.outbox.dead_letter(record.envelope, str(exc))
+                except ReporterError:
+                    return False
+                else:
+                    self.replayed += 1
+                self.outbox.ack(record)
+                uncommitted += 1
+                if uncommitted >= self.commit_every:
+                    self.outbox.commit()
+                    uncommitted = 0
+        finally:
+            if uncommitted:
+                self.outbox.commit()
+
+        self.outbox.compact()
+        return True
+
+    def _run(self) -> None:
+        backoff = self.idle_seconds
+        while not self._stop.is_set():
+            self.outbox.sync()
+            if self.drain_once():
+                backoff = self.idle_seconds
+                self.outbox.wait_for_append(self.idle_seconds)
+            else:
+                self._stop.wait(backoff)
+                backoff = min(self.max_backoff_seconds, backoff * 2)
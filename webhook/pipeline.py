@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from webhook.outbox import Outbox
+from webhook.reporter import BatchDeliveryError, EventReporter, ReporterError
+
+BACKPRESSURE_POLICIES = ("block", "drop_oldest", "spill")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EventPipeline:
+    reporter: EventReporter
+    max_queue_size: int = 1000
+    batch_size: int = 50
+    linger_seconds: float = 0.05
+    policy: str = "block"
+    block_timeout_seconds: float = 1.0
+    outbox: Outbox | None = None
+    _queue: deque[dict[str, Any]] = field(default_factory=deque, init=False, repr=False)
+    _cond: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+    _thread: threading.Thread | None = field(default=None, init=False, repr=False)
+    _closing: bool = field(default=False, init=False, repr=False)
+    _in_flight: int = field(default=0, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {
+            "enqueued": 0,
+            "delivered": 0,
+            "batches": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "failed": 0,
+            "rejected": 0,
+            "lost_batches": 0,
+            "max_depth": 0,
+        },
+        init=False,
+        repr=False,
+    )
+
+    def __post_init__(self) -> None:
+        if self.policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"unsupported backpressure policy: {self.policy}")
+        if self.outbox is None:
+            self.outbox = self.reporter.outbox
+        if self.policy == "spill" and self.outbox is None:
+            raise ValueError("spill policy requires an outbox")
+
+    def emit(
+        self,
+        *,
+        correlation_id: str,
+        event_type: str,
+        severity: str,
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        envelope = self.reporter.build_envelope(
+            correlation_id=correlation_id,
+            event_type=event_type,
+            severity=severity,
+            payload=payload,
+        )
+        self.submit(envelope)
+        return envelope
+
+    async def emit_async(
+        self,
+        *,
+        correlation_id: str,
+        event_type: str,
+        severity: str,
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        envelope = self.reporter.build_envelope(
+            correlation_id=correlation_id,
+            event_type=event_type,
+            severity=severity,
+            payload=payload,
+        )
+        if not self._try_submit(envelope):
+            await asyncio.to_thread(self.submit, envelope)
+        return envelope
+
+    def submit(self, envelope: dict[str, Any]) -> None:
+        if self._try_submit(envelope):
+            return
+
+        # Only the block policy can still be waiting for room at this point.
+        deadline = time.monotonic() + self.block_timeout_seconds
+        with self._cond:
+            while len(self._queue) >= self.max_queue_size and not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["dropped"] += 1
+                    raise ReporterError("event pipeline queue is full")
+                self._cond.wait(remaining)
+            self._enqueue(envelope)
+
+    def _try_submit(self, envelope: dict[str, Any]) -> bool:
+        self._ensure_started()
+        with self._cond:
+            if self._closing:
+                raise ReporterError("event pipeline is closed")
+
+            if len(self._queue) < self.max_queue_size:
+                self._enqueue(envelope)
+                return True
+
+            if self.policy == "drop_oldest":
+                self._queue.popleft()
+                self._counters["dropped"] += 1
+                self._enqueue(envelope)
+                return True
+
+        if self.policy == "spill":
+            self._spill([envelope])
+            return True
+        return False
+
+    def _enqueue(self, envelope: dict[str, Any]) -> None:
+        self._queue.append(envelope)
+        self._counters["enqueued"] += 1
+        self._counters["max_depth"] = max(self._counters["max_depth"], len(self._queue))
+        self._cond.notify_all()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-pipeline-flusher", daemon=True
+                )
+                self._thread.start()
+
+    def _next_batch(self) -> list[dict[str, Any]]:
+        with self._cond:
+            while not self._queue and not self._closing:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            linger_until = time.monotonic() + self.linger_seconds
+            while len(self._queue) < self.batch_size and not self._closing:
+                remaining = linger_until - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            count = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._in_flight = len(batch)
+            self._cond.notify_all()
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            try:
+                self._deliver(batch)
+            except Exception:  # noqa: BLE001 - one bad batch must not stop the flusher
+                # A full disk while spilling or an unserializable payload: the batch
+                # is lost, later ones are not.
+                logger.exception("Event pipeline lost a batch of %d events", len(batch))
+                with self._cond:
+                    self._counters["lost_batches"] += 1
+                    self._counters["failed"] += len(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _deliver(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            self.reporter.deliver_batch(batch)
+        except ReporterError as exc:
+            # Events the hub already accepted are not spilled again, and the ones
+            # it refused go to the dead-letter file instead of the replay queue.
+            failed = exc.undelivered if isinstance(exc, BatchDeliveryError) else batch
+            rejected = exc.rejected if isinstance(exc, BatchDeliveryError) else []
+            with self._cond:
+                self._counters["delivered"] += len(batch) - len(failed) - len(rejected)
+                self._counters["rejected"] += len(rejected)
+            if self.outbox is not None:
+                for envelope in rejected:
+                    self.outbox.dead_letter(envelope, str(exc))
+                self._spill(failed)
+            else:
+                with self._cond:
+                    self._counters["failed"] += len(failed)
+        else:
+            with self._cond:
+                self._counters["delivered"] += len(batch)
+                self._counters["batches"] += 1
+
+    def _spill(self, envelopes: list[dict[str, Any]]) -> None:
+        assert self.outbox is not None
+        for envelope in envelopes:
+            self.outbox.append(envelope)
+        with self._cond:
+            self._counters["spilled"] += len(envelopes)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "depth": len(self._queue),
+                "capacity": self.max_queue_size,
+                "in_flight": self._in_flight,
+                **self._counters,
+            }
+
+    def close(self, timeout: float = 10.0) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.reporter.close()
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
+        await self.reporter.aclose()
@@ -1,27 +1,288 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import os
 import random
+import threading
 import time
 import uuid
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 import httpx
 
+from telemetry import counter, gauge, histogram
+from webhook.serialization import Serializer, dumps
+from webhook.validation import VALIDATION_MODES, Validator
+
+if TYPE_CHECKING:
+    from webhook.outbox import Outbox
+
+
+SCHEMA_VERSION = "1.0.0"
+EVENT_VERSION = 1
+EVENT_SOURCE = "self-healing-systems"
+
+logger = logging.getLogger(__name__)
+
+_ATTEMPTS = counter(
+    "mission_control_attempts_total",
+    "Mission Control delivery attempts by outcome.",
+    ("outcome",),
+)
+_RETRIES = counter("mission_control_retries_total", "Mission Control delivery retries.")
+_ATTEMPT_SECONDS = histogram(
+    "mission_control_request_duration_seconds",
+    "Latency of individual Mission Control delivery attempts.",
+)
+_CIRCUIT_STATE = gauge(
+    "mission_control_circuit_state",
+    "1 for the circuit breaker's current state, 0 for the others.",
+    ("state",),
+)
+_CIRCUIT_TRANSITIONS = counter(
+    "mission_control_circuit_transitions_total",
+    "Circuit breaker state changes by the state entered.",
+    ("state",),
+)
+
 
 class ReporterError(RuntimeError):
     pass
 
 
+class CircuitOpenError(ReporterError):
+    pass
+
+
+class EnvelopeValidationError(ReporterError):
+    pass
+
+
+class EventRejectedError(ReporterError):
+    # The hub answered 4xx: the event itself is bad, so neither a retry nor an
+    # outbox replay can deliver it.
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BatchDeliveryError(ReporterError):
+    # Raised by deliver_batch. `undelivered` holds the envelopes worth retrying
+    # later, `rejected` the ones the hub refused outright.
+    def __init__(
+        self,
+        message: str,
+        undelivered: list[dict[str, Any]],
+        rejected: list[dict[str, Any]] | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.undelivered = undelivered
+        self.rejected = rejected or []
+
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    failure_rate_threshold: float = 0.5
+    window_size: int = 20
+    window_seconds: float = 60.0
+    minimum_calls: int = 5
+    open_seconds: float = 30.0
+    half_open_max_calls: int = 1
+    _state: str = field(default=CIRCUIT_CLOSED, init=False, repr=False)
+    _outcomes: deque[tuple[float, bool]] = field(default_factory=deque, init=False, repr=False)
+    _opened_at: float = field(default=0.0, init=False, repr=False)
+    _half_open_calls: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"opened": 0, "short_circuited": 0, "successes": 0, "failures": 0},
+        init=False,
+        repr=False,
+    )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def __post_init__(self) -> None:
+        _publish_circuit_state(self._state)
+
+    def _current_state(self, now: float) -> str:
+        if self._state == CIRCUIT_OPEN and now - self._opened_at >= self.open_seconds:
+            self._enter(CIRCUIT_HALF_OPEN)
+            self._half_open_calls = 0
+        return self._state
+
+    def _enter(self, state: str) -> None:
+        self._state = state
+        _CIRCUIT_TRANSITIONS.labels(state).inc()
+        _publish_circuit_state(state)
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CIRCUIT_CLOSED:
+                return True
+            if state == CIRCUIT_HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self._counters["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            if self._state == CIRCUIT_HALF_OPEN:
+                self._enter(CIRCUIT_CLOSED)
+                self._outcomes.clear()
+                return
+            self._record(time.monotonic(), True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._counters["failures"] += 1
+            if self._state == CIRCUIT_HALF_OPEN:
+                self._trip(now)
+                return
+            self._record(now, False)
+            if len(self._outcomes) >= self.minimum_calls:
+                failures = sum(1 for _, ok in self._outcomes if not ok)
+                if failures / len(self._outcomes) >= self.failure_rate_threshold:
+                    self._trip(now)
+
+    def _record(self, now: float, ok: bool) -> None:
+        self._outcomes.append((now, ok))
+        while len(self._outcomes) > self.window_size:
+            self._outcomes.popleft()
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _trip(self, now: float) -> None:
+        self._enter(CIRCUIT_OPEN)
+        self._opened_at = now
+        self._outcomes.clear()
+        self._counters["opened"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": state,
+                "window_calls": len(self._outcomes),
+                "window_failure_rate": round(failures / len(self._outcomes), 3)
+                if self._outcomes
+                else 0.0,
+                "open_remaining_seconds": round(max(0.0, self.open_seconds - (now - self._opened_at)), 3)
+                if state == CIRCUIT_OPEN
+                else 0.0,
+                **self._counters,
+            }
+
+
 @dataclass
 class EventReporter:
     base_url: str
     token: str
     timeout_seconds: float = 5.0
     max_attempts: int = 3
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_seconds: float = 30.0
+    http2: bool = False
+    batch_path: str | None = None
+    outbox: Outbox | None = None
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    serializer: Serializer = dumps
+    validator: Validator | None = None
+    validation_mode: str = "off"
+    _client: httpx.Client | None = field(default=None, init=False, repr=False)
+    _client_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False
+    )
 
-    def emit(
+    def __post_init__(self) -> None:
+        if self.validation_mode not in VALIDATION_MODES:
+            raise ValueError(f"unsupported validation mode: {self.validation_mode}")
+
+    def __enter__(self) -> EventReporter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # type: ignore[no-untyped-def]
+        self.close()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_seconds,
+        )
+
+    def _get_client(self) -> httpx.Client:
+        client = self._client
+        if client is not None:
+            return client
+
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.timeout_seconds,
+                    limits=self._limits(),
+                    http2=self.http2,
+                )
+            return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # AsyncClient connections are bound to the loop that opened them, so each
+        # running loop (app loop, background job loops) gets its own pool.
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                limits=self._limits(),
+                http2=self.http2,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        # Closes every loop's client, each on its own loop while that loop still runs.
+        current = asyncio.get_running_loop()
+        while self._async_clients:
+            try:
+                loop, client = self._async_clients.popitem()
+            except KeyError:
+                break
+            try:
+                if loop is not current and loop.is_running() and not loop.is_closed():
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+                else:
+                    # A stopped loop cannot run the close; release the pool from here.
+                    await client.aclose()
+            except Exception:
+                logger.debug("Failed to close async client for loop %r", loop, exc_info=True)
+
+    def build_envelope(
         self,
         *,
         correlation_id: str,
@@ -29,54 +290,271 @@ class EventReporter:
         severity: str,
         payload: dict[str, Any],
     ) -> dict[str, Any]:
-        event_id = _new_event_id()
         envelope = {
-            "id": event_id,
-            "schemaVersion": "1.0.0",
-            "eventVersion": 1,
-            "source": "self-healing-systems",
+            "id": _new_event_id(),
+            "schemaVersion": SCHEMA_VERSION,
+            "eventVersion": EVENT_VERSION,
+            "source": EVENT_SOURCE,
             "type": event_type,
             "severity": severity,
-            "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+            "timestamp": _utc_timestamp(),
             "correlationId": correlation_id,
             "payload": payload,
         }
+        if self.validator is not None and self.validation_mode != "off":
+            self._validate(envelope)
+        return envelope
 
-        url = self.base_url.rstrip("/") + "/events"
-        headers = {
+    def _validate(self, envelope: dict[str, Any]) -> None:
+        assert self.validator is not None
+        errors = self.validator(envelope)
+        if not errors:
+            return
+        if self.validation_mode == "strict":
+            raise EnvelopeValidationError(f"Envelope failed schema validation: {'; '.join(errors)}")
+        logger.warning("Envelope %s failed schema validation: %s", envelope["id"], "; ".join(errors))
+
+    def _headers(self, idempotency_key: str) -> dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.token}",
-            "Idempotency-Key": event_id,
+            "Content-Type": "application/json",
+            "Idempotency-Key": idempotency_key,
         }
 
+    def emit(
+        self,
+        *,
+        correlation_id: str,
+        event_type: str,
+        severity: str,
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        envelope = self.build_envelope(
+            correlation_id=correlation_id,
+            event_type=event_type,
+            severity=severity,
+            payload=payload,
+        )
+        body = self.serializer(envelope)
+        try:
+            self.deliver(envelope, body)
+        except EventRejectedError:
+            raise
+        except ReporterError:
+            if self.outbox is None:
+                raise
+            self.outbox.append(envelope, body=body)
+        return envelope
+
+    async def emit_async(
+        self,
+        *,
+        correlation_id: str,
+        event_type: str,
+        severity: str,
+        payload: dict[str, Any],
+    ) -> dict[str, Any]:
+        envelope = self.build_envelope(
+            correlation_id=correlation_id,
+            event_type=event_type,
+            severity=severity,
+            payload=payload,
+        )
+        body = self.serializer(envelope)
+        try:
+            await self.deliver_async(envelope, body)
+        except EventRejectedError:
+            raise
+        except ReporterError:
+            if self.outbox is None:
+                raise
+            await asyncio.to_thread(self.outbox.append, envelope, body=body)
+        return envelope
+
+    def deliver(self, envelope: dict[str, Any], body: bytes | None = None) -> None:
+        self._post_with_retries(
+            self.base_url.rstrip("/") + "/events",
+            self.serializer(envelope) if body is None else body,
+            self._headers(envelope["id"]),
+        )
+
+    def deliver_batch(self, envelopes: list[dict[str, Any]]) -> None:
+        if not self.batch_path:
+            undelivered: list[dict[str, Any]] = []
+            rejected: list[dict[str, Any]] = []
+            last_error: ReporterError | None = None
+            for envelope in envelopes:
+                try:
+                    self.deliver(envelope)
+                except EventRejectedError as exc:
+                    rejected.append(envelope)
+                    last_error = exc
+                except ReporterError as exc:
+                    undelivered.append(envelope)
+                    last_error = exc
+            if undelivered or rejected:
+                failed = len(undelivered) + len(rejected)
+                raise BatchDeliveryError(
+                    f"{failed} of {len(envelopes)} events failed: {last_error}", undelivered, rejected
+                )
+            return
+
+        batch_key = hashlib.sha256(
+            "\n".join(envelope["id"] for envelope in envelopes).encode()
+        ).hexdigest()
+        try:
+            self._post_with_retries(
+                self.base_url.rstrip("/") + self.batch_path,
+                self.serializer(envelopes),
+                self._headers(f"batch-{batch_key}"),
+            )
+        except EventRejectedError as exc:
+            raise BatchDeliveryError(str(exc), [], list(envelopes)) from exc
+        except ReporterError as exc:
+            raise BatchDeliveryError(str(exc), list(envelopes)) from exc
+
+    def _post_with_retries(self, url: str, body: bytes, headers: dict[str, str]) -> None:
         last_error: Exception | None = None
         for attempt in range(self.max_attempts):
+            self._check_circuit()
+            started = time.perf_counter()
             try:
-                with httpx.Client(timeout=self.timeout_seconds) as client:
-                    response = client.post(url, json=envelope, headers=headers)
-
-                if response.status_code >= 500:
-                    raise ReporterError(f"Server error from mission-control: {response.status_code}")
-                response.raise_for_status()
-                return envelope
+                response = self._get_client().post(url, content=body, headers=headers)
+                _check_response(response)
+                self.breaker.record_success()
+                _observe_attempt(started, "success")
+                return
             except (httpx.HTTPError, ReporterError) as exc:
                 last_error = exc
+                self._record_failure(exc)
+                _observe_attempt(started, _failure_outcome(exc))
+                _raise_if_rejected(exc)
                 if attempt == self.max_attempts - 1:
                     break
 
-                base_delay = _base_delay_seconds(attempt)
-                jitter = random.uniform(0.8, 1.2)
-                time.sleep(base_delay * jitter)
+                _RETRIES.inc()
+                time.sleep(_retry_delay_seconds(attempt))
 
         raise ReporterError(f"Failed to report event after retries: {last_error}")
 
+    async def deliver_async(self, envelope: dict[str, Any], body: bytes | None = None) -> None:
+        url = self.base_url.rstrip("/") + "/events"
+        headers = self._headers(envelope["id"])
+        if body is None:
+            body = self.serializer(envelope)
+
+        last_error: Exception | None = None
+        for attempt in range(self.max_attempts):
+            self._check_circuit()
+            started = time.perf_counter()
+            try:
+                client = self._get_async_client()
+                response = await asyncio.wait_for(
+                    client.post(url, content=body, headers=headers),
+                    timeout=self.timeout_seconds,
+                )
+                _check_response(response)
+                self.breaker.record_success()
+                _observe_attempt(started, "success")
+                return
+            except asyncio.TimeoutError:
+                last_error = ReporterError(
+                    f"Attempt exceeded deadline of {self.timeout_seconds}s"
+                )
+                self._record_failure(last_error)
+                _observe_attempt(started, "timeout")
+            except (httpx.HTTPError, ReporterError) as exc:
+                last_error = exc
+                self._record_failure(exc)
+                _observe_attempt(started, _failure_outcome(exc))
+                _raise_if_rejected(exc)
+
+            if attempt == self.max_attempts - 1:
+                break
+            _RETRIES.inc()
+            await asyncio.sleep(_retry_delay_seconds(attempt))
+
+        raise ReporterError(f"Failed to report event after retries: {last_error}")
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            _ATTEMPTS.labels("short_circuited").inc()
+            raise CircuitOpenError("mission-control circuit is open; failing fast")
+
+    def _record_failure(self, exc: Exception) -> None:
+        # 4xx answers mean the hub is up and rejecting this event, not unhealthy.
+        if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+
+def _publish_circuit_state(state: str) -> None:
+    for known in (CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN):
+        _CIRCUIT_STATE.labels(known).set(1.0 if known == state else 0.0)
+
+
+def _observe_attempt(started: float, outcome: str) -> None:
+    _ATTEMPT_SECONDS.observe(time.perf_counter() - started)
+    _ATTEMPTS.labels(outcome).inc()
+
+
+def _failure_outcome(exc: Exception) -> str:
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500:
+        return "rejected"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    return "error"
+
+
+def _raise_if_rejected(exc: Exception) -> None:
+    # 408 and 429 are the hub asking for a later retry, not refusing the event.
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return
+    status = exc.response.status_code
+    if 400 <= status < 500 and status not in (408, 429):
+        raise EventRejectedError(f"mission-control rejected the event: {status}", status) from exc
+
+
+def _check_response(response: httpx.Response) -> None:
+    if response.status_code >= 500:
+        raise ReporterError(f"Server error from mission-control: {response.status_code}")
+    response.raise_for_status()
+
+
+def _retry_delay_seconds(attempt: int) -> float:
+    return _base_delay_seconds(attempt) * random.uniform(0.8, 1.2)
+
 
 def _base_delay_seconds(attempt: int) -> float:
     schedule = [0.5, 1.0, 2.0]
     return schedule[min(attempt, len(schedule) - 1)]
 
 
+_timestamp_cache: tuple[int, str] = (-1, "")
+
+
+def _utc_timestamp() -> str:
+    # RFC 3339 with a "Z" suffix; the seconds prefix is formatted once per second.
+    global _timestamp_cache
+    now = time.time()
+    seconds = int(now)
+    cached_seconds, prefix = _timestamp_cache
+    if seconds != cached_seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    return f"{prefix}.{int((now - seconds) * 1_000_000):06d}Z"
+
+
+_UUID7 = getattr(uuid, "uuid7", None)
+
+
 def _new_event_id() -> str:
-    uuid7 = getattr(uuid, "uuid7", None)
-    if callable(uuid7):
-        return str(uuid7())
-    return str(uuid.uuid4())
+    if callable(_UUID7):
+        return str(_UUID7())
+    # Same layout as str(uuid.uuid4()) without building a UUID object.
+    raw = bytearray(os.urandom(16))
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    hexed = raw.hex()
+    return f"{hexed[:8]}-{hexed[8:12]}-{hexed[12:16]}-{hexed[16:20]}-{hexed[20:]}"
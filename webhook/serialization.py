@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None  # type: ignore[assignment]
+
+Serializer = Callable[[Any], bytes]
+
+_STDLIB_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def stdlib_dumps(value: Any) -> bytes:
+    return _STDLIB_ENCODER.encode(value).encode("utf-8")
+
+
+def orjson_dumps(value: Any) -> bytes:
+    try:
+        return orjson.dumps(value)
+    except TypeError:
+        # orjson rejects a few shapes the stdlib accepts (e.g. non-str keys).
+        return stdlib_dumps(value)
+
+
+def get_serializer(name: str = "auto") -> Serializer:
+    if name == "stdlib":
+        return stdlib_dumps
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("orjson serializer requested but orjson is not installed")
+        return orjson_dumps
+    if name == "auto":
+        return orjson_dumps if orjson is not None else stdlib_dumps
+    raise ValueError(f"unsupported serializer: {name}")
+
+
+dumps = get_serializer()
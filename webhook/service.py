@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from healer.classifier import classify_pytest_output
-from healer.fixers import apply_fix
-from healer.types import FailureType
+from healer.fixers import ROOT, apply_fix
+from healer.impact import impact_index
+from healer.reports import distinct_failures, failures_from_payload, primary_failure
+from healer.selection import verification_targets
+from healer.signatures import signature_cache, signature_hash, signature_is_complete
+from healer.types import FailureInfo, FailureType
 
 KNOWN_FAILURE_TYPES = {FailureType.ZERO_DIVISION, FailureType.NONE_TYPE_ERROR}
+DEFAULT_MAX_OUTPUT_CHARS = 4 * 1024 * 1024
+OUTPUT_HEAD_CHARS = 64 * 1024
+PREVIEW_LINES = 100
+_OUTPUT_FIELDS = ("output", "failingOutput", "pytestOutput", "logs")
 
 
 @dataclass(frozen=True)
@@ -18,14 +30,13 @@ class HealOutcome:
     human_context: dict[str, Any] | None
     patch_summary: str | None
     changed_files: list[str]
+    # Tests to re-run for this fix, failing ones first.
+    verification_targets: list[str] = field(default_factory=list)
 
 
 def _extract_failure_output(payload: dict[str, Any]) -> str:
     candidates = (
-        payload.get("output"),
-        payload.get("failingOutput"),
-        payload.get("pytestOutput"),
-        payload.get("logs"),
+        *(payload.get(name) for name in _OUTPUT_FIELDS),
         payload.get("build", {}).get("output") if isinstance(payload.get("build"), dict) else None,
     )
     for value in candidates:
@@ -34,36 +45,145 @@ def _extract_failure_output(payload: dict[str, Any]) -> str:
     return ""
 
 
-def heal_from_payload(payload: dict[str, Any]) -> HealOutcome:
+def window_output(output: str, max_chars: int | None = None) -> str:
+    # Huge CI logs are cut down to their head (collection errors) and tail
+    # (tracebacks and the summary) before anything else copies or scans them.
+    if max_chars is None:
+        max_chars = int(os.getenv("HEALER_MAX_OUTPUT_CHARS", str(DEFAULT_MAX_OUTPUT_CHARS)))
+    if max_chars <= 0 or len(output) <= max_chars:
+        return output
+    head = min(OUTPUT_HEAD_CHARS, max_chars // 4)
+    # The marker counts against the budget, so a windowed log is not cut again
+    # when the worker windows what the app process already did.
+    marker_chars = len(f"\n... [{len(output)} characters omitted] ...\n")
+    tail = max(0, max_chars - head - marker_chars)
+    omitted = len(output) - head - tail
+    return f"{output[:head]}\n... [{omitted} characters omitted] ...\n{output[len(output) - tail :]}"
+
+
+def window_payload(payload: dict[str, Any], max_chars: int | None = None) -> dict[str, Any]:
+    # Applied before a payload is pickled to a heal worker: the copy carries only
+    # the window, under "output", and none of the other fields holding the log.
     output = _extract_failure_output(payload)
-    failure = classify_pytest_output(output)
+    windowed = window_output(output, max_chars)
+    if len(windowed) == len(output):
+        return payload
+    trimmed = {name: value for name, value in payload.items() if name not in _OUTPUT_FIELDS}
+    if isinstance(trimmed.get("build"), dict):
+        trimmed["build"] = {name: value for name, value in trimmed["build"].items() if name != "output"}
+    trimmed["output"] = windowed
+    return trimmed
+
+
+def preview_lines(output: str, limit: int = PREVIEW_LINES) -> list[str]:
+    lines: list[str] = []
+    start = 0
+    while len(lines) < limit and start < len(output):
+        end = output.find("\n", start)
+        if end == -1:
+            end = len(output)
+        lines.append(output[start:end].rstrip("\r"))
+        start = end + 1
+    return lines
+
+
+def failure_keys(payload: dict[str, Any]) -> tuple[str, str | None]:
+    # (result-cache fingerprint, signature cache key). heal_from_payload is
+    # handed the signature instead of normalizing the log a second time.
+    output = window_output(_extract_failure_output(payload))
+    if not output:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest(), None
+    signature = signature_hash(output)
+    if signature_is_complete(output):
+        return signature, signature
+    # The signature covers only the first few KB; failures that differ past it
+    # must not share a heal result.
+    return f"{signature}-{hashlib.sha256(output.encode('utf-8')).hexdigest()}", signature
+
+
+def failure_fingerprint(payload: dict[str, Any]) -> str:
+    return failure_keys(payload)[0]
+
+
+def heal_cache_key(correlation_id: str, fingerprint: str) -> str:
+    return f"{correlation_id}:{fingerprint}"
+
+
+def heal_from_payload(payload: dict[str, Any], signature: str | None = None) -> HealOutcome:
+    # JUnit XML / pytest-json-report payloads skip the free-text scan entirely and
+    # yield one record per failing test.
+    try:
+        reported = failures_from_payload(payload)
+    except (ET.ParseError, ValueError) as exc:
+        # Truncated or malformed reports escalate like any other unhealable input.
+        return HealOutcome(
+            status="escalated",
+            reason_code="invalid_report",
+            human_context={"summary": f"Could not parse the failure report: {exc}"},
+            patch_summary=None,
+            changed_files=[],
+        )
+    output = window_output(_extract_failure_output(payload))
+    if reported is None:
+        # Retries and other CI shards resend the same traceback; the signature
+        # cache skips classifying it again and remembers how the last fix went.
+        # `signature` comes from failure_keys(payload) when the caller has it.
+        signature, classified, _ = signature_cache().classify(
+            output, classify_pytest_output, signature if output else None
+        )
+        failures: list[FailureInfo] = [classified]
+    else:
+        signature = None
+        failures = reported
+    failure = primary_failure(failures)
+    to_fix = [item for item in distinct_failures(failures) if item.failure_type in KNOWN_FAILURE_TYPES]
 
-    if failure.failure_type not in KNOWN_FAILURE_TYPES:
-        lines = output.splitlines()
+    if not to_fix:
+        human_context: dict[str, Any] = {
+            "summary": failure.message,
+            "failingOutputPreview": preview_lines(output),
+            "candidateFiles": ["app/logic.py", "tests/test_compute.py"],
+        }
+        if reported is not None:
+            human_context["failingTests"] = [
+                {"nodeId": item.node_id, "exceptionType": item.exception_type, "file": item.file, "line": item.line}
+                for item in reported[:100]
+            ]
+        if signature is not None:
+            signature_cache().record_outcome(signature, "escalated")
         return HealOutcome(
             status="escalated",
             reason_code="unknown_failure_signature",
-            human_context={
-                "summary": failure.message,
-                "failingOutputPreview": lines[:100],
-                "candidateFiles": ["app/logic.py", "tests/test_compute.py"],
-            },
+            human_context=human_context,
             patch_summary=None,
             changed_files=[],
         )
 
-    changed_paths = apply_fix(failure)
     changed_files: list[str] = []
-    for path in changed_paths:
-        try:
-            changed_files.append(str(path.relative_to(Path.cwd())))
-        except ValueError:
-            changed_files.append(str(path))
+    changed: list[Path] = []
+    for item in to_fix:
+        for path in apply_fix(item):
+            changed.append(path)
+            try:
+                name = str(path.relative_to(Path.cwd()))
+            except ValueError:
+                name = str(path)
+            if name not in changed_files:
+                changed_files.append(name)
 
+    if signature is not None:
+        signature_cache().record_outcome(signature, "completed")
+    applied = ", ".join(item.failure_type.value for item in to_fix)
+    failed_node_ids = [item.node_id for item in failures if item.node_id]
     return HealOutcome(
         status="completed",
         reason_code=None,
         human_context=None,
-        patch_summary=f"Applied {failure.failure_type.value} remediation.",
+        patch_summary=f"Applied {applied} remediation.",
         changed_files=changed_files,
+        # The import scan reads every test file, too slow for a request; without
+        # an index this is the failing tests and the changed test files.
+        verification_targets=verification_targets(
+            failed_node_ids, changed, ROOT, to_fix, impact_index(), scan_imports=False
+        ),
     )
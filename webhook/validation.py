@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+EVENT_SCHEMA_FILE = ROOT / "contracts" / "event-schema.json"
+
+VALIDATION_MODES = ("off", "debug", "strict")
+
+Validator = Callable[[Any], list[str]]
+
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "$comment", "examples", "default"}
+_SUPPORTED = {
+    "type",
+    "const",
+    "enum",
+    "required",
+    "properties",
+    "additionalProperties",
+    "minLength",
+    "maxLength",
+    "minimum",
+    "maximum",
+    "format",
+} | _ANNOTATIONS
+
+_TYPE_CHECKS = {
+    "string": "isinstance({v}, str)",
+    "integer": "(isinstance({v}, int) and not isinstance({v}, bool))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "null": "{v} is None",
+}
+
+_DATE_TIME_RE = re.compile(
+    r"^\d{4}-\d{2}-\d{2}[Tt]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[Zz]|[+-]\d{2}:\d{2})$"
+)
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.namespace: dict[str, Any] = {"_DATE_TIME_RE": _DATE_TIME_RE, "_MISSING": object()}
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def _constant(self, value: Any) -> str:
+        name = self._name("_C")
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append("    " * indent + line)
+
+    def compile(self, schema: dict[str, Any], var: str, path: str, indent: int) -> None:
+        unknown = set(schema) - _SUPPORTED
+        if unknown:
+            raise ValueError(f"unsupported schema keywords at {path}: {sorted(unknown)}")
+
+        path_const = self._constant(path)
+        checks_follow = indent
+
+        schema_type = schema.get("type")
+        types: list[str] = []
+        if schema_type is not None:
+            types = [schema_type] if isinstance(schema_type, str) else list(schema_type)
+            condition = " or ".join(_TYPE_CHECKS[name].format(v=var) for name in types)
+            self.emit(indent, f"if not ({condition}):")
+            self.emit(indent + 1, f"errors.append({path_const} + ': expected {'/'.join(types)}')")
+            self.emit(indent, "else:")
+            checks_follow = indent + 1
+        block_start = len(self.lines)
+
+        if "const" in schema:
+            const = self._constant(schema["const"])
+            self.emit(checks_follow, f"if {var} != {const}:")
+            self.emit(checks_follow + 1, f"errors.append({path_const} + ': must equal ' + repr({const}))")
+
+        if "enum" in schema:
+            values = schema["enum"]
+            scalar_type = schema_type is not None and not ({"object", "array"} & set(types))
+            try:
+                # A frozenset lookup is only safe when the type check already
+                # guarantees a hashable value.
+                allowed = self._constant(frozenset(values) if scalar_type else tuple(values))
+            except TypeError:
+                allowed = self._constant(tuple(values))
+            self.emit(checks_follow, f"if {var} not in {allowed}:")
+            self.emit(checks_follow + 1, f"errors.append({path_const} + ': not an allowed value')")
+
+        if "minLength" in schema or "maxLength" in schema:
+            length_indent = checks_follow
+            if types != ["string"]:
+                self.emit(checks_follow, f"if isinstance({var}, str):")
+                length_indent += 1
+            if "minLength" in schema:
+                self.emit(length_indent, f"if len({var}) < {int(schema['minLength'])}:")
+                self.emit(length_indent + 1, f"errors.append({path_const} + ': too short')")
+            if "maxLength" in schema:
+                self.emit(length_indent, f"if len({var}) > {int(schema['maxLength'])}:")
+                self.emit(length_indent + 1, f"errors.append({path_const} + ': too long')")
+
+        numeric = _TYPE_CHECKS["number"].format(v=var)
+        if "minimum" in schema:
+            self.emit(checks_follow, f"if {numeric} and {var} < {schema['minimum']!r}:")
+            self.emit(checks_follow + 1, f"errors.append({path_const} + ': below minimum')")
+        if "maximum" in schema:
+            self.emit(checks_follow, f"if {numeric} and {var} > {schema['maximum']!r}:")
+            self.emit(checks_follow + 1, f"errors.append({path_const} + ': above maximum')")
+
+        if schema.get("format") == "date-time":
+            self.emit(checks_follow, f"if isinstance({var}, str) and _DATE_TIME_RE.match({var}) is None:")
+            self.emit(checks_follow + 1, f"errors.append({path_const} + ': not a date-time')")
+
+        required = schema.get("required", [])
+        properties = schema.get("properties", {})
+        additional = schema.get("additionalProperties", True)
+        if required or properties or additional is False:
+            self._compile_object(var, path, path_const, checks_follow, types, required, properties, additional)
+
+        if len(self.lines) == block_start:
+            self.emit(checks_follow, "pass")
+
+    def _compile_object(
+        self,
+        var: str,
+        path: str,
+        path_const: str,
+        indent: int,
+        types: list[str],
+        required: list[str],
+        properties: dict[str, Any],
+        additional: Any,
+    ) -> None:
+        body = indent
+        if types != ["object"]:
+            self.emit(indent, f"if isinstance({var}, dict):")
+            body += 1
+
+        for key in required:
+            self.emit(body, f"if {key!r} not in {var}:")
+            self.emit(body + 1, f"errors.append({path_const} + ': missing required property {key}')")
+
+        for key, subschema in properties.items():
+            child = self._name("v")
+            self.emit(body, f"{child} = {var}.get({key!r}, _MISSING)")
+            self.emit(body, f"if {child} is not _MISSING:")
+            self.compile(subschema, child, f"{path}.{key}", body + 1)
+
+        if additional is False:
+            allowed_keys = self._constant(frozenset(properties))
+            self.emit(body, f"for extra in {var}.keys() - {allowed_keys}:")
+            self.emit(body + 1, f"errors.append({path_const} + ': unexpected property ' + extra)")
+        elif isinstance(additional, dict):
+            raise ValueError(f"schema-valued additionalProperties is not supported at {path}")
+
+
+def compile_schema(schema: dict[str, Any]) -> Validator:
+    compiler = _Compiler()
+    compiler.emit(0, "def validate(value):")
+    compiler.emit(1, "errors = []")
+    compiler.compile(schema, "value", "$", 1)
+    compiler.emit(1, "return errors")
+
+    source = "\n".join(compiler.lines)
+    exec(compile(source, "<event-schema>", "exec"), compiler.namespace)  # noqa: S102
+    validate: Validator = compiler.namespace["validate"]
+    validate.__source__ = source  # type: ignore[attr-defined]
+    return validate
+
+
+@lru_cache(maxsize=None)
+def load_envelope_validator(path: str | None = None) -> Validator:
+    schema_path = Path(path) if path else EVENT_SCHEMA_FILE
+    return compile_schema(json.loads(schema_path.read_text()))
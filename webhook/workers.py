@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import resource
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from telemetry import start_snapshot_flusher, write_snapshot
+from webhook.service import heal_from_payload
+
+
+class HealWorkerError(RuntimeError):
+    pass
+
+
+class WorkerCrashedError(HealWorkerError):
+    pass
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker_main(conn: Connection, target: Callable[..., Any]) -> None:
+    # Unpickling `target` already imported the healer stack; report ready so the
+    # parent only hands out warm workers.
+    start_snapshot_flusher()
+    conn.send(("ready", _peak_rss_mb()))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        payload, options = job
+        try:
+            result = target(payload, **options)
+        except Exception:  # noqa: BLE001 - the parent decides how to surface it
+            conn.send(("error", traceback.format_exc(), _peak_rss_mb()))
+        else:
+            conn.send(("ok", result, _peak_rss_mb()))
+        # Publish this worker's classifier and fixer metrics before it can be recycled.
+        write_snapshot()
+
+
+@dataclass
+class _Worker:
+    process: BaseProcess
+    conn: Connection
+    jobs: int = 0
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+@dataclass
+class HealWorkerPool:
+    processes: int = 2
+    max_jobs_per_worker: int = 100
+    max_memory_mb: float = 512.0
+    start_timeout_seconds: float = 30.0
+    target: Callable[..., Any] = heal_from_payload
+    _context: Any = field(default_factory=lambda: multiprocessing.get_context("spawn"), init=False, repr=False)
+    _idle: queue.Queue[_Worker | None] = field(default_factory=queue.Queue, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _started: bool = field(default=False, init=False, repr=False)
+    _closed: bool = field(default=False, init=False, repr=False)
+    _counters: dict[str, int] = field(
+        default_factory=lambda: {"jobs": 0, "timeouts": 0, "crashes": 0, "recycled": 0, "spawned": 0},
+        init=False,
+        repr=False,
+    )
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.processes):
+            try:
+                worker: _Worker | None = self._spawn()
+            except WorkerCrashedError:
+                worker = None
+            self._idle.put(worker)
+
+    def run(self, payload: Any, timeout: float, **options: Any) -> Any:
+        # `options` are passed to `target` as keyword arguments.
+        if self._closed:
+            raise HealWorkerError("heal worker pool is closed")
+        self.start()
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("no heal worker became available before the deadline") from None
+
+        replacement: _Worker | None = None
+        try:
+            if worker is None or not worker.process.is_alive():
+                if worker is not None:
+                    worker.kill()
+                worker = self._spawn()
+            worker.conn.send((payload, options))
+            worker.jobs += 1
+            self._count("jobs")
+
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                # Unlike a thread, the process can be stopped, so a timed-out heal
+                # cannot keep writing files after the escalation is reported.
+                self._count("timeouts")
+                worker.kill()
+                raise TimeoutError("heal worker exceeded the execution timeout")
+
+            try:
+                status, value, peak_mb = worker.conn.recv()
+            except (EOFError, OSError) as exc:
+                self._count("crashes")
+                worker.kill()
+                raise WorkerCrashedError(f"heal worker exited unexpectedly (exit code {worker.process.exitcode})") from exc
+
+            if worker.jobs >= self.max_jobs_per_worker or peak_mb > self.max_memory_mb:
+                self._count("recycled")
+                self._retire(worker)
+            else:
+                replacement = worker
+
+            if status == "error":
+                raise HealWorkerError(value)
+            return value
+        finally:
+            # Dead or retired workers are replaced lazily by the next job, which keeps
+            # respawn cost off the request that triggered the recycle.
+            self._idle.put(replacement)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"processes": self.processes, "idle": self._idle.qsize(), **self._counters}
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._closed = True
+        deadline = time.monotonic() + timeout
+        for _ in range(self.processes if self._started else 0):
+            try:
+                worker = self._idle.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if worker is not None:
+                self._retire(worker)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.target),
+            name="heal-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process=process, conn=parent_conn)
+        if not parent_conn.poll(self.start_timeout_seconds):
+            worker.kill()
+            raise WorkerCrashedError("heal worker did not start in time")
+        try:
+            parent_conn.recv()
+        except EOFError as exc:
+            worker.kill()
+            raise WorkerCrashedError("heal worker exited during startup") from exc
+        self._count("spawned")
+        return worker
+
+    def _retire(self, worker: _Worker) -> None:
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.process.join(timeout=1)
+        worker.kill()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1